@@ -16,15 +16,106 @@ class Config:
     # API 상수들
     RIOT_BASE_URL: str = "https://kr.api.riotgames.com"
     RIOT_MATCH_URL: str = "https://asia.api.riotgames.com"
+    # 수집할 플랫폼 목록 (쉼표 구분, 예: "KR,JP1,EUW1,NA1") - 플랫폼별 클라이언트로 병렬 수집
+    RIOT_PLATFORMS: str = os.getenv("RIOT_PLATFORMS", "KR")
+    RIOT_API_HOST_TEMPLATE: str = "https://{host}.api.riotgames.com"  # host: 플랫폼(kr) 또는 지역(asia)
+    # 래더 저장 범위 (쉼표 구분, 예: "CHALLENGER,GRANDMASTER,MASTER,DIAMOND") - 챌린저 외 티어는 배치 단위로 스트리밍 저장
+    LADDER_TIERS: str = os.getenv("LADDER_TIERS", "CHALLENGER")
+    LADDER_WRITE_BATCH_SIZE: int = 1000  # 챌린저 테이블 MERGE 1회당 행 수
+    LADDER_MAX_PAGES: int = int(os.getenv("LADDER_MAX_PAGES", "0"))  # league-exp 디비전당 최대 페이지 (0이면 끝까지)
     DEFAULT_QUEUE: str = "RANKED_SOLO_5x5"
     
     # 성능 관련 상수
     DEFAULT_MATCH_COUNT: int = 20
     API_RATE_LIMIT_DELAY: float = 0.5
+    # 앱 레이트 리밋 (첫 응답의 X-App-Rate-Limit 헤더로 갱신됨, 형식: "요청수:초,...")
+    RIOT_APP_RATE_LIMITS: str = os.getenv("RIOT_APP_RATE_LIMITS", "20:1,100:120")
+    # 클라이언트/서버 시각 차이를 흡수하기 위한 윈도우 여유 시간(초)
+    RATE_LIMIT_WINDOW_PADDING: float = 0.05
+    # 레이트 리밋 상태 저장소 (memory: 프로세스 내부, sqlite: 파일 공유, redis: 인스턴스 간 공유)
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_SQLITE_PATH: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/riot_rate_limit.sqlite3")
+    RATE_LIMIT_REDIS_URL: str = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
     RETRY_DELAY: float = 2.0
     MAX_RETRIES: int = 3
+    RETRY_MAX_DELAY: float = 60.0  # 백오프/Retry-After 최대 대기
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # 연속 실패 N회면 엔드포인트 계열 요청 중지
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # 중지 후 시험 요청까지 대기
     PLAYER_BATCH_DELAY: float = 1.0
     
+    # HTTP 커넥션 풀 설정
+    HTTP_POOL_CONNECTIONS: int = 4
+    HTTP_POOL_MAXSIZE: int = 10
+    HTTP_KEEPALIVE_IDLE: int = 60
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_WARMUP: bool = False  # 수집 시작 전에 호스트별 TLS 연결을 미리 수립 (인증 헤더 없이 호스트 루트로 HEAD)
+    
+    # 매치 상세 로컬 캐시 (기본 꺼짐)
+    # MATCH_CACHE_DIR은 실제 디스크(영구 디스크, 마운트한 볼륨)여야 합니다.
+    # Cloud Run 등의 /tmp는 메모리(tmpfs)라 캐시 용량만큼 인스턴스 메모리를 차지합니다.
+    MATCH_CACHE_ENABLED: bool = os.getenv("MATCH_CACHE_ENABLED", "false").lower() == "true"
+    MATCH_CACHE_DIR: str = os.getenv("MATCH_CACHE_DIR", "/tmp/riot_match_cache")
+    MATCH_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 전체 용량 (여러 플랫폼이면 플랫폼별로 나눔)
+    MATCH_CACHE_SEGMENT_BYTES: int = 16 * 1024 * 1024
+    
+    # 매치 응답 빠른 디코딩 (msgspec 설치 시 필요한 필드만 디코딩, 참가자 원본 JSON 유지)
+    FAST_JSON_DECODE: bool = os.getenv("FAST_JSON_DECODE", "true").lower() == "true"
+    
+    # 저장된 match_id 인덱스 (블룸 필터, 메모리 = 약 capacity * 1.8바이트, 기본 꺼짐)
+    # 인덱스 파일이 없으면 BigQuery에서 match_id 전체를 스캔해 다시 만들므로, KNOWN_MATCH_INDEX_PATH는
+    # 실행 사이에 유지되는 경로(영구 디스크, 마운트한 볼륨)여야 합니다. Cloud Run의 /tmp는 콜드 스타트마다 비워집니다.
+    KNOWN_MATCH_INDEX_ENABLED: bool = os.getenv("KNOWN_MATCH_INDEX_ENABLED", "false").lower() == "true"
+    KNOWN_MATCH_INDEX_CAPACITY: int = 2_000_000
+    KNOWN_MATCH_INDEX_FPR: float = 0.001
+    KNOWN_MATCH_INDEX_PATH: str = os.getenv("KNOWN_MATCH_INDEX_PATH", "/tmp/riot_known_matches.bloom")
+    
+    # 매치 ID 조회 필터 (쉼표 구분 큐 ID, 420: 솔로 랭크) - 비우면 MATCH_TYPE 유형 전체, 둘 다 비우면 필터 없음
+    MATCH_QUEUE_IDS: str = os.getenv("MATCH_QUEUE_IDS", "420")
+    MATCH_TYPE: str = os.getenv("MATCH_TYPE", "ranked")  # 큐를 지정하지 않았을 때만 사용 (ranked, normal, tourney)
+    # 필터 없이도 조회해 절약한 상세 호출 수를 추정할 플레이어 수 (클라이언트당, 샘플마다 ID 조회 1회 추가 - 기본 0: 추정 안 함)
+    QUEUE_FILTER_SAMPLE_PLAYERS: int = int(os.getenv("QUEUE_FILTER_SAMPLE_PLAYERS", "0"))
+    
+    # 플레이어별 수집 기준점 (마지막 저장 매치 이후만 조회, 기본 꺼짐 - WATERMARK_PATH는 실행 사이에 유지되는 경로)
+    WATERMARK_ENABLED: bool = os.getenv("WATERMARK_ENABLED", "false").lower() == "true"
+    WATERMARK_PATH: str = os.getenv("WATERMARK_PATH", "/tmp/riot_player_watermarks.json")
+    WATERMARK_MAX_NEW_MATCHES: int = 100  # 기준점이 있는 플레이어의 실행당 최대 조회 매치 수
+    MATCH_IDS_PAGE_SIZE: int = 100  # match-v5 ids 엔드포인트의 count 최대값
+    
+    # 챌린저 스냅샷 변화량(wins + losses) 기반 수집 계획 (새 게임이 없는 플레이어 제외, 기본 꺼짐)
+    ACTIVITY_PLANNER_ENABLED: bool = os.getenv("ACTIVITY_PLANNER_ENABLED", "false").lower() == "true"
+    ACTIVITY_MAX_MATCHES_PER_PLAYER: int = 100
+    
+    # 중단/재개 체크포인트 (실행이 성공하면 삭제, 오래된 체크포인트는 무시, 기본 꺼짐)
+    CHECKPOINT_ENABLED: bool = os.getenv("CHECKPOINT_ENABLED", "false").lower() == "true"
+    CHECKPOINT_PATH: str = os.getenv("CHECKPOINT_PATH", "/tmp/riot_pipeline_checkpoint.json")
+    CHECKPOINT_SAVE_EVERY: int = 10  # 플레이어 N명마다 저장
+    CHECKPOINT_MAX_AGE_HOURS: float = 12
+    
+    # 매치 타임라인 수집 (선택, 참가자별 분 단위 프레임만 저장)
+    TIMELINE_ENABLED: bool = os.getenv("TIMELINE_ENABLED", "false").lower() == "true"
+    TIMELINE_RATE_LIMITS: str = os.getenv("TIMELINE_RATE_LIMITS", "5:1,40:120")  # 타임라인 전용 요청 예산 (형식: "요청수:초,...")
+    TIMELINE_BATCH_MATCHES: int = 5  # 저장 배치당 매치 수 (매치당 약 300~400행, MERGE 쿼리 길이 제한 고려)
+    TIMELINE_WORKERS: int = 4
+    
+    # 수집 계획 (최근 실행 실측값으로 요청 수/소요 시간 추정, 예산이 있으면 예산 안에 드는 최대 규모로 수집)
+    RUN_TIME_BUDGET_SECONDS: float = float(os.getenv("RUN_TIME_BUDGET_SECONDS", "0"))  # 0이면 설정값 그대로 (Cloud Run 제한 시간보다 여유 있게)
+    PLAN_PROFILE_PATH: str = os.getenv("PLAN_PROFILE_PATH", "/tmp/riot_run_profile.json")
+    
+    # 수집 엔진 설정 (sync: 순차 수집, async: asyncio 동시 수집, threaded: 스레드 풀 수집,
+    #                staged: 수집/변환/저장 단계를 큐로 연결해 수집 중에 배치 저장)
+    COLLECTION_ENGINE: str = os.getenv("COLLECTION_ENGINE", "sync")
+    ASYNC_MAX_CONCURRENCY: int = 20
+    THREAD_POOL_WORKERS: int = int(os.getenv("THREAD_POOL_WORKERS", "8"))
+    STAGED_BATCH_SIZE: int = 50  # 저장 배치당 매치 수
+    STAGE_QUEUE_SIZE: int = 200  # 스테이지 사이 큐 크기
+    # staged 엔진 변환 단계에서 행 dict 대신 컬럼 버퍼를 채워 로드 작업(Parquet, pyarrow 없으면 줄 단위 JSON) + MERGE로 저장
+    COLUMNAR_TRANSFORM: bool = os.getenv("COLUMNAR_TRANSFORM", "false").lower() == "true"
+    # staged 엔진 변환 단계를 프로세스 풀로 실행 (디코딩/변환/로드 파일 직렬화를 워커 프로세스에서, 항상 컬럼 저장)
+    TRANSFORM_PROCESSES: int = int(os.getenv("TRANSFORM_PROCESSES", "0"))  # 0이면 끔, 음수면 사용 가능한 CPU 코어 수
+    # sync/threaded 엔진 스트리밍 저장 (매치를 고정 크기 배치로 수집해 바로 저장하고 해제, 0이면 전체 수집 후 한 번에 저장)
+    MATCH_STREAM_BATCH_SIZE: int = int(os.getenv("MATCH_STREAM_BATCH_SIZE", "0"))  # 배치당 매치 수 (MERGE 쿼리 길이 제한 고려)
+    MATCH_STREAM_MEMORY_LIMIT_MB: int = int(os.getenv("MATCH_STREAM_MEMORY_LIMIT_MB", "0"))  # 저장 전 버퍼에 쌓인 레코드 추정 크기가 넘으면 배치를 일찍 저장 (0이면 끔, 여러 플랫폼이면 나눠 적용)
+    
     # BigQuery 설정
     DATASET_LOCATION: str = "US"
     
@@ -14,7 +14,8 @@ SELECT
   RANK() OVER (PARTITION BY DATE(collected_at) ORDER BY league_points DESC) AS daily_rank,
   RANK() OVER (ORDER BY league_points DESC) AS current_rank
 FROM `riot-data-pipeline.riot_analytics.challengers`
-WHERE date(collected_at) >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY);
+WHERE date(collected_at) >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)
+  AND COALESCE(tier, 'CHALLENGER') = 'CHALLENGER';
 
 -- 2. 매치 분석 대시보드 뷰
 CREATE OR REPLACE VIEW `riot-data-pipeline.riot_analytics.match_analysis` AS
@@ -166,7 +167,10 @@ SELECT
   ROUND(AVG(c.league_points), 0) AS avg_lp,
   MAX(c.collected_at) AS last_data_collection,
   COUNT(DISTINCT DATE(c.collected_at)) AS collection_days
-FROM `riot-data-pipeline.riot_analytics.challengers` c
+FROM (
+  SELECT * FROM `riot-data-pipeline.riot_analytics.challengers`
+  WHERE COALESCE(tier, 'CHALLENGER') = 'CHALLENGER'
+) c
 FULL OUTER JOIN `riot-data-pipeline.riot_analytics.matches` m
   ON DATE(c.collected_at) = DATE(m.game_creation)
 LEFT JOIN `riot-data-pipeline.riot_analytics.match_participants` mp
@@ -0,0 +1,65 @@
+import logging
+from typing import Dict, List
+
+from records import ChallengerRecord
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityPlanner:
+    """
+    챌린저 스냅샷 변화량 기반 수집 계획
+    이전 실행 때 challengers 테이블의 wins + losses와 현재 값을 비교해 그 사이 치른 게임 수만큼만
+    매치 ID를 조회하고, 새 게임이 없는 플레이어는 수집 대상에서 제외합니다.
+    이전 스냅샷에 없는 플레이어(새로 진입한 플레이어)는 기본 수집 개수를 사용합니다.
+    """
+
+    def __init__(self, default_count: int, max_count: int = 100):
+        self.default_count = default_count
+        self.max_count = max_count
+
+        self.planned_players = 0
+        self.new_players = 0
+        self.skipped_players = 0
+        self.planned_match_ids = 0
+
+    @staticmethod
+    def games_played(player: ChallengerRecord) -> int:
+        return player.wins + player.losses
+
+    def plan(self, players: List[ChallengerRecord], previous_games: Dict[str, int]) -> List[ChallengerRecord]:
+        """
+        수집할 플레이어 목록 반환 (각 플레이어에 match_count 설정)
+        previous_games는 puuid -> 이전 스냅샷의 wins + losses 입니다.
+        """
+        planned = []
+        for player in players:
+            previous = previous_games.get(player.puuid)
+            current = self.games_played(player)
+
+            if previous is None or current < previous:
+                # 처음 보는 플레이어, 또는 시즌 초기화로 전적이 줄어든 경우
+                match_count = self.default_count
+                self.new_players += 1
+            elif current == previous:
+                self.skipped_players += 1
+                continue
+            else:
+                match_count = min(current - previous, self.max_count)
+
+            planned.append(player._replace(match_count=match_count))
+            self.planned_match_ids += match_count
+
+        self.planned_players = len(planned)
+        logger.info(f"수집 계획: {len(players)}명 중 {self.planned_players}명 수집 "
+                   f"(신규 {self.new_players}명, 새 게임 없음 {self.skipped_players}명 제외), "
+                   f"예상 매치 ID {self.planned_match_ids}개")
+        return planned
+
+    def get_stats(self) -> Dict:
+        return {
+            'planned_players': self.planned_players,
+            'new_players': self.new_players,
+            'skipped_inactive_players': self.skipped_players,
+            'planned_match_ids': self.planned_match_ids
+        }
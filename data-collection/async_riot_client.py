@@ -0,0 +1,314 @@
+import asyncio
+import json
+import time
+import logging
+from collections import Counter
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from riot_client import RiotClient, MATCH_V5_IDS, MATCH_V5_DETAIL
+from records import ChallengerRecord, MatchRecord, ParticipantRecord
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+
+class AsyncRiotClient(RiotClient):
+    """
+    asyncio 기반 매치 수집 엔진
+    매치 상세 요청을 동시에 여러 개 진행하며, 동시 요청 수는 세마포어로,
+    요청 시작 간격은 레이트 리미터로 제한합니다.
+    챌린저 조회와 데이터 변환은 RiotClient 구현을 그대로 사용합니다.
+    """
+
+    def __init__(self, config=None, platform: Optional[str] = None, rate_limits=None,
+                 match_cache_max_bytes: Optional[int] = None, timeline_budget=None):
+        super().__init__(config, platform=platform, rate_limits=rate_limits,
+                         match_cache_max_bytes=match_cache_max_bytes, timeline_budget=timeline_budget)
+        self.max_concurrency = self.config.ASYNC_MAX_CONCURRENCY
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """커넥션 풀을 공유하는 aiohttp 세션 생성"""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            keepalive_timeout=self.config.HTTP_KEEPALIVE_IDLE
+        )
+        return aiohttp.ClientSession(
+            headers=self.headers,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.HTTP_TIMEOUT)
+        )
+
+    async def _get(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                   method: str, url: str, params: Optional[Dict] = None):
+        """
+        레이트 리밋을 지키며 GET 요청 후 (상태코드, 응답 바이트) 반환
+        재시도 대상(429, 5xx, 타임아웃/연결 오류)은 RetryEngine 정책대로 MAX_RETRIES번까지 재시도하고,
+        모두 실패하면 마지막 상태코드를 반환하거나 마지막 예외를 그대로 던집니다.
+        """
+        try:
+            status, body = await self._get_with_retries(session, semaphore, method, url, params)
+        except Exception:
+            self._record_request(method, ok=False)
+            raise
+        self._record_request(method, ok=status < 400 or status == 404)
+        return status, body
+
+    async def _get_with_retries(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                method: str, url: str, params: Optional[Dict]):
+        limiter = self.rate_limits.get_limiter(method)
+        attempt = 0
+
+        while True:
+            probe = await self.retry_engine.async_wait_for_circuit(method)
+            recorded = False
+            try:
+                try:
+                    async with semaphore:
+                        await limiter.async_wait_if_needed()
+
+                        start_time = time.time()
+                        async with session.get(url, params=params) as response:
+                            response_time = time.time() - start_time
+                            await limiter.async_record_response(response.status, response_time, headers=response.headers)
+
+                            status = response.status
+                            body = await response.read() if status == 200 else None
+                            headers = response.headers
+                except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                    recorded = True
+                    delay = self.retry_engine.on_error(method, attempt)
+                    if delay is None:
+                        raise
+                    logger.warning(f"요청 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.config.MAX_RETRIES}): {e}")
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+
+                recorded = True
+                delay = self.retry_engine.on_response(method, attempt, status, headers)
+                if delay is None:
+                    return status, body
+            finally:
+                # 시험 요청이 결과를 기록하기 전에 취소/다른 예외로 끝나면 시험 요청 표시 해제
+                if probe and not recorded:
+                    self.retry_engine.release_probe(method)
+
+            logger.warning(f"{status} 응답, {delay:.1f}초 후 재시도 "
+                           f"({attempt + 1}/{self.config.MAX_RETRIES}): {url}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get_match_ids_by_puuid_async(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                           puuid: str, count: int = None,
+                                           since: Optional[int] = None, start: int = 0,
+                                           queue: Optional[int] = None, match_type: Optional[str] = None) -> List[str]:
+        """puuid 기반으로 최근 매치 조회 (비동기, since 이후 매치 중 start번째부터 count개, queue/match_type으로 필터)"""
+        if count is None:
+            count = self.config.DEFAULT_MATCH_COUNT
+
+        url = f"{self.match_url}/lol/match/v5/matches/by-puuid/{puuid}/ids"
+
+        try:
+            status, body = await self._get(session, semaphore, MATCH_V5_IDS, url,
+                                          params=self._match_ids_params(count, since, start, queue, match_type))
+
+            if status == 200:
+                match_ids = json.loads(body)
+                logger.debug(f"매치 ID 조회 성공: {len(match_ids)}개 (PUUID: {puuid[:10]}...)")
+                return match_ids
+            elif status == 404:
+                logger.warning(f"플레이어 매치 기록 없음: {puuid[:10]}...")
+            else:
+                logger.error(f"매치 ID 조회 실패: {status} (PUUID: {puuid[:10]}...)")
+            return []
+
+        except asyncio.TimeoutError:
+            logger.error(f"매치 ID 조회 타임아웃: {puuid[:10]}...")
+            return []
+        except aiohttp.ClientError as e:
+            logger.error(f"매치 ID 조회 요청 에러: {e}")
+            return []
+
+    async def get_new_match_ids_async(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                      puuid: str, count: int) -> List[str]:
+        """기준점 이후의 매치 ID만 조회 (비동기, 규칙은 RiotClient.get_new_match_ids와 동일)"""
+        watermark = self.player_watermarks.get(puuid) if self.player_watermarks else None
+        limit = count if watermark is None else min(count, self.config.WATERMARK_MAX_NEW_MATCHES)
+
+        results = await asyncio.gather(*(
+            self._list_match_ids_async(session, semaphore, puuid, count, watermark, queue)
+            for queue in self.queue_ids or [None]
+        ))
+        match_ids = self._merge_queue_results(list(results), limit)
+
+        if self._take_queue_filter_sample():
+            unfiltered = await self.get_match_ids_by_puuid_async(
+                session, semaphore, puuid, min(limit, self.config.MATCH_IDS_PAGE_SIZE),
+                since=None if watermark is None else watermark + 1
+            )
+            self._record_queue_filter_sample(unfiltered, match_ids)
+
+        if self.player_watermarks:
+            self.player_watermarks.record_listing(puuid, match_ids)
+        return match_ids
+
+    async def _list_match_ids_async(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                    puuid: str, count: int, watermark: Optional[int], queue: Optional[int]) -> List[str]:
+        """큐 하나에 대해 기준점 규칙대로 매치 ID 조회 (비동기)"""
+        if watermark is None:
+            return await self.get_match_ids_by_puuid_async(session, semaphore, puuid, count,
+                                                           queue=queue, match_type=self.match_type)
+
+        limit = min(count, self.config.WATERMARK_MAX_NEW_MATCHES)
+        match_ids = []
+        while len(match_ids) < limit:
+            page_size = min(self.config.MATCH_IDS_PAGE_SIZE, limit - len(match_ids))
+            page = await self.get_match_ids_by_puuid_async(session, semaphore, puuid, page_size,
+                                                           since=watermark + 1, start=len(match_ids),
+                                                           queue=queue, match_type=self.match_type)
+            match_ids.extend(page)
+            if len(page) < page_size:
+                break
+
+        return match_ids
+
+    async def get_match_details_async(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                      match_id: str) -> Optional[Dict]:
+        """매치 상세정보 조회 (비동기, 로컬 캐시 우선)"""
+        cached = self.get_cached_match_details(match_id)
+        if cached is not None:
+            return cached
+
+        url = f"{self.match_url}/lol/match/v5/matches/{match_id}"
+
+        try:
+            status, body = await self._get(session, semaphore, MATCH_V5_DETAIL, url)
+
+            if status == 200:
+                logger.debug(f"매치 상세정보 조회 성공: {match_id}")
+                try:
+                    match_data = self.match_decoder.decode(body)
+                except ValueError as e:
+                    # 잘리거나 깨진 응답 하나로 전체 수집이 중단되지 않도록 실패한 매치로 처리 (캐시에도 넣지 않음)
+                    logger.error(f"매치 상세정보 디코딩 에러: {match_id} - {e}")
+                    return None
+                if self.match_cache:
+                    self.match_cache.put(match_id, body)
+                return match_data
+            elif status == 404:
+                logger.warning(f"매치를 찾을 수 없음: {match_id}")
+            else:
+                logger.error(f"매치 상세 조회 실패: {status} - {match_id}")
+            return None
+
+        except asyncio.TimeoutError:
+            logger.error(f"매치 상세정보 조회 타임아웃: {match_id}")
+            return None
+        except aiohttp.ClientError as e:
+            logger.error(f"매치 상세정보 조회 요청 에러: {e}")
+            return None
+
+    async def collect_matches_async(self, challenger_data: List[ChallengerRecord], matches_per_player: int = 5) -> tuple[List[MatchRecord], List[ParticipantRecord]]:
+        """
+        챌린저 유저들 매치 데이터 비동기 수집
+        결과 순서와 중복 제거 규칙은 RiotClient.collect_matches_for_challengers와 동일합니다.
+        """
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        detail_tasks: Dict[str, asyncio.Task] = {}
+        known_match_ids = set()
+
+        logger.info(f"총 {len(challenger_data)}명의 챌린저 유저 매치 비동기 수집 시작 "
+                   f"(동시 요청 {self.max_concurrency}개)")
+
+        # 중단된 실행에서 조회만 하고 저장하지 못한 매치
+        pending_match_ids = self.pending_match_ids()
+        if pending_match_ids:
+            logger.info(f"체크포인트에서 재개: 미저장 매치 {len(pending_match_ids)}개")
+
+        async with self._create_session() as session:
+
+            def schedule_details(match_ids: List[str]):
+                # 처음 보는 매치의 상세 조회를 예약 (다른 플레이어 목록에서 이미 예약한 매치 제외)
+                for match_id in match_ids:
+                    if match_id not in detail_tasks and match_id not in known_match_ids:
+                        # BigQuery에 이미 저장된 매치는 조회하지 않음
+                        if self.is_known_match(match_id):
+                            known_match_ids.add(match_id)
+                            continue
+                        detail_tasks[match_id] = asyncio.create_task(
+                            self.get_match_details_async(session, semaphore, match_id)
+                        )
+
+            async def fetch_player(puuid: str, match_count: int) -> List[str]:
+                # 이전 실행에서 ID 조회를 마친 플레이어는 건너뜀
+                if self.checkpoint and self.checkpoint.is_player_done(puuid):
+                    return []
+
+                # ID 목록을 받는 즉시 상세 조회 예약
+                match_ids = await self.get_new_match_ids_async(session, semaphore, puuid, match_count)
+                if self.checkpoint:
+                    self.checkpoint.record_player(puuid, match_ids)
+                schedule_details(match_ids)
+                return match_ids
+
+            schedule_details(pending_match_ids)
+            player_match_ids = await asyncio.gather(
+                *(fetch_player(player.puuid, player.matches_to_collect(matches_per_player))
+                  for player in challenger_data)
+            )
+
+            all_matches = []
+            all_participants = []
+            claimed_match_ids = set()
+
+            # 실패한 매치는 같은 매치를 조회한 다음 플레이어 차례에 다시 시도 (동기 경로와 같은 시도 횟수/순서)
+            match_id_lists = [pending_match_ids, *player_match_ids]
+            remaining_listings = Counter(match_id for match_ids in match_id_lists for match_id in set(match_ids))
+
+            # 재개한 매치, 플레이어 순서, 매치 순서대로 결과 조립
+            for match_ids in match_id_lists:
+                for match_id in match_ids:
+                    remaining_listings[match_id] -= 1
+                    # 이미 처리한 매치는 동기 경로의 선점 실패와 같이 생략한 중복 요청으로 집계
+                    if match_id in claimed_match_ids:
+                        self._count_coalesced()
+                        continue
+                    claimed_match_ids.add(match_id)
+
+                    # BigQuery에 이미 저장된 매치 스킵
+                    if match_id not in detail_tasks:
+                        continue
+
+                    match_details = await detail_tasks[match_id]
+                    if not match_details:
+                        claimed_match_ids.discard(match_id)
+                        if remaining_listings[match_id] > 0:
+                            detail_tasks[match_id] = asyncio.create_task(
+                                self.get_match_details_async(session, semaphore, match_id)
+                            )
+                        continue
+
+                    match_record = self.extract_match_data(match_details)
+                    if match_record:
+                        all_matches.append(match_record)
+
+                    participants = self.extract_participants_data(match_details)
+                    all_participants.extend(participants)
+
+        stats = self.get_rate_limit_stats()
+        logger.info(f"매치 수집 완료: {len(all_matches)}개 매치, {len(all_participants)}명 참가자")
+        logger.info(f"API 호출 통계: {stats['total_requests']}회 요청, "
+                   f"{stats['rate_limited_requests']}회 레이트 리밋 "
+                   f"({stats['rate_limit_percentage']:.1f}%), "
+                   f"중복 상세 요청 {stats['coalesced_requests']}회 생략")
+
+        if self.match_cache:
+            self.match_cache.flush()
+            cache_stats = self.get_cache_stats()
+            logger.info(f"매치 캐시 통계: 적중 {cache_stats['cache_hits']}회 "
+                       f"(적중률 {cache_stats['cache_hit_ratio'] * 100:.1f}%)")
+
+        return all_matches, all_participants
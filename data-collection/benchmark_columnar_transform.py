@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+매치 변환 경로 메모리/CPU 벤치마크
+행 레코드 경로(extract_match_data/extract_participants_data 결과를 모두 보관한 뒤 MERGE 쿼리 문자열 생성)와
+컬럼 경로(ColumnarMatchTransformer로 컬럼 버퍼를 채운 뒤 로드 파일로 직렬화)를 비교합니다.
+두 경로 모두 같은 디코더로 응답을 디코딩합니다. CPU 시간은 tracemalloc 없이 따로 측정하고,
+메모리는 tracemalloc 최대 사용량입니다.
+
+사용법: python benchmark_columnar_transform.py [매치 수]
+기본값 6000매치(참가자 60,000행)는 프로덕션 실행(300명 x 20매치) 규모입니다.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("RIOT_API_KEY", "benchmark")
+
+from match_decoder import MatchDecoder
+from columnar_transform import ColumnarMatchTransformer, PYARROW_AVAILABLE
+from riot_client import RiotClient, Config
+from bigquery_client import BigQueryClient
+from benchmark_match_decode import build_sample_payload
+
+
+def measure(label: str, fn):
+    """fn 실행의 CPU 시간과 최대 메모리 출력"""
+    cpu_start = time.process_time()
+    fn()
+    cpu_seconds = time.process_time() - cpu_start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} CPU {cpu_seconds:7.2f}초, 최대 메모리 {peak / 1024 / 1024:8.1f}MB")
+    return cpu_seconds, peak
+
+
+def main():
+    match_count = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
+    payload = build_sample_payload()
+    decoder = MatchDecoder(fast=True)
+
+    # 변환 함수만 사용하므로 네트워크/캐시 초기화는 끔
+    config = Config()
+    config.HTTP_WARMUP = False
+    config.MATCH_CACHE_ENABLED = False
+    client = RiotClient(config)
+    # 쿼리 문자열 생성만 사용하므로 BigQuery 연결 없이 생성
+    bq_client = BigQueryClient.__new__(BigQueryClient)
+    bq_client.project_id, bq_client.dataset_id = "benchmark", config.dataset_id
+    print(f"매치 {match_count}개 (참가자 {match_count * 10}행), "
+          f"로드 파일 형식: {'Parquet' if PYARROW_AVAILABLE else '줄 단위 JSON (pyarrow 미설치)'}")
+
+    def record_path():
+        matches, participants = [], []
+        for _ in range(match_count):
+            match_data = decoder.decode(payload)
+            matches.append(client.extract_match_data(match_data))
+            participants.extend(client.extract_participants_data(match_data))
+        return len(bq_client._match_merge_query(matches)) + len(bq_client._participants_merge_query(participants))
+
+    def columnar_path():
+        transformer = ColumnarMatchTransformer()
+        for _ in range(match_count):
+            transformer.append(decoder.decode(payload))
+        match_batch, participant_batch = transformer.flush()
+        match_file, _ = match_batch.to_load_file()
+        participant_file, _ = participant_batch.to_load_file()
+        return len(match_file.getbuffer()) + len(participant_file.getbuffer())
+
+    record_cpu, record_peak = measure("행 레코드 + MERGE 쿼리", record_path)
+    columnar_cpu, columnar_peak = measure("컬럼 버퍼 + 로드 파일", columnar_path)
+
+    print(f"최대 메모리 {record_peak / columnar_peak:.2f}배 감소, CPU 시간 {record_cpu / columnar_cpu:.2f}배 단축")
+
+
+if __name__ == "__main__":
+    main()
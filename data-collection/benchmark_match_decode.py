@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+매치 상세 디코딩 마이크로벤치마크
+표준 경로(json.loads → 변환 → detailed_stats json.dumps)와
+빠른 경로(msgspec 필드 선택 디코딩 → 변환 → 원본 문자열 사용)를 비교합니다.
+
+사용법: python benchmark_match_decode.py [매치 JSON 파일] [반복 횟수]
+파일을 주지 않으면 match-v5 크기(참가자 10명, 참가자당 필드 120여 개)의 가상 응답을 사용합니다.
+"""
+
+import os
+import sys
+import json
+import time
+
+os.environ.setdefault("RIOT_API_KEY", "benchmark")
+
+from match_decoder import MatchDecoder, MSGSPEC_AVAILABLE
+from riot_client import RiotClient, Config
+
+
+def build_sample_payload() -> bytes:
+    """match-v5 응답과 비슷한 구조/크기의 가상 매치 JSON"""
+    participants = []
+    for i in range(10):
+        participant = {
+            'participantId': i + 1, 'puuid': f"puuid-{i:02d}" + "x" * 66,
+            'summonerName': f"player{i}", 'riotIdGameName': f"플레이어{i}", 'riotIdTagline': "KR1",
+            'summonerLevel': 300 + i, 'championId': 100 + i, 'championName': f"Champion{i}", 'champLevel': 18,
+            'win': i < 5, 'teamId': 100 if i < 5 else 200, 'teamPosition': "TOP", 'individualPosition': "TOP",
+            'kills': i, 'deaths': 3, 'assists': 7, 'totalMinionsKilled': 210, 'neutralMinionsKilled': 12,
+            'goldEarned': 14000, 'totalDamageDealtToChampions': 25000, 'visionScore': 30,
+            'summoner1Id': 4, 'summoner2Id': 12, 'placement': 0, 'subteamPlacement': 0,
+            'perks': {'statPerks': {'defense': 5002, 'flex': 5008, 'offense': 5005},
+                      'styles': [{'style': 8000, 'selections': [{'perk': 8010 + k, 'var1': k, 'var2': 0, 'var3': 0} for k in range(4)]}]},
+            'challenges': {f"challengeStat{k}": k * 1.5 for k in range(40)}
+        }
+        participant.update({f"item{k}": 3000 + k for k in range(7)})
+        participant.update({f"statField{k}": k for k in range(60)})
+        participants.append(participant)
+
+    match = {
+        'metadata': {'matchId': "KR_7000000000", 'dataVersion': "2", 'participants': [p['puuid'] for p in participants]},
+        'info': {
+            'gameCreation': 1700000000000, 'gameDuration': 1800, 'gameMode': "CLASSIC", 'gameType': "MATCHED_GAME",
+            'gameVersion': "14.18.618.5051", 'queueId': 420, 'mapId': 11, 'platformId': "KR",
+            'gameEndTimestamp': 1700001800000, 'participants': participants,
+            'teams': [{'teamId': team_id, 'win': team_id == 100,
+                       'bans': [{'championId': k, 'pickTurn': k} for k in range(5)],
+                       'objectives': {name: {'first': False, 'kills': 2} for name in ("baron", "dragon", "tower")}}
+                      for team_id in (100, 200)]
+        }
+    }
+    return json.dumps(match, ensure_ascii=False).encode('utf-8')
+
+
+def run(label: str, decode, client: RiotClient, payload: bytes, iterations: int) -> float:
+    """디코딩 + 변환 + detailed_stats 직렬화까지의 매치당 평균 시간(ms)"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        match_data = decode(payload)
+        client.extract_match_data(match_data)
+        for participant in client.extract_participants_data(match_data):
+            detailed_stats = participant.detailed_stats
+            if not isinstance(detailed_stats, str):
+                json.dumps(detailed_stats, ensure_ascii=False)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / iterations
+    print(f"{label:<28} {elapsed_ms:8.3f} ms/match")
+    return elapsed_ms
+
+
+def main():
+    payload = open(sys.argv[1], 'rb').read() if len(sys.argv) > 1 else build_sample_payload()
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    # 변환 함수만 사용하므로 네트워크/캐시 초기화는 끔
+    config = Config()
+    config.HTTP_WARMUP = False
+    config.MATCH_CACHE_ENABLED = False
+    client = RiotClient(config)
+    print(f"페이로드 크기: {len(payload) / 1024:.1f}KB, 반복: {iterations}회")
+
+    baseline = run("json.loads (현재 경로)", json.loads, client, payload, iterations)
+
+    if not MSGSPEC_AVAILABLE:
+        print("msgspec이 설치되지 않아 빠른 경로는 측정하지 않습니다. (pip install msgspec)")
+        return
+
+    decoder = MatchDecoder(fast=True)
+    fast = run("msgspec 필드 선택 디코딩", decoder.decode, client, payload, iterations)
+    print(f"속도 향상: {baseline / fast:.2f}배")
+
+
+if __name__ == "__main__":
+    main()
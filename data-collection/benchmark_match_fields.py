@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+참가자 필드 변환/인코딩 마이크로벤치마크
+match_fields.PARTICIPANT_FIELDS로 생성한 변환 함수(ParticipantRecord)/STRUCT 인코더와
+이전의 손으로 쓴 버전(참가자마다 participant.get 체인과 ZoneInfo 생성, 행 dict, f-string STRUCT)을 비교합니다.
+두 경로의 결과가 같은지 먼저 확인합니다.
+
+사용법: python benchmark_match_fields.py [반복 횟수]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+os.environ.setdefault("RIOT_API_KEY", "benchmark")
+
+from match_decoder import MatchDecoder, RAW_PARTICIPANT_KEY
+from match_fields import extract_participant_rows, encode_participant_struct, json_text
+from riot_client import KST
+from benchmark_match_decode import build_sample_payload
+
+
+def hand_written_extract(match_data):
+    """이전 extract_participants_data (비교 기준)"""
+    info = match_data.get("info", {})
+    match_id = match_data.get("metadata", {}).get("matchId")
+    game_creation_kst = datetime.fromtimestamp(info.get('gameCreation', 0) / 1000, tz=ZoneInfo("Asia/Seoul"))
+    rows = []
+    for participant in info.get("participants", []):
+        rows.append({
+            'match_id': match_id, 'participant_id': participant.get('participantId', 0), 'puuid': participant.get('puuid'),
+            'summoner_name': participant.get('summonerName'), 'riot_id_game_name': participant.get('riotIdGameName'),
+            'riot_id_tagline': participant.get('riotIdTagline'), 'summoner_level': participant.get('summonerLevel'),
+            'champion_id': participant.get('championId', 0), 'champion_name': participant.get('championName', 'Unknown'),
+            'champion_level': participant.get('champLevel', 1), 'win': participant.get('win', False),
+            'team_id': participant.get('teamId', 100), 'team_position': participant.get('teamPosition'),
+            'individual_position': participant.get('individualPosition'),
+            'kills': participant.get('kills', 0), 'deaths': participant.get('deaths', 0), 'assists': participant.get('assists', 0),
+            'total_minions_killed': participant.get('totalMinionsKilled', 0),
+            'neutral_minions_killed': participant.get('neutralMinionsKilled', 0),
+            'gold_earned': participant.get('goldEarned', 0),
+            'total_damage_dealt_to_champions': participant.get('totalDamageDealtToChampions', 0),
+            'vision_score': participant.get('visionScore', 0),
+            'item0': participant.get('item0', 0), 'item1': participant.get('item1', 0), 'item2': participant.get('item2', 0),
+            'item3': participant.get('item3', 0), 'item4': participant.get('item4', 0), 'item5': participant.get('item5', 0),
+            'item6': participant.get('item6', 0),
+            'summoner1_id': participant.get('summoner1Id'), 'summoner2_id': participant.get('summoner2Id'),
+            'placement': participant.get('placement'), 'subteam_placement': participant.get('subteamPlacement'),
+            'detailed_stats': participant.get(RAW_PARTICIPANT_KEY, participant),
+            'game_creation': game_creation_kst, 'collected_at': datetime.now(ZoneInfo("Asia/Seoul"))
+        })
+    return rows
+
+
+def hand_written_struct(p):
+    """이전 _participants_merge_query의 행 STRUCT (비교 기준, 공백만 한 줄로 정리)"""
+    def safe_str(value):
+        return f"'{value}'" if value is not None else "NULL"
+
+    def safe_int(value):
+        return str(value) if value is not None else "NULL"
+
+    detailed_stats_json = json_text(p["detailed_stats"]).replace("'", "\\'")
+    return (
+        f"STRUCT('{p['match_id']}' AS match_id, {p['participant_id']} AS participant_id, '{p['puuid']}' AS puuid, "
+        f"{safe_str(p['summoner_name'])} AS summoner_name, {safe_str(p['riot_id_game_name'])} AS riot_id_game_name, "
+        f"{safe_str(p['riot_id_tagline'])} AS riot_id_tagline, {safe_int(p['summoner_level'])} AS summoner_level, "
+        f"{p['champion_id']} AS champion_id, '{p['champion_name']}' AS champion_name, {p['champion_level']} AS champion_level, "
+        f"{p['win']} AS win, {p['team_id']} AS team_id, {safe_str(p['team_position'])} AS team_position, "
+        f"{safe_str(p['individual_position'])} AS individual_position, {p['kills']} AS kills, {p['deaths']} AS deaths, "
+        f"{p['assists']} AS assists, {p['total_minions_killed']} AS total_minions_killed, "
+        f"{p['neutral_minions_killed']} AS neutral_minions_killed, {p['gold_earned']} AS gold_earned, "
+        f"{p['total_damage_dealt_to_champions']} AS total_damage_dealt_to_champions, {p['vision_score']} AS vision_score, "
+        f"{safe_int(p['item0'])} AS item0, {safe_int(p['item1'])} AS item1, {safe_int(p['item2'])} AS item2, "
+        f"{safe_int(p['item3'])} AS item3, {safe_int(p['item4'])} AS item4, {safe_int(p['item5'])} AS item5, "
+        f"{safe_int(p['item6'])} AS item6, {safe_int(p['summoner1_id'])} AS summoner1_id, "
+        f"{safe_int(p['summoner2_id'])} AS summoner2_id, {safe_int(p['placement'])} AS placement, "
+        f"{safe_int(p['subteam_placement'])} AS subteam_placement, PARSE_JSON('{detailed_stats_json}') AS detailed_stats, "
+        f"TIMESTAMP('{p['game_creation'].strftime('%Y-%m-%d %H:%M:%S')}') AS game_creation, "
+        f"TIMESTAMP('{p['collected_at'].strftime('%Y-%m-%d %H:%M:%S')}') AS collected_at)"
+    )
+
+
+def generated_extract(match_data):
+    """RiotClient.extract_participants_data와 같은 호출"""
+    info = match_data.get("info", {})
+    return extract_participant_rows(
+        info.get("participants", []),
+        match_id=match_data.get("metadata", {}).get("matchId"),
+        game_creation=datetime.fromtimestamp(info.get('gameCreation', 0) / 1000, tz=KST),
+        collected_at=datetime.now(KST)
+    )
+
+
+def per_row_microseconds(fn, arg, iterations: int, rows: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - start) / iterations / rows * 1_000_000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    match_data = MatchDecoder(fast=True).decode(build_sample_payload())
+    rows = generated_extract(match_data)
+
+    # 결과 확인 (수집 시각 제외, 불리언은 SQL에서 대소문자 구분 없음)
+    expected = hand_written_extract(match_data)
+    strip = lambda row: {key: value for key, value in row.items() if key != 'collected_at'}
+    assert [strip(row._asdict()) for row in rows] == [strip(row) for row in expected], "변환 결과 불일치"
+    assert all(
+        encode_participant_struct(row).upper() == hand_written_struct(row._asdict()).upper() for row in rows
+    ), "STRUCT 인코딩 불일치"
+
+    print(f"참가자 {len(rows)}행 x {iterations}회")
+    for label, hand_written, generated, arg, count in (
+        ("행 변환", hand_written_extract, generated_extract, match_data, iterations),
+        ("STRUCT 인코딩", lambda _: [hand_written_struct(row) for row in expected],
+         lambda _: [encode_participant_struct(row) for row in rows], None, iterations // 10),
+    ):
+        hand_us = per_row_microseconds(hand_written, arg, count, len(rows))
+        generated_us = per_row_microseconds(generated, arg, count, len(rows))
+        print(f"{label:<12} 손으로 쓴 버전 {hand_us:6.2f}us/행, 생성 버전 {generated_us:6.2f}us/행 ({hand_us / generated_us:.2f}배)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+행 레코드 메모리 벤치마크
+이전의 행 dict와 records.py의 레코드 타입(ChallengerRecord/MatchRecord/ParticipantRecord)이
+같은 값을 담을 때 행당 메모리를 tracemalloc으로 비교합니다.
+값 객체는 두 경로가 공유하므로 차이는 행 컨테이너 자체의 크기입니다.
+
+사용법: python benchmark_records.py [매치 수]
+기본값 6000매치(참가자 60,000행, 챌린저 300행)는 프로덕션 실행(300명 x 20매치) 규모입니다.
+"""
+
+import os
+import sys
+import tracemalloc
+
+os.environ.setdefault("RIOT_API_KEY", "benchmark")
+
+from match_decoder import MatchDecoder
+from riot_client import RiotClient, Config
+from benchmark_match_decode import build_sample_payload
+
+
+def traced_bytes(build) -> int:
+    """build()가 만든 행 리스트가 차지하는 메모리 (리스트 포함)"""
+    tracemalloc.start()
+    rows = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return current
+
+
+def compare(label: str, rows: list) -> int:
+    """같은 값의 행 dict 리스트와 레코드 리스트 메모리 비교, 절약 바이트 반환"""
+    record_type = type(rows[0])
+    fields = record_type._fields
+    dict_bytes = traced_bytes(lambda: [dict(zip(fields, row)) for row in rows])
+    record_bytes = traced_bytes(lambda: [record_type._make(row) for row in rows])
+
+    count = len(rows)
+    print(f"{label:<18} {count:>7,}행  dict {dict_bytes / count:6.0f}B/행, 레코드 {record_bytes / count:6.0f}B/행  "
+          f"(행당 {(dict_bytes - record_bytes) / count:.0f}B, 전체 {(dict_bytes - record_bytes) / 1024 / 1024:.1f}MB 절약)")
+    return dict_bytes - record_bytes
+
+
+def main():
+    match_count = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
+    challenger_count = 300
+
+    # 변환 함수만 사용하므로 네트워크/캐시 초기화는 끔
+    config = Config()
+    config.HTTP_WARMUP = False
+    config.MATCH_CACHE_ENABLED = False
+    client = RiotClient(config)
+
+    match_data = MatchDecoder(fast=True).decode(build_sample_payload())
+    match = client.extract_match_data(match_data)
+    participants = client.extract_participants_data(match_data)
+    entries = [{'puuid': f"puuid-{index:04d}" + "x" * 68, 'leaguePoints': 1500 - index, 'wins': 200, 'losses': 150,
+                'veteran': True, 'hotStreak': False} for index in range(challenger_count)]
+
+    saved = 0
+    saved += compare("ChallengerRecord", list(client.iter_ladder_entries(entries, tier="CHALLENGER")))
+    saved += compare("MatchRecord", [match] * match_count)
+    saved += compare("ParticipantRecord", participants * match_count)
+    print(f"프로덕션 규모 1회 실행 합계 {saved / 1024 / 1024:.1f}MB 절약")
+
+
+if __name__ == "__main__":
+    main()
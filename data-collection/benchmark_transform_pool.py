@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+매치 변환 프로세스 풀 벤치마크
+같은 원본 응답을 staged 엔진 변환 단계처럼 50매치씩 묶어
+스레드 안에서(디코딩 → 컬럼 변환 → 로드 파일 직렬화) 처리할 때와 MatchTransformPool 워커 프로세스로 넘길 때를 비교합니다.
+메인 프로세스 CPU 시간은 수집 스레드와 GIL을 다투는 시간입니다.
+
+사용법: python benchmark_transform_pool.py [매치 수] [프로세스 수]
+기본값 6000매치는 프로덕션 실행(300명 x 20매치) 규모이고, 프로세스 수 기본값은 사용 가능한 CPU 코어 수입니다.
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("RIOT_API_KEY", "benchmark")
+
+from match_decoder import MatchDecoder
+from columnar_transform import ColumnarMatchTransformer
+from transform_pool import MatchTransformPool, MATCH_RESULT_COLUMNS, PARTICIPANT_RESULT_COLUMNS
+from benchmark_match_decode import build_sample_payload
+
+BATCH_MATCHES = 50
+
+
+def in_thread(chunks):
+    decoder = MatchDecoder(fast=True)
+    size = 0
+    for chunk in chunks:
+        transformer = ColumnarMatchTransformer()
+        for payload in chunk:
+            transformer.append(decoder.decode(payload))
+        matches, participants = transformer.flush()
+        size += len(matches.encode(MATCH_RESULT_COLUMNS).payload) + len(participants.encode(PARTICIPANT_RESULT_COLUMNS).payload)
+    return size
+
+
+def in_pool(pool: MatchTransformPool, chunks):
+    futures = [pool.submit(chunk) for chunk in chunks]
+    return sum(len(result.matches.payload) + len(result.participants.payload)
+               for result in (future.result() for future in futures))
+
+
+def measure(label: str, fn):
+    """fn 실행의 경과 시간과 메인 프로세스 CPU 시간 출력"""
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    size = fn()
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    print(f"{label:<22} 경과 {wall:6.2f}초, 메인 프로세스 CPU {cpu:6.2f}초 (로드 파일 {size / 1024 / 1024:.1f}MB)")
+    return wall, cpu
+
+
+def main():
+    match_count = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    payload = build_sample_payload()
+    chunks = [[payload] * min(BATCH_MATCHES, match_count - start) for start in range(0, match_count, BATCH_MATCHES)]
+
+    with MatchTransformPool(processes) as pool:
+        # 워커 시작(spawn, 모듈 import) 비용은 실행당 한 번이므로 측정에서 제외
+        in_pool(pool, chunks[:pool.processes])
+        print(f"매치 {match_count}개, 묶음 {BATCH_MATCHES}매치, 워커 프로세스 {pool.processes}개")
+        thread_wall, thread_cpu = measure("스레드 안 변환", lambda: in_thread(chunks))
+        pool_wall, pool_cpu = measure("프로세스 풀 변환", lambda: in_pool(pool, chunks))
+
+    print(f"메인 프로세스 CPU {thread_cpu / pool_cpu:.1f}배 감소, 경과 시간 {thread_wall / pool_wall:.2f}배")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 import os
 import json
+import uuid
 import logging
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
 from google.cloud import bigquery
 from google.cloud.exceptions import NotFound, GoogleCloudError
 from dotenv import load_dotenv
 from match_schema import MatchDataSchema
+from match_fields import PARTICIPANT_FIELDS, PARTICIPANT_KEY_COLUMNS, encode_participant_struct
+from records import ChallengerRecord, MatchRecord, ParticipantRecord
 
 # 상위 디렉토리 모듈 import
 import sys
@@ -92,8 +95,19 @@ class BigQueryClient:
         table_ref = self.client.dataset(self.dataset_id).table(self.table_id)
 
         try:
-            self.client.get_table(table_ref)
+            table = self.client.get_table(table_ref)
             print(f"테이블 --{self.table_id}-- 이미 존재")
+            
+            # 다중 플랫폼/래더 수집 이전에 만든 테이블에는 새 컬럼 추가
+            existing_fields = {field.name for field in table.schema}
+            added_fields = [
+                bigquery.SchemaField(name, "STRING", mode="NULLABLE")
+                for name in ("platform_id", "tier", "rank") if name not in existing_fields
+            ]
+            if added_fields:
+                table.schema = list(table.schema) + added_fields
+                self.client.update_table(table, ["schema"])
+                print(f"테이블 --{self.table_id}-- 컬럼 추가: {', '.join(field.name for field in added_fields)}")
             return True
         except NotFound:
             # 테이블 스키마 정의
@@ -104,7 +118,10 @@ class BigQueryClient:
                 bigquery.SchemaField("losses", "INTEGER", mode="REQUIRED"),
                 bigquery.SchemaField("is_veteran", "BOOLEAN", mode="REQUIRED"),
                 bigquery.SchemaField("is_hot_streak", "BOOLEAN", mode="REQUIRED"),
-                bigquery.SchemaField("collected_at", "TIMESTAMP", mode="REQUIRED")
+                bigquery.SchemaField("collected_at", "TIMESTAMP", mode="REQUIRED"),
+                bigquery.SchemaField("platform_id", "STRING", mode="NULLABLE"),
+                bigquery.SchemaField("tier", "STRING", mode="NULLABLE"),
+                bigquery.SchemaField("rank", "STRING", mode="NULLABLE")
             ]
 
             table = bigquery.Table(table_ref, schema=schema)
@@ -120,7 +137,7 @@ class BigQueryClient:
             print(f"테이블 --{self.table_id}-- 생성 완료")
             return True
     
-    def insert_challenger_data(self, data: List[Dict]):
+    def insert_challenger_data(self, data: List[ChallengerRecord]):
         """챌린저 데이터 bigquery에 삽입 MERGE 쿼리로 UPSERT (중복 방지)"""
 
         if not data:
@@ -130,7 +147,7 @@ class BigQueryClient:
         # STRUCT 배열용 데이터 준비
         struct_rows = []
         for row in data:
-            struct_row = f"STRUCT('{row['puuid']}' AS puuid, {row['league_points']} AS league_points, {row['wins']} AS wins, {row['losses']} AS losses, {row['is_veteran']} AS is_veteran, {row['is_hot_streak']} AS is_hot_streak, TIMESTAMP('{row['collected_at'].isoformat()}') AS collected_at)"
+            struct_row = f"STRUCT('{row.puuid}' AS puuid, {row.league_points} AS league_points, {row.wins} AS wins, {row.losses} AS losses, {row.is_veteran} AS is_veteran, {row.is_hot_streak} AS is_hot_streak, TIMESTAMP('{row.collected_at.isoformat()}') AS collected_at, '{row.platform_id}' AS platform_id, '{row.tier}' AS tier, '{row.rank}' AS rank)"
             struct_rows.append(struct_row)
         
         # MERGE 쿼리 (STRUCT 배열 사용)
@@ -148,11 +165,14 @@ class BigQueryClient:
             losses = source.losses,
             is_veteran = source.is_veteran,
             is_hot_streak = source.is_hot_streak,
-            collected_at = source.collected_at
+            collected_at = source.collected_at,
+            platform_id = source.platform_id,
+            tier = source.tier,
+            rank = source.rank
 
         WHEN NOT MATCHED THEN
-            INSERT (puuid, league_points, wins, losses, is_veteran, is_hot_streak, collected_at)
-            VALUES (source.puuid, source.league_points, source.wins, source.losses, source.is_veteran, source.is_hot_streak, source.collected_at)
+            INSERT (puuid, league_points, wins, losses, is_veteran, is_hot_streak, collected_at, platform_id, tier, rank)
+            VALUES (source.puuid, source.league_points, source.wins, source.losses, source.is_veteran, source.is_hot_streak, source.collected_at, source.platform_id, source.tier, source.rank)
         """
 
         try:
@@ -170,34 +190,34 @@ class BigQueryClient:
     def create_match_tables_if_not_exists(self):
         """매치 관련 테이블 생성"""
         return self.schema_manager.create_all_tables()
-    
 
-    def insert_match_data(self, matches_data: List[Dict]) -> bool:
-        """매치 기본 데이터 bigquery에 삽입 MERGE 쿼리로 UPSERT (중복 방지)"""
+    def create_timeline_table_if_not_exists(self):
+        """매치 타임라인 프레임 테이블 생성"""
+        return self.schema_manager.create_match_timeline_frames_table()
+    
 
-        if not matches_data:
-            print("저장할 매치 데이터가 없습니다.")
-            return True
+    def _match_merge_query(self, matches_data: List[MatchRecord]) -> str:
+        """매치 기본 데이터 MERGE 쿼리 (STRUCT 배열)"""
 
         # STRUCT 배열용 데이터 준비
         struct_rows = []
         for match in matches_data:
-            game_end_ts = f"TIMESTAMP('{match['game_end_timestamp'].strftime('%Y-%m-%d %H:%M:%S')}')" if match.get("game_end_timestamp") else "NULL"
-            teams_data_json = json.dumps(match["teams_data"], ensure_ascii=False).replace("'", "\\'")
+            game_end_ts = f"TIMESTAMP('{match.game_end_timestamp.strftime('%Y-%m-%d %H:%M:%S')}')" if match.game_end_timestamp else "NULL"
+            teams_data_json = json.dumps(match.teams_data, ensure_ascii=False).replace("'", "\\'")
             
             struct_row = f"""STRUCT(
-                '{match["match_id"]}' AS match_id,
-                '{match.get("data_version", "1.0")}' AS data_version,
-                TIMESTAMP('{match["game_creation"].strftime('%Y-%m-%d %H:%M:%S')}') AS game_creation,
-                {match["game_duration"]} AS game_duration,
-                '{match["game_mode"]}' AS game_mode,
-                '{match.get("game_type", "MATCHED_GAME")}' AS game_type,
-                '{match.get("game_version", "14.18.1")}' AS game_version,
-                {match["queue_id"]} AS queue_id,
-                {match.get("map_id", 11)} AS map_id,
-                '{match.get("platform_id", "KR")}' AS platform_id,
+                '{match.match_id}' AS match_id,
+                '{match.data_version}' AS data_version,
+                TIMESTAMP('{match.game_creation.strftime('%Y-%m-%d %H:%M:%S')}') AS game_creation,
+                {match.game_duration} AS game_duration,
+                '{match.game_mode}' AS game_mode,
+                '{match.game_type}' AS game_type,
+                '{match.game_version}' AS game_version,
+                {match.queue_id} AS queue_id,
+                {match.map_id} AS map_id,
+                '{match.platform_id}' AS platform_id,
                 {game_end_ts} AS game_end_timestamp,
-                {match["participants_count"]} AS participants_count,
+                {match.participants_count} AS participants_count,
                 PARSE_JSON('{teams_data_json}') AS teams_data,
                 TIMESTAMP('{datetime.now(ZoneInfo("Asia/Seoul")).isoformat()}') AS collected_at
             )"""
@@ -231,6 +251,16 @@ class BigQueryClient:
             INSERT (match_id, data_version, game_creation, game_duration, game_mode, game_type, game_version, queue_id, map_id, platform_id, game_end_timestamp, participants_count, teams_data, collected_at)
             VALUES (source.match_id, source.data_version, source.game_creation, source.game_duration, source.game_mode, source.game_type, source.game_version, source.queue_id, source.map_id, source.platform_id, source.game_end_timestamp, source.participants_count, source.teams_data, source.collected_at)
         """
+        return merge_query
+
+    def insert_match_data(self, matches_data: List[MatchRecord]) -> bool:
+        """매치 기본 데이터 bigquery에 삽입 MERGE 쿼리로 UPSERT (중복 방지)"""
+
+        if not matches_data:
+            print("저장할 매치 데이터가 없습니다.")
+            return True
+
+        merge_query = self._match_merge_query(matches_data)
 
         try:
             query_job = self.client.query(merge_query)
@@ -245,127 +275,235 @@ class BigQueryClient:
 
 
         
-    def insert_participants_data(self, participants_data: List[Dict]) -> bool:
+    def _participants_merge_query(self, participants_data: List[ParticipantRecord]) -> str:
+        """매치 참가자 데이터 MERGE 쿼리 (STRUCT 배열, 행 인코딩과 컬럼 목록은 match_fields.PARTICIPANT_FIELDS에서 생성)"""
+
+        struct_rows = [encode_participant_struct(participant) for participant in participants_data]
+        return self._merge_statement(
+            "match_participants",
+            f"SELECT * FROM UNNEST([{', '.join(struct_rows)}])",
+            [field.column for field in PARTICIPANT_FIELDS],
+            PARTICIPANT_KEY_COLUMNS
+        )
+
+    def _merge_statement(self, table_id: str, source_query: str, columns: List[str], key_columns: Sequence[str]) -> str:
+        """source_query 결과를 키 컬럼 기준으로 대상 테이블에 UPSERT하는 MERGE 쿼리"""
+
+        return f"""
+        MERGE `{self.project_id}.{self.dataset_id}.{table_id}` AS target
+        USING (
+            {source_query}
+        ) AS source
+        ON {' AND '.join(f'target.{name} = source.{name}' for name in key_columns)}
+
+        WHEN MATCHED THEN
+            UPDATE SET
+            {', '.join(f'{name} = source.{name}' for name in columns if name not in key_columns)}
+
+        WHEN NOT MATCHED THEN
+            INSERT ({', '.join(columns)})
+            VALUES ({', '.join(f'source.{name}' for name in columns)})
+        """
+
+    def insert_participants_data(self, participants_data: List[ParticipantRecord]) -> bool:
         """매치 상세 정보 bigquery에 삽입 MERGE 쿼리로 UPSERT (중복 방지)"""
 
         if not participants_data:
             print("저장할 매치 상세 데이터가 없습니다.")
             return True
 
+        merge_query = self._participants_merge_query(participants_data)
+
+        try:
+            query_job = self.client.query(merge_query)
+            result = query_job.result()
+
+            print(f"MERGE 완료 - 처리된 행: {query_job.num_dml_affected_rows}개")
+            return True
+            
+        except Exception as e:
+            print(f"MERGE 실패: {e}")
+            return False
+
+
+    def insert_timeline_frames(self, frames_data: List[Dict]) -> bool:
+        """타임라인 프레임 bigquery에 삽입 MERGE 쿼리로 UPSERT (중복 방지)"""
+
+        if not frames_data:
+            return True
+
+        def nullable_int(value):
+            return "NULL" if value is None else str(int(value))
+
         # STRUCT 배열용 데이터 준비
         struct_rows = []
-        for participant in participants_data:
-            # NULL 처리 함수
-            def safe_str(value):
-                return f"'{value}'" if value is not None else "NULL"
-            
-            def safe_int(value):
-                return str(value) if value is not None else "NULL"
-            
-            # JSON 문자열 이스케이프 처리
-            detailed_stats_json = json.dumps(participant["detailed_stats"], ensure_ascii=False).replace("'", "\\'")
-            
-            struct_row = f"""STRUCT(
-                '{participant["match_id"]}' AS match_id,
-                {participant["participant_id"]} AS participant_id,
-                '{participant["puuid"]}' AS puuid,
-                {safe_str(participant["summoner_name"])} AS summoner_name,
-                {safe_str(participant["riot_id_game_name"])} AS riot_id_game_name,
-                {safe_str(participant["riot_id_tagline"])} AS riot_id_tagline,
-                {safe_int(participant["summoner_level"])} AS summoner_level,
-                {participant["champion_id"]} AS champion_id,
-                '{participant["champion_name"]}' AS champion_name,
-                {participant["champion_level"]} AS champion_level,
-                {participant["win"]} AS win,
-                {participant["team_id"]} AS team_id,
-                {safe_str(participant["team_position"])} AS team_position,
-                {safe_str(participant["individual_position"])} AS individual_position,
-                {participant["kills"]} AS kills,
-                {participant["deaths"]} AS deaths,
-                {participant["assists"]} AS assists,
-                {participant["total_minions_killed"]} AS total_minions_killed,
-                {participant["neutral_minions_killed"]} AS neutral_minions_killed,
-                {participant["gold_earned"]} AS gold_earned,
-                {participant["total_damage_dealt_to_champions"]} AS total_damage_dealt_to_champions,
-                {participant["vision_score"]} AS vision_score,
-                {safe_int(participant["item0"])} AS item0,
-                {safe_int(participant["item1"])} AS item1,
-                {safe_int(participant["item2"])} AS item2,
-                {safe_int(participant["item3"])} AS item3,
-                {safe_int(participant["item4"])} AS item4,
-                {safe_int(participant["item5"])} AS item5,
-                {safe_int(participant["item6"])} AS item6,
-                {safe_int(participant["summoner1_id"])} AS summoner1_id,
-                {safe_int(participant["summoner2_id"])} AS summoner2_id,
-                {safe_int(participant["placement"])} AS placement,
-                {safe_int(participant["subteam_placement"])} AS subteam_placement,
-                PARSE_JSON('{detailed_stats_json}') AS detailed_stats,
-                TIMESTAMP('{participant["game_creation"].strftime('%Y-%m-%d %H:%M:%S')}') AS game_creation,
-                TIMESTAMP('{participant["collected_at"].strftime('%Y-%m-%d %H:%M:%S')}') AS collected_at
-            )"""
+        for frame in frames_data:
+            # 행 수가 많아 쿼리 길이 제한(1MB)에 걸리지 않도록 한 줄로 구성
+            struct_row = (
+                f"STRUCT('{frame['match_id']}' AS match_id, {frame['minute']} AS minute, {frame['participant_id']} AS participant_id, "
+                f"{nullable_int(frame.get('total_gold'))} AS total_gold, {nullable_int(frame.get('current_gold'))} AS current_gold, "
+                f"{nullable_int(frame.get('xp'))} AS xp, {nullable_int(frame.get('level'))} AS level, "
+                f"{nullable_int(frame.get('minions_killed'))} AS minions_killed, {nullable_int(frame.get('jungle_minions_killed'))} AS jungle_minions_killed, "
+                f"{nullable_int(frame.get('position_x'))} AS position_x, {nullable_int(frame.get('position_y'))} AS position_y, "
+                f"TIMESTAMP('{frame['collected_at'].isoformat()}') AS collected_at)"
+            )
             struct_rows.append(struct_row)
-        
+
         # MERGE 쿼리 (STRUCT 배열 사용)
         merge_query = f"""
-        MERGE `{self.project_id}.{self.dataset_id}.match_participants` AS target
+        MERGE `{self.project_id}.{self.dataset_id}.match_timeline_frames` AS target
         USING (
             SELECT * FROM UNNEST([{', '.join(struct_rows)}])
         ) AS source
-        ON target.match_id = source.match_id AND target.puuid = source.puuid
+        ON target.match_id = source.match_id AND target.minute = source.minute AND target.participant_id = source.participant_id
 
         WHEN MATCHED THEN
             UPDATE SET
-            participant_id = source.participant_id,
-            summoner_name = source.summoner_name,
-            riot_id_game_name = source.riot_id_game_name,
-            riot_id_tagline = source.riot_id_tagline,
-            summoner_level = source.summoner_level,
-            champion_id = source.champion_id,
-            champion_name = source.champion_name,
-            champion_level = source.champion_level,
-            win = source.win,
-            team_id = source.team_id,
-            team_position = source.team_position,
-            individual_position = source.individual_position,
-            kills = source.kills,
-            deaths = source.deaths,
-            assists = source.assists,
-            total_minions_killed = source.total_minions_killed,
-            neutral_minions_killed = source.neutral_minions_killed,
-            gold_earned = source.gold_earned,
-            total_damage_dealt_to_champions = source.total_damage_dealt_to_champions,
-            vision_score = source.vision_score,
-            item0 = source.item0,
-            item1 = source.item1,
-            item2 = source.item2,
-            item3 = source.item3,
-            item4 = source.item4,
-            item5 = source.item5,
-            item6 = source.item6,
-            summoner1_id = source.summoner1_id,
-            summoner2_id = source.summoner2_id,
-            placement = source.placement,
-            subteam_placement = source.subteam_placement,
-            detailed_stats = source.detailed_stats,
-            game_creation = source.game_creation,
+            total_gold = source.total_gold,
+            current_gold = source.current_gold,
+            xp = source.xp,
+            level = source.level,
+            minions_killed = source.minions_killed,
+            jungle_minions_killed = source.jungle_minions_killed,
+            position_x = source.position_x,
+            position_y = source.position_y,
             collected_at = source.collected_at
 
         WHEN NOT MATCHED THEN
-            INSERT (match_id, participant_id, puuid, summoner_name, riot_id_game_name, riot_id_tagline, summoner_level, champion_id, champion_name, champion_level, win, team_id, team_position, individual_position, kills, deaths, assists, total_minions_killed, neutral_minions_killed, gold_earned, total_damage_dealt_to_champions, vision_score, item0, item1, item2, item3, item4, item5, item6, summoner1_id, summoner2_id, placement, subteam_placement, detailed_stats, game_creation, collected_at)
-            VALUES (source.match_id, source.participant_id, source.puuid, source.summoner_name, source.riot_id_game_name, source.riot_id_tagline, source.summoner_level, source.champion_id, source.champion_name, source.champion_level, source.win, source.team_id, source.team_position, source.individual_position, source.kills, source.deaths, source.assists, source.total_minions_killed, source.neutral_minions_killed, source.gold_earned, source.total_damage_dealt_to_champions, source.vision_score, source.item0, source.item1, source.item2, source.item3, source.item4, source.item5, source.item6, source.summoner1_id, source.summoner2_id, source.placement, source.subteam_placement, source.detailed_stats, source.game_creation, source.collected_at)
+            INSERT (match_id, minute, participant_id, total_gold, current_gold, xp, level, minions_killed, jungle_minions_killed, position_x, position_y, collected_at)
+            VALUES (source.match_id, source.minute, source.participant_id, source.total_gold, source.current_gold, source.xp, source.level, source.minions_killed, source.jungle_minions_killed, source.position_x, source.position_y, source.collected_at)
         """
 
         try:
             query_job = self.client.query(merge_query)
-            result = query_job.result()
+            query_job.result()
 
             print(f"MERGE 완료 - 처리된 행: {query_job.num_dml_affected_rows}개")
             return True
-            
+
+        except Exception as e:
+            print(f"MERGE 실패: {e}")
+            return False
+
+    def load_match_columns(self, batch) -> bool:
+        """매치 컬럼 배치(ColumnBatch) 저장 - 로드 작업으로 임시 테이블에 올린 뒤 MERGE"""
+        return self._load_and_merge(batch, "matches", ["match_id"])
+
+    def load_participant_columns(self, batch) -> bool:
+        """참가자 컬럼 배치(ColumnBatch) 저장 - 로드 작업으로 임시 테이블에 올린 뒤 MERGE"""
+        return self._load_and_merge(batch, "match_participants", PARTICIPANT_KEY_COLUMNS)
+
+    def _load_and_merge(self, batch, table_id: str, key_columns: Sequence[str]) -> bool:
+        """
+        컬럼 배치를 Parquet(또는 줄 단위 JSON) 파일로 임시 테이블에 로드하고 대상 테이블로 MERGE
+        행마다 SQL 문자열을 만들지 않아 쿼리 길이 제한이 없습니다.
+        Parquet는 JSON 컬럼을 문자열로 로드해 MERGE에서 PARSE_JSON으로 변환합니다.
+        """
+        if not len(batch):
+            return True
+
+        staging_ref = self.client.dataset(self.dataset_id).table(f"_staging_{table_id}_{uuid.uuid4().hex[:12]}")
+        load_file, source_format = batch.to_load_file()
+        json_as_string = source_format == "PARQUET"
+        job_config = bigquery.LoadJobConfig(
+            source_format=source_format,
+            schema=[
+                bigquery.SchemaField(name, "STRING" if bq_type == "JSON" and json_as_string else bq_type)
+                for name, bq_type in batch.schema
+            ],
+            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE
+        )
+
+        columns = [name for name, _ in batch.schema]
+        json_columns = [name for name, bq_type in batch.schema if bq_type == "JSON" and json_as_string]
+        source_select = (f"SELECT * REPLACE ({', '.join(f'PARSE_JSON({name}) AS {name}' for name in json_columns)})"
+                         if json_columns else "SELECT *")
+
+        merge_query = self._merge_statement(
+            table_id,
+            f"{source_select} FROM `{self.project_id}.{self.dataset_id}.{staging_ref.table_id}`",
+            columns,
+            key_columns
+        )
+
+        try:
+            self.client.load_table_from_file(load_file, staging_ref, job_config=job_config).result()
+            query_job = self.client.query(merge_query)
+            query_job.result()
+
+            print(f"MERGE 완료 ({source_format} 로드) - 처리된 행: {query_job.num_dml_affected_rows}개")
+            return True
+
         except Exception as e:
             print(f"MERGE 실패: {e}")
             return False
 
+        finally:
+            self.client.delete_table(staging_ref, not_found_ok=True)
+
+    def iter_known_match_ids(self, since: Optional[datetime] = None, page_size: int = 50000):
+        """matches 테이블의 match_id를 페이지 단위로 조회 (since 이후 수집분만 가능)"""
+
+        query = f"SELECT match_id FROM `{self.project_id}.{self.dataset_id}.matches`"
+        if since:
+            query += f" WHERE collected_at > TIMESTAMP('{since.isoformat()}')"
+
+        try:
+            rows = self.client.query(query).result(page_size=page_size)
+            for row in rows:
+                yield row.match_id
+
+        except Exception as e:
+            # 일부만 읽은 결과를 전체로 오인하지 않도록 호출자에게 전달
+            logger.error("기존 match_id 조회 실패", error=str(e))
+            raise
+
+    def fetch_challenger_games(self, puuids: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        challengers 테이블의 플레이어별 wins + losses (MERGE 전에 호출하면 이전 실행 스냅샷)
+        puuids를 넘기면 해당 플레이어만 조회합니다 (래더 전체를 저장하는 경우 메모리 절약).
+        """
+
+        query = f"SELECT puuid, wins + losses AS games FROM `{self.project_id}.{self.dataset_id}.{self.table_id}`"
+        job_config = None
+        if puuids is not None:
+            query += " WHERE puuid IN UNNEST(@puuids)"
+            job_config = bigquery.QueryJobConfig(
+                query_parameters=[bigquery.ArrayQueryParameter("puuids", "STRING", list(puuids))]
+            )
+
+        try:
+            rows = self.client.query(query, job_config=job_config).result()
+            return {row.puuid: row.games for row in rows}
+
+        except Exception as e:
+            logger.error("챌린저 스냅샷 조회 실패", error=str(e))
+            return {}
+
+    def fetch_player_watermarks(self, puuids: List[str]) -> Dict[str, int]:
+        """플레이어별 마지막 저장 매치의 game_creation을 epoch 초로 조회"""
+
+        if not puuids:
+            return {}
+
+        # game_creation은 KST 시각을 그대로 TIMESTAMP로 저장하므로 KST로 다시 해석해 epoch 변환
+        query = f"""
+        SELECT puuid, UNIX_SECONDS(TIMESTAMP(DATETIME(MAX(game_creation)), 'Asia/Seoul')) AS watermark
+        FROM `{self.project_id}.{self.dataset_id}.match_participants`
+        WHERE puuid IN UNNEST(@puuids)
+        GROUP BY puuid
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ArrayQueryParameter("puuids", "STRING", list(puuids))]
+        )
+
+        try:
+            rows = self.client.query(query, job_config=job_config).result()
+            return {row.puuid: row.watermark for row in rows}
+
+        except Exception as e:
+            logger.error("플레이어 기준점 조회 실패", error=str(e))
+            return {}
 
     def test_connection(self):
         """연결 테스트"""
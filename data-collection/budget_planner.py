@@ -0,0 +1,255 @@
+import os
+import json
+import math
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from typing import Dict, List, Optional, Tuple
+
+from riot_client import PLATFORM_ROUTING, MATCH_V5_DETAIL, APEX_LEAGUES
+from ladder_reader import parse_tiers, PAGED_TIERS, DIVISIONS
+from rate_limiter import parse_rate_limit_header
+from multi_region import parse_platforms
+
+logger = logging.getLogger(__name__)
+
+# 챌린저 리그 최대 인원, match-v5 ids 엔드포인트의 count 최대값 (예산 맞춤 탐색 상한)
+CHALLENGER_LEAGUE_SIZE = 300
+MAX_MATCHES_PER_PLAYER = 100
+
+
+class RunProfile:
+    """
+    최근 실행의 실측값 저장소 (로컬 디스크)
+    레이트 리미터가 기록한 평균 응답 시간, 조회한 매치 ID 중 중복/기저장으로 상세 조회하지 않은 비율,
+    캐시 적중률, API 수집 외 소요 시간(BigQuery 저장 등)을 실행마다 지수 이동 평균으로 갱신합니다.
+    """
+
+    SMOOTHING = 0.5  # 새 실행 값의 가중치
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.values: Dict = {}
+
+    def load(self) -> bool:
+        if not self.path or not os.path.exists(self.path):
+            return False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.values = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"실행 프로필 로드 실패, 기본값을 사용합니다: {e}")
+            self.values = {}
+            return False
+        return True
+
+    def save(self) -> bool:
+        """임시 파일에 쓴 뒤 교체"""
+        if not self.path:
+            return False
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.values, f)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            logger.warning(f"실행 프로필 저장 실패: {e}")
+            return False
+
+    def _blend(self, key: str, value: Optional[float]):
+        if value is None:
+            return
+        previous = self.values.get(key)
+        self.values[key] = value if previous is None else previous + self.SMOOTHING * (value - previous)
+
+    def record(self, rate_limit_stats: Dict, endpoint_stats: Dict, cache_stats: Dict,
+               listed_match_ids: int, total_duration: float, api_duration: float,
+               ladder_divisions: int = 0, ladder_division_pages: int = 0):
+        """
+        파이프라인 실행 결과 반영
+        endpoint_stats는 엔드포인트(여러 지역이면 "지역/엔드포인트")별 통계, api_duration은 매치/타임라인 수집에 걸린 시간입니다.
+        ladder_divisions는 페이지 제한 없이 끝까지 조회한 league-exp 디비전 수, ladder_division_pages는 그 페이지 요청 수입니다.
+        """
+        if rate_limit_stats.get('total_requests'):
+            self._blend('avg_response_time', rate_limit_stats.get('avg_response_time'))
+
+        detail_requests = sum(
+            stats.get('total_requests', 0) for endpoint, stats in endpoint_stats.items()
+            if endpoint.rsplit('/', 1)[-1] == MATCH_V5_DETAIL
+        )
+        cache_hits = cache_stats.get('cache_hits', 0)
+        unique_lookups = detail_requests + cache_hits
+        if listed_match_ids:
+            self._blend('dedup_ratio', min(1.0, max(0.0, 1 - unique_lookups / listed_match_ids)))
+        if unique_lookups:
+            self._blend('cache_hit_ratio', cache_hits / unique_lookups)
+
+        if ladder_divisions:
+            self._blend('ladder_pages_per_division', ladder_division_pages / ladder_divisions)
+
+        self._blend('overhead_seconds', max(0.0, total_duration - api_duration))
+        self.values['runs'] = self.values.get('runs', 0) + 1
+        self.values['updated_at'] = datetime.now(ZoneInfo("Asia/Seoul")).isoformat()
+
+
+class CollectionBudgetPlanner:
+    """
+    수집 규모(플랫폼별 챌린저 수, 플레이어당 매치 수)별 API 요청 수와 소요 시간 추정
+    지역마다 앱 레이트 리밋으로 정해지는 최소 시간과 평균 응답 시간/동시 요청 수로 정해지는 시간 중 큰 값을 쓰고,
+    지역끼리는 병렬이므로 가장 느린 지역이 전체 API 시간이 됩니다.
+    기준값(응답 시간, 중복 비율, 캐시 적중률, 기타 소요 시간)은 최근 실행 프로필을 쓰고 없으면 기본값을 씁니다.
+    API는 호출하지 않습니다.
+    """
+
+    DEFAULT_RESPONSE_TIME = 0.2
+    DEFAULT_DEDUP_RATIO = 0.2
+    DEFAULT_CACHE_HIT_RATIO = 0.0
+    DEFAULT_OVERHEAD_SECONDS = 60.0
+    DEFAULT_LADDER_PAGES_PER_DIVISION = 20.0  # 빈 마지막 페이지 포함
+
+    def __init__(self, config, profile: Optional[Dict] = None, response_time: Optional[float] = None,
+                 dedup_ratio: Optional[float] = None, cache_hit_ratio: Optional[float] = None):
+        self.config = config
+        self.platforms = parse_platforms(config.RIOT_PLATFORMS)
+        self.app_limits = parse_rate_limit_header(config.RIOT_APP_RATE_LIMITS)
+        self.timeline_limits = parse_rate_limit_header(config.TIMELINE_RATE_LIMITS)
+
+        queue_ids = [queue for queue in config.MATCH_QUEUE_IDS.split(',') if queue.strip()]
+        self.id_requests_per_player = max(1, len(queue_ids))
+        self.queue_filter_samples = config.QUEUE_FILTER_SAMPLE_PLAYERS if (queue_ids or config.MATCH_TYPE) else 0
+        self.ladder_tiers = [tier for tier in parse_tiers(config.LADDER_TIERS) if tier != "CHALLENGER"]
+
+        profile = profile or {}
+        self.source = 'profile' if profile.get('runs') else 'default'
+        self.response_time = self._pick(response_time, profile.get('avg_response_time'), self.DEFAULT_RESPONSE_TIME)
+        self.dedup_ratio = self._pick(dedup_ratio, profile.get('dedup_ratio'), self.DEFAULT_DEDUP_RATIO)
+        self.cache_hit_ratio = self._pick(cache_hit_ratio, profile.get('cache_hit_ratio'), self.DEFAULT_CACHE_HIT_RATIO)
+        self.overhead_seconds = self._pick(None, profile.get('overhead_seconds'), self.DEFAULT_OVERHEAD_SECONDS)
+        # 디비전당 페이지 수: 최대 페이지를 정했으면 그 값, 아니면 최근 실측값
+        self.ladder_pages_per_division = self._pick(
+            config.LADDER_MAX_PAGES or None, profile.get('ladder_pages_per_division'), self.DEFAULT_LADDER_PAGES_PER_DIVISION
+        )
+
+    @staticmethod
+    def _pick(*values):
+        return next(value for value in values if value is not None)
+
+    @staticmethod
+    def rate_limited_seconds(requests: int, limits: List[Tuple[int, int]]) -> float:
+        """빈 윈도우에서 시작해 requests개를 보낼 때 레이트 리밋상 필요한 최소 시간"""
+        if requests <= 0:
+            return 0.0
+        return float(max(((math.ceil(requests / count) - 1) * seconds for count, seconds in limits), default=0))
+
+    def _concurrency(self) -> int:
+        engine = self.config.COLLECTION_ENGINE
+        if engine == "async":
+            return self.config.ASYNC_MAX_CONCURRENCY
+        if engine in ("threaded", "staged"):
+            return self.config.THREAD_POOL_WORKERS
+        return 1
+
+    def _ladder_requests(self) -> int:
+        """챌린저 아래 래더 티어 조회 요청 수 (최상위 리그는 1회, league-exp 티어는 디비전별 페이지 수)"""
+        apex = sum(1 for tier in self.ladder_tiers if tier in APEX_LEAGUES)
+        paged = sum(len(DIVISIONS) for tier in self.ladder_tiers if tier in PAGED_TIERS)
+        return apex + math.ceil(paged * self.ladder_pages_per_division)
+
+    def _platform_requests(self, players: int, matches_per_player: int) -> Dict[str, int]:
+        listed = players * matches_per_player
+        new_matches = math.ceil(listed * (1 - self.dedup_ratio))
+        return {
+            'league': 1,
+            'ladder': self._ladder_requests(),
+            'match_ids': players * self.id_requests_per_player + min(players, self.queue_filter_samples),
+            'match_details': math.ceil(new_matches * (1 - self.cache_hit_ratio)),
+            'timelines': new_matches if self.config.TIMELINE_ENABLED else 0,
+            'new_matches': new_matches
+        }
+
+    def estimate(self, challenger_count: int, matches_per_player: int) -> Dict:
+        """주어진 수집 규모의 예상 요청 수와 소요 시간"""
+        players = min(challenger_count, CHALLENGER_LEAGUE_SIZE)
+        platform_requests = self._platform_requests(players, matches_per_player)
+        collection_requests = sum(platform_requests[key] for key in ('league', 'ladder', 'match_ids', 'match_details'))
+        timeline_requests = platform_requests['timelines']
+        concurrency = self._concurrency()
+
+        # 플랫폼 하나의 응답 시간 기준 소요 시간 (래더 페이지는 순서대로 조회, sync 엔진은 플레이어 사이 대기 포함)
+        ladder_latency = platform_requests['ladder'] * self.response_time
+        collection_latency = ladder_latency + (collection_requests - platform_requests['ladder']) * self.response_time / concurrency
+        if self.config.COLLECTION_ENGINE == "sync":
+            collection_latency += max(0, players - 1) * self.config.PLAYER_BATCH_DELAY
+        timeline_latency = timeline_requests * self.response_time / max(1, self.config.TIMELINE_WORKERS)
+
+        region_platforms: Dict[str, int] = {}
+        for platform in self.platforms:
+            region = PLATFORM_ROUTING[platform]
+            region_platforms[region] = region_platforms.get(region, 0) + 1
+
+        region_seconds = {}
+        bottlenecks = {}
+        for region, platform_count in region_platforms.items():
+            collection_rate = self.rate_limited_seconds(collection_requests * platform_count, self.app_limits)
+            timeline_rate = max(self.rate_limited_seconds(timeline_requests * platform_count, self.app_limits),
+                                self.rate_limited_seconds(timeline_requests, self.timeline_limits))
+            region_seconds[region] = max(collection_rate, collection_latency) + max(timeline_rate, timeline_latency)
+            bottlenecks[region] = 'rate_limit' if collection_rate + timeline_rate >= collection_latency + timeline_latency else 'latency'
+
+        platform_count = len(self.platforms)
+        requests = {key: value * platform_count for key, value in platform_requests.items() if key != 'new_matches'}
+        requests['total'] = sum(requests.values())
+        api_seconds = max(region_seconds.values())
+
+        return {
+            'challenger_count': players,
+            'matches_per_player': matches_per_player,
+            'platforms': self.platforms,
+            'engine': self.config.COLLECTION_ENGINE,
+            'requests': requests,
+            'requests_by_region': {
+                region: (collection_requests + timeline_requests) * count for region, count in region_platforms.items()
+            },
+            'expected_new_matches': platform_requests['new_matches'] * platform_count,
+            'api_seconds': round(api_seconds, 1),
+            'overhead_seconds': round(self.overhead_seconds, 1),
+            'estimated_seconds': round(api_seconds + self.overhead_seconds, 1),
+            'bottleneck_by_region': bottlenecks,
+            'assumptions': {
+                'source': self.source,
+                'avg_response_time': round(self.response_time, 3),
+                'dedup_ratio': round(self.dedup_ratio, 3),
+                'cache_hit_ratio': round(self.cache_hit_ratio, 3),
+                'ladder_tiers': self.ladder_tiers,
+                'ladder_pages_per_division': round(self.ladder_pages_per_division, 1),
+                'concurrency': concurrency,
+                'app_rate_limits': self.config.RIOT_APP_RATE_LIMITS
+            }
+        }
+
+    def fit(self, budget_seconds: float, max_challengers: int = CHALLENGER_LEAGUE_SIZE,
+            max_matches: int = MAX_MATCHES_PER_PLAYER) -> Optional[Dict]:
+        """
+        시간 예산 안에서 수집 매치 ID 수(챌린저 수 x 플레이어당 매치 수)가 가장 많은 규모 선택
+        같은 규모면 챌린저 수가 많은 쪽을 고르고, 가장 작은 규모(1명, 1매치)도 넘으면 None을 반환합니다.
+        """
+        max_challengers = min(max_challengers, CHALLENGER_LEAGUE_SIZE)
+        best = None
+        for matches_per_player in range(1, max_matches + 1):
+            # 소요 시간은 챌린저 수에 대해 단조 증가하므로 이분 탐색
+            low, high = 0, max_challengers
+            while low < high:
+                mid = (low + high + 1) // 2
+                if self.estimate(mid, matches_per_player)['estimated_seconds'] <= budget_seconds:
+                    low = mid
+                else:
+                    high = mid - 1
+            if low and (best is None or low * matches_per_player > best[0] * best[1]):
+                best = (low, matches_per_player)
+
+        if best is None:
+            return None
+        return {**self.estimate(*best), 'budget_seconds': budget_seconds}
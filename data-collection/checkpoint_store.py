@@ -0,0 +1,145 @@
+import os
+import json
+import threading
+import logging
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineCheckpoint:
+    """
+    파이프라인 진행 상황 체크포인트 (로컬 디스크)
+    매치 ID 조회를 마친 플레이어별로 그때 받은 match_id, 저장을 마친 match_id와 배치 수를 기록합니다.
+    수집 계획에 쓴 이전 챌린저 스냅샷도 함께 보관해, 재개한 실행이 같은 기준으로 대상을 고릅니다.
+    중단 후 다시 실행하면 끝난 플레이어는 건너뛰고, 조회만 하고 저장하지 못한 매치부터 처리합니다.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: str, save_every: int = 10, max_age_hours: float = 12):
+        self.path = path
+        self.save_every = save_every
+        self.max_age = timedelta(hours=max_age_hours)
+
+        self.started_at = datetime.now(ZoneInfo("Asia/Seoul"))
+        self.player_match_ids: Dict[str, List[str]] = {}
+        self.match_ids = set()
+        self.written_match_ids = set()
+        self.written_batches = 0
+        self.activity_baseline: Optional[Dict[str, int]] = None
+
+        self._lock = threading.Lock()
+        self._unsaved_players = 0
+
+    def load(self) -> bool:
+        """이전 실행의 체크포인트 로드 (없거나 오래됐으면 새로 시작)"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+
+            if state.get('version') != self.VERSION:
+                logger.info(f"다른 형식의 체크포인트 무시: 버전 {state.get('version')}")
+                self.clear()
+                return False
+
+            started_at = datetime.fromisoformat(state['started_at'])
+            if datetime.now(ZoneInfo("Asia/Seoul")) - started_at > self.max_age:
+                logger.info(f"오래된 체크포인트 무시: {state['started_at']}")
+                self.clear()
+                return False
+
+            player_match_ids = {puuid: list(match_ids) for puuid, match_ids in state['player_match_ids'].items()}
+            written_match_ids = set(state.get('written_match_ids', []))
+            written_batches = int(state.get('written_batches', 0))
+            activity_baseline = state.get('activity_baseline')
+        except OSError as e:
+            logger.warning(f"체크포인트 로드 실패, 새로 시작합니다: {e}")
+            return False
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # JSON은 맞지만 일부만 쓰였거나 형식이 다른 파일 (다음 저장이 덮어쓰기 전에 삭제)
+            logger.warning(f"체크포인트 형식 오류, 무시하고 새로 시작합니다: {e!r}")
+            self.clear()
+            return False
+
+        self.started_at = started_at
+        self.player_match_ids = player_match_ids
+        self.match_ids = {match_id for match_ids in player_match_ids.values() for match_id in match_ids}
+        self.written_match_ids = written_match_ids
+        self.written_batches = written_batches
+        self.activity_baseline = activity_baseline
+        return True
+
+    def save(self) -> bool:
+        """임시 파일에 쓴 뒤 교체 (중간에 죽어도 이전 체크포인트 유지)"""
+        if not self.path:
+            return False
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with self._lock:
+                state = {
+                    'version': self.VERSION,
+                    'started_at': self.started_at.isoformat(),
+                    'updated_at': datetime.now(ZoneInfo("Asia/Seoul")).isoformat(),
+                    'player_match_ids': self.player_match_ids,
+                    'written_match_ids': sorted(self.written_match_ids),
+                    'written_batches': self.written_batches,
+                    'activity_baseline': self.activity_baseline
+                }
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.path)
+                self._unsaved_players = 0
+            return True
+        except OSError as e:
+            logger.warning(f"체크포인트 저장 실패: {e}")
+            return False
+
+    def clear(self):
+        """실행이 끝까지 성공하면 체크포인트 삭제"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def is_player_done(self, puuid: str) -> bool:
+        with self._lock:
+            return puuid in self.player_match_ids
+
+    def record_player(self, puuid: str, match_ids: Iterable[str]):
+        """플레이어의 매치 ID 조회 완료 기록 (save_every명마다 디스크에 저장)"""
+        match_ids = list(match_ids)
+        with self._lock:
+            self.match_ids.update(match_ids)
+            self.player_match_ids[puuid] = match_ids
+            self._unsaved_players += 1
+            should_save = self._unsaved_players >= self.save_every
+
+        if should_save:
+            self.save()
+
+    def pending_match_ids(self) -> List[str]:
+        """조회는 했지만 아직 저장하지 않은 match_id"""
+        with self._lock:
+            return sorted(self.match_ids - self.written_match_ids)
+
+    def mark_written(self, match_ids: Iterable[str]):
+        """배치 저장 완료 기록"""
+        with self._lock:
+            self.written_match_ids.update(match_ids)
+            self.written_batches += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'checkpoint_completed_players': len(self.player_match_ids),
+                'checkpoint_match_ids': len(self.match_ids),
+                'checkpoint_written_match_ids': len(self.written_match_ids),
+                'checkpoint_written_batches': self.written_batches
+            }
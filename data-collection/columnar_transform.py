@@ -0,0 +1,226 @@
+import io
+import json
+import logging
+from datetime import datetime
+from itertools import repeat
+from zoneinfo import ZoneInfo
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+from match_decoder import RAW_PARTICIPANT_KEY
+from match_fields import PARTICIPANT_FIELDS, WHOLE_PARTICIPANT
+
+# pyarrow 사용 가능한지 확인 (없으면 줄 단위 JSON으로 로드)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+KST = ZoneInfo("Asia/Seoul")
+
+# (컬럼명, BigQuery 타입) - MatchDataSchema 테이블 컬럼 순서와 동일
+MATCH_COLUMNS = [
+    ("match_id", "STRING"), ("data_version", "STRING"), ("game_creation", "TIMESTAMP"),
+    ("game_duration", "INTEGER"), ("game_mode", "STRING"), ("game_type", "STRING"),
+    ("game_version", "STRING"), ("queue_id", "INTEGER"), ("map_id", "INTEGER"),
+    ("platform_id", "STRING"), ("game_end_timestamp", "TIMESTAMP"), ("participants_count", "INTEGER"),
+    ("teams_data", "JSON"), ("collected_at", "TIMESTAMP")
+]
+
+# 참가자 컬럼은 match_fields.PARTICIPANT_FIELDS에서 생성 (MatchDataSchema, extract_participants_data와 같은 선언)
+PARTICIPANT_COLUMNS = [(field.column, field.bq_type) for field in PARTICIPANT_FIELDS]
+
+# 참가자 응답 필드를 그대로 옮기는 컬럼 (컬럼명, API 필드, 기본값)
+_PARTICIPANT_SOURCE_FIELDS = [
+    (field.column, field.source, field.default) for field in PARTICIPANT_FIELDS
+    if field.source not in (None, WHOLE_PARTICIPANT)
+]
+
+# MERGE 경로가 KST 시각을 시간대 없이(strftime) 넣어 온 컬럼 - 기존 데이터와 같은 값이 되도록 로드 시에도 KST 벽시계 시각 사용
+MATCH_WALL_CLOCK_COLUMNS = frozenset({"game_creation", "game_end_timestamp"})
+PARTICIPANT_WALL_CLOCK_COLUMNS = frozenset(field.column for field in PARTICIPANT_FIELDS if field.wall_clock)
+
+if PYARROW_AVAILABLE:
+    _ARROW_TYPES = {
+        "STRING": pa.string(), "JSON": pa.string(), "INTEGER": pa.int64(),
+        "BOOLEAN": pa.bool_(), "TIMESTAMP": pa.timestamp("us", tz="UTC")
+    }
+
+
+def _json_encoder(bq_type: str, wall_clock: bool):
+    """줄 단위 JSON 로드용 값 인코딩 함수 (JSON 컬럼은 이미 JSON 문자열이므로 그대로 삽입)"""
+    if bq_type == "JSON":
+        return lambda value: "null" if value is None else value
+    if bq_type == "STRING":
+        return lambda value: "null" if value is None else json.dumps(value, ensure_ascii=False)
+    if bq_type == "BOOLEAN":
+        return lambda value: "null" if value is None else ("true" if value else "false")
+    if bq_type == "TIMESTAMP":
+        if wall_clock:
+            return lambda value: "null" if value is None else f'"{value.replace(tzinfo=None).isoformat(sep=" ")}"'
+        return lambda value: "null" if value is None else f'"{value.isoformat(sep=" ")}"'
+    return lambda value: "null" if value is None else str(int(value))
+
+
+class ColumnBatch:
+    """
+    한 테이블의 컬럼 버퍼 (컬럼명 -> 값 목록)
+    BigQuery 로드 작업에 넘길 파일로 바로 직렬화합니다 (pyarrow가 있으면 Parquet, 없으면 줄 단위 JSON).
+    JSON 컬럼은 JSON 문자열로 들고 있다가 Parquet에서는 문자열 컬럼으로(MERGE에서 PARSE_JSON),
+    줄 단위 JSON에서는 다시 이스케이프하지 않고 값 자리에 그대로 넣습니다.
+    """
+
+    def __init__(self, schema: Sequence[Tuple[str, str]], wall_clock_columns: FrozenSet[str] = frozenset()):
+        self.schema = list(schema)
+        self.wall_clock_columns = wall_clock_columns
+        self.columns: Dict[str, List] = {name: [] for name, _ in self.schema}
+
+    def __len__(self) -> int:
+        return len(self.columns[self.schema[0][0]])
+
+    def column(self, name: str) -> List:
+        return self.columns[name]
+
+    def _timestamps(self, name: str) -> List:
+        values = self.columns[name]
+        if name in self.wall_clock_columns:
+            return [None if value is None else value.replace(tzinfo=None) for value in values]
+        return values
+
+    def to_record_batch(self):
+        """Arrow RecordBatch로 변환 (pyarrow 필요)"""
+        arrays = [
+            pa.array(self._timestamps(name) if bq_type == "TIMESTAMP" else self.columns[name], type=_ARROW_TYPES[bq_type])
+            for name, bq_type in self.schema
+        ]
+        return pa.RecordBatch.from_arrays(arrays, names=[name for name, _ in self.schema])
+
+    def to_load_file(self) -> Tuple[io.BytesIO, str]:
+        """BigQuery 로드 작업용 파일과 형식(PARQUET 또는 NEWLINE_DELIMITED_JSON) 반환"""
+        if PYARROW_AVAILABLE:
+            buffer = io.BytesIO()
+            pq.write_table(pa.Table.from_batches([self.to_record_batch()]), buffer)
+            buffer.seek(0)
+            return buffer, "PARQUET"
+
+        # 컬럼별로 값을 인코딩해 행 템플릿에 채움 (지연 평가, 인코딩된 바이트로 바로 써서 중간 사본 없음)
+        template = "{" + ",".join(f'"{name}":%s' for name, _ in self.schema) + "}\n"
+        encoded = [
+            map(_json_encoder(bq_type, name in self.wall_clock_columns), self.columns[name])
+            for name, bq_type in self.schema
+        ]
+        buffer = io.BytesIO()
+        text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+        text.writelines(template % row for row in zip(*encoded))
+        text.flush()
+        text.detach()
+        buffer.seek(0)
+        return buffer, "NEWLINE_DELIMITED_JSON"
+
+    def encode(self, keep_columns: Sequence[str] = ()) -> "EncodedColumnBatch":
+        """로드 파일로 직렬화한 배치 반환 (keep_columns 컬럼 값만 함께 보관)"""
+        load_file, source_format = self.to_load_file()
+        return EncodedColumnBatch(self.schema, len(self), load_file.getvalue(), source_format,
+                                  {name: self.columns[name] for name in keep_columns})
+
+
+class EncodedColumnBatch:
+    """
+    로드 파일로 직렬화를 마친 컬럼 배치 (프로세스 풀 변환 결과, 피클로 프로세스 사이에 전달)
+    ColumnBatch와 같은 방식(schema, len, to_load_file)으로 저장하고, 값은 저장 후처리에 필요한 컬럼만 들고 있습니다.
+    """
+
+    def __init__(self, schema: Sequence[Tuple[str, str]], rows: int, payload: bytes, source_format: str,
+                 columns: Dict[str, List]):
+        self.schema = list(schema)
+        self.rows = rows
+        self.payload = payload
+        self.source_format = source_format
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> List:
+        return self.columns[name]
+
+    def to_load_file(self) -> Tuple[io.BytesIO, str]:
+        return io.BytesIO(self.payload), self.source_format
+
+
+class ColumnarMatchTransformer:
+    """
+    매치 응답을 행 dict 없이 컬럼 버퍼로 변환
+    매치/참가자 필드를 컬럼별 목록에 바로 채우고, flush()로 (매치, 참가자) ColumnBatch를 넘긴 뒤 비웁니다.
+    값은 extract_match_data/extract_participants_data와 같습니다.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.matches = ColumnBatch(MATCH_COLUMNS, MATCH_WALL_CLOCK_COLUMNS)
+        self.participants = ColumnBatch(PARTICIPANT_COLUMNS, PARTICIPANT_WALL_CLOCK_COLUMNS)
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    def append(self, match_data: Dict):
+        """매치 하나를 버퍼에 추가"""
+        if not match_data:
+            return
+
+        metadata = match_data.get("metadata", {})
+        info = match_data.get("info", {})
+        match_id = metadata.get("matchId")
+        participants = info.get("participants", [])
+        count = len(participants)
+        game_creation = datetime.fromtimestamp(info.get("gameCreation", 0) / 1000, tz=KST)
+        game_end_timestamp = info.get("gameEndTimestamp")
+        collected_at = datetime.now(KST)
+
+        # 값을 모두 계산한 뒤에 버퍼에 추가 (도중에 실패한 매치가 컬럼 길이를 어긋나게 만들지 않도록)
+        match_values = {
+            "match_id": match_id,
+            "data_version": metadata.get("dataVersion", "1.0"),
+            "game_creation": game_creation,
+            "game_duration": info.get("gameDuration", 0),
+            "game_mode": info.get("gameMode", "CLASSIC"),
+            "game_type": info.get("gameType", "MATCHED_GAME"),
+            "game_version": info.get("gameVersion", "14.18"),
+            "queue_id": info.get("queueId", 420),
+            "map_id": info.get("mapId", 11),
+            "platform_id": info.get("platformId", "KR"),
+            "game_end_timestamp": datetime.fromtimestamp(game_end_timestamp / 1000, tz=KST) if game_end_timestamp else None,
+            "participants_count": count,
+            "teams_data": json.dumps(info.get("teams", []), ensure_ascii=False),
+            "collected_at": collected_at
+        }
+        participant_values = {
+            column: [participant.get(key, default) for participant in participants]
+            for column, key, default in _PARTICIPANT_SOURCE_FIELDS
+        }
+        # 빠른 디코딩 경로는 참가자 원본 JSON 문자열을 그대로 사용
+        participant_values["detailed_stats"] = [
+            participant.get(RAW_PARTICIPANT_KEY) or json.dumps(participant, ensure_ascii=False)
+            for participant in participants
+        ]
+
+        for column, value in match_values.items():
+            self.matches.columns[column].append(value)
+
+        columns = self.participants.columns
+        columns["match_id"].extend(repeat(match_id, count))
+        for column, values in participant_values.items():
+            columns[column].extend(values)
+        columns["game_creation"].extend(repeat(game_creation, count))
+        columns["collected_at"].extend(repeat(collected_at, count))
+
+    def flush(self) -> Tuple[ColumnBatch, ColumnBatch]:
+        """지금까지 채운 (매치, 참가자) 배치를 반환하고 버퍼를 새로 시작"""
+        batches = (self.matches, self.participants)
+        self._reset()
+        return batches
@@ -0,0 +1,34 @@
+import threading
+from typing import Iterable, Set
+
+
+class ThreadSafeIdSet:
+    """
+    여러 스레드가 공유하는 ID 집합
+    확인과 추가를 한 번에 처리하는 claim()으로 같은 ID를 두 스레드가 동시에 처리하지 않도록 합니다.
+    """
+
+    def __init__(self, initial: Iterable[str] = ()):
+        self._ids: Set[str] = set(initial)
+        self._lock = threading.Lock()
+
+    def claim(self, item_id: str) -> bool:
+        """처음 보는 ID면 등록 후 True, 이미 있으면 False 반환"""
+        with self._lock:
+            if item_id in self._ids:
+                return False
+            self._ids.add(item_id)
+            return True
+
+    def discard(self, item_id: str):
+        """처리 실패한 ID 등록 해제 (다른 스레드가 다시 시도할 수 있도록)"""
+        with self._lock:
+            self._ids.discard(item_id)
+
+    def __contains__(self, item_id: str) -> bool:
+        with self._lock:
+            return item_id in self._ids
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids)
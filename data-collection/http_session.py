@@ -0,0 +1,152 @@
+import socket
+import threading
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+logger = logging.getLogger(__name__)
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """
+    TCP keep-alive 소켓 옵션을 적용하는 HTTPAdapter
+    유휴 커넥션이 중간 장비에 의해 끊기지 않도록 keep-alive 프로브를 보냅니다.
+    """
+
+    def __init__(self, keepalive_idle: Optional[int] = None, **kwargs):
+        self.keepalive_idle = keepalive_idle
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.keepalive_idle:
+            socket_options = list(HTTPConnection.default_socket_options)
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            # TCP_KEEPIDLE은 리눅스 전용 옵션
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keepalive_idle))
+            if hasattr(socket, "TCP_KEEPINTVL"):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, self.keepalive_idle))
+            kwargs["socket_options"] = socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class PooledHttpSession:
+    """
+    호스트별 커넥션 풀 세션 관리자
+    호스트마다 하나의 requests.Session을 유지해 TLS 연결을 재사용합니다.
+    """
+
+    def __init__(self, headers: Dict[str, str], pool_connections: int = 4, pool_maxsize: int = 10,
+                 keepalive_idle: Optional[int] = 60, timeout: float = 30.0):
+        self.headers = {
+            **headers,
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        }
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keepalive_idle = keepalive_idle
+        self.timeout = timeout
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+        # 통계 추적
+        self.total_requests = 0
+        self.compressed_responses = 0
+
+    def _host_key(self, url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def get_session(self, url: str) -> requests.Session:
+        """URL 호스트에 해당하는 세션 반환 (없으면 생성)"""
+        host = self._host_key(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = KeepAliveAdapter(
+                    keepalive_idle=self.keepalive_idle,
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=0
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+                logger.debug(f"HTTP 세션 생성: {host} (pool_maxsize={self.pool_maxsize})")
+            return session
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: Optional[float] = None) -> requests.Response:
+        """풀링된 세션으로 GET 요청"""
+        session = self.get_session(url)
+        response = session.get(url, params=params, timeout=timeout or self.timeout)
+
+        with self._lock:
+            self.total_requests += 1
+            if response.headers.get('Content-Encoding') in ('gzip', 'deflate'):
+                self.compressed_responses += 1
+
+        return response
+
+    def warm_up(self, *urls: str) -> int:
+        """
+        시작 시 호스트별 TLS 연결을 미리 수립
+        응답 상태와 무관하게 커넥션만 풀에 남기며, 성공한 호스트 수를 반환합니다.
+        """
+        warmed = 0
+        for url in urls:
+            host = self._host_key(url)
+            try:
+                # 레이트 리밋에 잡히지 않도록 API 경로가 아닌 호스트 루트로 HEAD 요청 (API 키 등 세션 헤더는 빼고 전송)
+                response = self.get_session(url).head(host, timeout=self.timeout,
+                                                      headers={name: None for name in self.headers})
+                response.close()
+                warmed += 1
+                logger.debug(f"커넥션 워밍업 완료: {host}")
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"커넥션 워밍업 실패: {host} - {e}")
+        return warmed
+
+    def get_stats(self) -> Dict:
+        """커넥션 재사용 통계 반환"""
+        new_connections = 0
+        pooled_requests = 0
+
+        with self._lock:
+            sessions = list(self._sessions.values())
+
+        for session in sessions:
+            adapter = session.get_adapter("https://")
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                new_connections += pool.num_connections
+                pooled_requests += pool.num_requests
+
+        reused = max(pooled_requests - new_connections, 0)
+        reuse_percentage = (reused / pooled_requests * 100) if pooled_requests > 0 else 0
+
+        return {
+            'hosts': len(sessions),
+            'http_requests': self.total_requests,
+            'new_connections': new_connections,
+            'reused_connections': reused,
+            'connection_reuse_percentage': reuse_percentage,
+            'compressed_responses': self.compressed_responses
+        }
+
+    def close(self):
+        """모든 세션 종료"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -0,0 +1,102 @@
+import logging
+from typing import Dict, Iterator, List
+
+from riot_client import APEX_LEAGUES
+from records import ChallengerRecord
+
+logger = logging.getLogger(__name__)
+
+# league-exp로 페이지 조회하는 티어 (높은 티어부터)
+PAGED_TIERS = ("DIAMOND", "EMERALD", "PLATINUM", "GOLD", "SILVER", "BRONZE", "IRON")
+DIVISIONS = ("I", "II", "III", "IV")
+
+
+def parse_tiers(value: str) -> List[str]:
+    """쉼표로 구분된 티어 목록 파싱 (대문자 변환, 중복 제거, 순서 유지)"""
+    tiers = []
+    for tier in value.split(','):
+        tier = tier.strip().upper()
+        if not tier or tier in tiers:
+            continue
+        if tier not in APEX_LEAGUES and tier not in PAGED_TIERS:
+            raise ValueError(f"지원하지 않는 티어입니다: {tier}")
+        tiers.append(tier)
+    return tiers
+
+
+class LadderReader:
+    """
+    래더 스트리밍 조회
+    최상위 티어는 league-v4 리그 응답을, 그 아래 티어는 league-exp 디비전별 페이지를 차례로 조회해
+    batch_size명씩 넘겨줍니다. 다음 배치가 필요할 때 다음 페이지를 요청하므로
+    메모리에는 현재 페이지(최상위 티어는 해당 리그 응답)와 배치 하나만 유지됩니다.
+    """
+
+    def __init__(self, riot_client, tiers: List[str], batch_size: int = 1000, max_pages: int = 0):
+        self.riot_client = riot_client
+        self.tiers = tiers
+        self.batch_size = batch_size
+        self.max_pages = max_pages
+
+        self.entries = 0
+        self.pages = 0
+        self.batches = 0
+        self.failed_requests = 0
+
+    def _iter_tier(self, tier: str) -> Iterator[ChallengerRecord]:
+        if tier in APEX_LEAGUES:
+            raw_data = self.riot_client.get_apex_league(tier)
+            self.pages += 1
+            if raw_data is None:
+                self.failed_requests += 1
+                return
+            yield from self.riot_client.iter_ladder_entries(raw_data.get("entries", []), tier=raw_data.get("tier", tier))
+            return
+
+        for division in DIVISIONS:
+            page = 1
+            while not self.max_pages or page <= self.max_pages:
+                entries = self.riot_client.get_league_entries_page(tier, division, page)
+                self.pages += 1
+                if entries is None:
+                    # 실패한 디비전은 건너뛰고 다음 디비전 계속
+                    self.failed_requests += 1
+                    break
+                if not entries:
+                    break
+                yield from self.riot_client.iter_ladder_entries(entries)
+                page += 1
+
+    def iter_entries(self) -> Iterator[ChallengerRecord]:
+        for tier in self.tiers:
+            tier_entries = 0
+            for entry in self._iter_tier(tier):
+                tier_entries += 1
+                yield entry
+            self.entries += tier_entries
+            logger.info(f"{self.riot_client.platform} {tier} 래더 조회 완료: {tier_entries}명")
+
+    def iter_batches(self) -> Iterator[List[ChallengerRecord]]:
+        """
+        batch_size명씩 반환
+        페이지를 넘기는 사이 순위가 바뀌면 같은 플레이어가 두 번 나올 수 있어, MERGE 소스가 중복되지 않도록 배치 안에서는 puuid 기준 최신 값만 남깁니다.
+        """
+        batch: Dict[str, ChallengerRecord] = {}
+        for entry in self.iter_entries():
+            batch[entry.puuid] = entry
+            if len(batch) >= self.batch_size:
+                self.batches += 1
+                yield list(batch.values())
+                batch = {}
+
+        if batch:
+            self.batches += 1
+            yield list(batch.values())
+
+    def get_stats(self) -> Dict:
+        return {
+            'ladder_entries': self.entries,
+            'ladder_pages': self.pages,
+            'ladder_batches': self.batches,
+            'ladder_failed_requests': self.failed_requests
+        }
@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import zlib
+import threading
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MatchDetailCache:
+    """
+    매치 상세 응답 로컬 캐시
+    종료된 매치의 match-v5 응답은 바뀌지 않으므로 match_id를 키로 압축 JSON을 보관합니다.
+    데이터는 크기 제한이 있는 세그먼트 파일에 이어 쓰고, 전체 용량을 넘으면
+    가장 오래 사용되지 않은 세그먼트부터 통째로 삭제합니다 (LRU).
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024,
+                 segment_bytes: int = 16 * 1024 * 1024, flush_every: int = 100):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.flush_every = flush_every
+
+        # match_id -> [세그먼트 번호, 오프셋, 길이]
+        self.entries: Dict[str, list] = {}
+        # 세그먼트 번호 -> {"size": 바이트, "last_access": 마지막 사용 시각}
+        self.segments: Dict[int, Dict] = {}
+        self.active_segment = 0
+
+        self._lock = threading.Lock()
+        self._dirty_puts = 0
+
+        # 통계 추적
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evicted_segments = 0
+        self.evicted_entries = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _segment_path(self, segment_no: int) -> str:
+        return os.path.join(self.cache_dir, f"segment-{segment_no:06d}.dat")
+
+    def _load_index(self):
+        """디스크 인덱스 로드 (없거나 손상되면 빈 캐시로 시작)"""
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.entries = index.get('entries', {})
+            self.segments = {int(no): meta for no, meta in index.get('segments', {}).items()}
+            self.active_segment = index.get('active_segment', 0)
+
+            # 파일이 사라진 세그먼트의 항목 정리
+            missing = [no for no in self.segments if not os.path.exists(self._segment_path(no))]
+            for segment_no in missing:
+                self._drop_segment(segment_no)
+
+            logger.info(f"매치 캐시 로드: {len(self.entries)}개 항목, {len(self.segments)}개 세그먼트")
+        except (OSError, ValueError) as e:
+            logger.warning(f"매치 캐시 인덱스 로드 실패, 새로 시작합니다: {e}")
+            self.entries = {}
+            self.segments = {}
+            self.active_segment = 0
+
+    def _drop_segment(self, segment_no: int):
+        """세그먼트와 소속 항목 제거 (락을 잡은 상태에서 호출)"""
+        dropped = [match_id for match_id, entry in self.entries.items() if entry[0] == segment_no]
+        for match_id in dropped:
+            del self.entries[match_id]
+        self.segments.pop(segment_no, None)
+
+        try:
+            os.remove(self._segment_path(segment_no))
+        except FileNotFoundError:
+            pass
+
+        return len(dropped)
+
+    def get(self, match_id: str) -> Optional[bytes]:
+        """캐시된 원본 JSON 바이트 반환 (없으면 None)"""
+        with self._lock:
+            entry = self.entries.get(match_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            segment_no, offset, length = entry
+            try:
+                with open(self._segment_path(segment_no), 'rb') as f:
+                    f.seek(offset)
+                    payload = zlib.decompress(f.read(length))
+            except (OSError, zlib.error) as e:
+                logger.warning(f"매치 캐시 읽기 실패: {match_id} - {e}")
+                del self.entries[match_id]
+                self.misses += 1
+                return None
+
+            self.segments[segment_no]['last_access'] = time.time()
+            self.hits += 1
+            return payload
+
+    def put(self, match_id: str, payload: bytes):
+        """원본 JSON 바이트를 압축해 저장"""
+        compressed = zlib.compress(payload, 6)
+
+        with self._lock:
+            if match_id in self.entries:
+                return
+
+            segment = self.segments.get(self.active_segment)
+            if segment is None or segment['size'] + len(compressed) > self.segment_bytes:
+                # 새 세그먼트로 전환
+                self.active_segment = max(self.segments, default=self.active_segment) + 1
+                segment = {'size': 0, 'last_access': time.time()}
+                self.segments[self.active_segment] = segment
+
+            try:
+                with open(self._segment_path(self.active_segment), 'ab') as f:
+                    offset = f.tell()
+                    f.write(compressed)
+            except OSError as e:
+                logger.warning(f"매치 캐시 쓰기 실패: {match_id} - {e}")
+                return
+
+            self.entries[match_id] = [self.active_segment, offset, len(compressed)]
+            segment['size'] = offset + len(compressed)
+            segment['last_access'] = time.time()
+            self.stores += 1
+
+            self._evict_if_needed()
+
+            self._dirty_puts += 1
+            if self._dirty_puts >= self.flush_every:
+                self._write_index()
+
+    def _evict_if_needed(self):
+        """전체 용량 초과 시 가장 오래 사용되지 않은 세그먼트부터 삭제 (락을 잡은 상태에서 호출)"""
+        total_bytes = sum(segment['size'] for segment in self.segments.values())
+
+        while total_bytes > self.max_bytes and len(self.segments) > 1:
+            candidates = [no for no in self.segments if no != self.active_segment]
+            oldest = min(candidates, key=lambda no: self.segments[no]['last_access'])
+            total_bytes -= self.segments[oldest]['size']
+
+            self.evicted_entries += self._drop_segment(oldest)
+            self.evicted_segments += 1
+            logger.debug(f"매치 캐시 세그먼트 제거: {oldest}")
+
+    def _write_index(self):
+        """인덱스를 임시 파일에 쓴 뒤 교체 (락을 잡은 상태에서 호출)"""
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = f"{index_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'entries': self.entries,
+                    'segments': self.segments,
+                    'active_segment': self.active_segment
+                }, f)
+            os.replace(tmp_path, index_path)
+            self._dirty_puts = 0
+        except OSError as e:
+            logger.warning(f"매치 캐시 인덱스 저장 실패: {e}")
+
+    def flush(self):
+        """인덱스를 디스크에 저장"""
+        with self._lock:
+            self._write_index()
+
+    def get_stats(self) -> Dict:
+        """캐시 적중률 통계 반환"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'cache_hits': self.hits,
+                'cache_misses': self.misses,
+                'cache_hit_ratio': (self.hits / lookups) if lookups > 0 else 0,
+                'cache_stores': self.stores,
+                'cache_entries': len(self.entries),
+                'cache_bytes': sum(segment['size'] for segment in self.segments.values()),
+                'cache_evicted_segments': self.evicted_segments,
+                'cache_evicted_entries': self.evicted_entries
+            }
@@ -0,0 +1,170 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, TypedDict
+
+# msgspec 사용 가능한지 확인 (없으면 표준 json 경로 사용)
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 빠른 디코딩 경로에서 참가자 원본 JSON 문자열을 담는 키 (detailed_stats로 그대로 저장)
+RAW_PARTICIPANT_KEY = "_raw"
+
+
+if MSGSPEC_AVAILABLE:
+
+    class ParticipantFields(TypedDict, total=False):
+        """extract_participants_data가 읽는 참가자 필드 (나머지 필드는 디코딩하지 않음)"""
+        participantId: int
+        puuid: Optional[str]
+        summonerName: Optional[str]
+        riotIdGameName: Optional[str]
+        riotIdTagline: Optional[str]
+        summonerLevel: Optional[int]
+        championId: int
+        championName: str
+        champLevel: int
+        win: bool
+        teamId: int
+        teamPosition: Optional[str]
+        individualPosition: Optional[str]
+        kills: int
+        deaths: int
+        assists: int
+        totalMinionsKilled: int
+        neutralMinionsKilled: int
+        goldEarned: int
+        totalDamageDealtToChampions: int
+        visionScore: int
+        item0: Optional[int]
+        item1: Optional[int]
+        item2: Optional[int]
+        item3: Optional[int]
+        item4: Optional[int]
+        item5: Optional[int]
+        item6: Optional[int]
+        summoner1Id: Optional[int]
+        summoner2Id: Optional[int]
+        placement: Optional[int]
+        subteamPlacement: Optional[int]
+
+    class InfoFields(TypedDict, total=False):
+        """extract_match_data가 읽는 매치 정보 필드 (참가자는 원본 바이트로 보관)"""
+        gameCreation: int
+        gameDuration: int
+        gameMode: str
+        gameType: str
+        gameVersion: str
+        queueId: int
+        mapId: int
+        platformId: str
+        gameEndTimestamp: Optional[int]
+        participants: List[msgspec.Raw]
+        teams: List[Dict[str, Any]]
+
+    class MetadataFields(TypedDict, total=False):
+        matchId: str
+        dataVersion: str
+
+    class MatchFields(TypedDict, total=False):
+        metadata: MetadataFields
+        info: InfoFields
+
+    class PositionFields(TypedDict, total=False):
+        x: int
+        y: int
+
+    class ParticipantFrameFields(TypedDict, total=False):
+        """타임라인 프레임의 참가자 필드 (championStats, damageStats는 디코딩하지 않음)"""
+        participantId: int
+        totalGold: int
+        currentGold: int
+        xp: int
+        level: int
+        minionsKilled: int
+        jungleMinionsKilled: int
+        position: PositionFields
+
+    class FrameFields(TypedDict, total=False):
+        """타임라인 프레임 (응답 대부분을 차지하는 events는 디코딩하지 않음)"""
+        timestamp: int
+        participantFrames: Dict[str, ParticipantFrameFields]
+
+    class TimelineInfoFields(TypedDict, total=False):
+        frameInterval: int
+        frames: List[FrameFields]
+
+    class TimelineFields(TypedDict, total=False):
+        metadata: MetadataFields
+        info: TimelineInfoFields
+
+
+class MatchDecoder:
+    """
+    match-v5 상세 응답 디코더
+    msgspec이 있으면 스키마에 필요한 필드만 타입 지정 디코딩하고, 참가자별 원본 JSON은
+    다시 직렬화하지 않도록 문자열로 보관합니다. 결과는 response.json()과 같은 모양의 dict입니다.
+    """
+
+    def __init__(self, fast: bool = True):
+        self.fast = fast and MSGSPEC_AVAILABLE
+        self.fallbacks = 0
+
+        if self.fast:
+            self._match_decoder = msgspec.json.Decoder(MatchFields)
+            self._participant_decoder = msgspec.json.Decoder(ParticipantFields)
+        elif fast:
+            logger.info("msgspec이 설치되지 않아 표준 json 디코딩을 사용합니다.")
+
+    def decode(self, payload: bytes) -> Dict:
+        """응답 바이트를 매치 dict로 변환"""
+        if not self.fast:
+            return json.loads(payload)
+
+        try:
+            match = self._match_decoder.decode(payload)
+            info = match.get('info')
+            if info is not None and 'participants' in info:
+                info['participants'] = [self._decode_participant(raw) for raw in info['participants']]
+            return match
+
+        except (msgspec.DecodeError, msgspec.ValidationError) as e:
+            # 예상과 다른 타입이 오면 전체 디코딩으로 처리
+            logger.debug(f"빠른 디코딩 실패, 표준 json 사용: {e}")
+            self.fallbacks += 1
+            return json.loads(payload)
+
+    def _decode_participant(self, raw) -> Dict:
+        participant = self._participant_decoder.decode(raw)
+        participant[RAW_PARTICIPANT_KEY] = bytes(raw).decode('utf-8')
+        return participant
+
+
+class TimelineDecoder:
+    """
+    match-v5 타임라인 응답 디코더
+    msgspec이 있으면 분 단위 프레임의 참가자 필드만 디코딩해 events 목록을 객체로 만들지 않습니다.
+    """
+
+    def __init__(self, fast: bool = True):
+        self.fast = fast and MSGSPEC_AVAILABLE
+        self.fallbacks = 0
+
+        if self.fast:
+            self._timeline_decoder = msgspec.json.Decoder(TimelineFields)
+
+    def decode(self, payload: bytes) -> Dict:
+        """응답 바이트를 타임라인 dict로 변환"""
+        if not self.fast:
+            return json.loads(payload)
+
+        try:
+            return self._timeline_decoder.decode(payload)
+        except (msgspec.DecodeError, msgspec.ValidationError) as e:
+            logger.debug(f"타임라인 빠른 디코딩 실패, 표준 json 사용: {e}")
+            self.fallbacks += 1
+            return json.loads(payload)
@@ -0,0 +1,190 @@
+import json
+from datetime import datetime
+from typing import Any, Callable, List, NamedTuple, Optional
+
+from match_decoder import RAW_PARTICIPANT_KEY
+
+# 참가자 전체를 값으로 쓰는 필드 (빠른 디코딩 경로는 원본 JSON 문자열)
+WHOLE_PARTICIPANT = "*"
+
+
+class Field(NamedTuple):
+    """
+    match_participants 테이블 컬럼 하나의 선언
+    source는 참가자 응답의 필드명이고, None이면 매치 단위 값(match_id 등 같은 이름의 인자)을 사용합니다.
+    wall_clock이면 KST 시각을 시간대 없이 저장합니다 (기존 데이터와 같은 값).
+    """
+    column: str
+    bq_type: str
+    mode: str = "NULLABLE"
+    source: Optional[str] = None
+    default: Any = None
+    wall_clock: bool = False
+
+
+# 컬럼 추가는 여기 한 줄이면 스키마, 변환 함수, MERGE 인코더에 모두 반영됩니다 (순서 = 테이블 컬럼 순서)
+PARTICIPANT_FIELDS: List[Field] = [
+    # 관계 키들
+    Field("match_id", "STRING", "REQUIRED"),
+    Field("participant_id", "INTEGER", "REQUIRED", "participantId", 0),
+    Field("puuid", "STRING", "REQUIRED", "puuid"),
+
+    # 플레이어 기본 정보
+    Field("summoner_name", "STRING", "NULLABLE", "summonerName"),
+    Field("riot_id_game_name", "STRING", "NULLABLE", "riotIdGameName"),
+    Field("riot_id_tagline", "STRING", "NULLABLE", "riotIdTagline"),
+    Field("summoner_level", "INTEGER", "NULLABLE", "summonerLevel"),
+
+    # 챔피언 정보
+    Field("champion_id", "INTEGER", "REQUIRED", "championId", 0),
+    Field("champion_name", "STRING", "REQUIRED", "championName", "Unknown"),
+    Field("champion_level", "INTEGER", "REQUIRED", "champLevel", 1),
+
+    # 게임 결과
+    Field("win", "BOOLEAN", "REQUIRED", "win", False),
+    Field("team_id", "INTEGER", "REQUIRED", "teamId", 100),
+    Field("team_position", "STRING", "NULLABLE", "teamPosition"),
+    Field("individual_position", "STRING", "NULLABLE", "individualPosition"),
+
+    # 핵심 통계 (KDA)
+    Field("kills", "INTEGER", "REQUIRED", "kills", 0),
+    Field("deaths", "INTEGER", "REQUIRED", "deaths", 0),
+    Field("assists", "INTEGER", "REQUIRED", "assists", 0),
+
+    # 게임 플레이 통계
+    Field("total_minions_killed", "INTEGER", "REQUIRED", "totalMinionsKilled", 0),
+    Field("neutral_minions_killed", "INTEGER", "REQUIRED", "neutralMinionsKilled", 0),
+    Field("gold_earned", "INTEGER", "REQUIRED", "goldEarned", 0),
+    Field("total_damage_dealt_to_champions", "INTEGER", "REQUIRED", "totalDamageDealtToChampions", 0),
+    Field("vision_score", "INTEGER", "REQUIRED", "visionScore", 0),
+
+    # 아이템 정보 (6개 슬롯 + 장신구)
+    Field("item0", "INTEGER", "NULLABLE", "item0", 0),
+    Field("item1", "INTEGER", "NULLABLE", "item1", 0),
+    Field("item2", "INTEGER", "NULLABLE", "item2", 0),
+    Field("item3", "INTEGER", "NULLABLE", "item3", 0),
+    Field("item4", "INTEGER", "NULLABLE", "item4", 0),
+    Field("item5", "INTEGER", "NULLABLE", "item5", 0),
+    Field("item6", "INTEGER", "NULLABLE", "item6", 0),
+
+    # 스펠 정보
+    Field("summoner1_id", "INTEGER", "NULLABLE", "summoner1Id"),
+    Field("summoner2_id", "INTEGER", "NULLABLE", "summoner2Id"),
+
+    # 특수 모드 (아레나 등)
+    Field("placement", "INTEGER", "NULLABLE", "placement"),
+    Field("subteam_placement", "INTEGER", "NULLABLE", "subteamPlacement"),
+
+    # 상세 통계 (JSON으로 모든 추가 데이터)
+    Field("detailed_stats", "JSON", "NULLABLE", WHOLE_PARTICIPANT),
+
+    # 메타데이터
+    Field("game_creation", "TIMESTAMP", "REQUIRED", wall_clock=True),  # 파티셔닝용
+    Field("collected_at", "TIMESTAMP", "REQUIRED", wall_clock=True)
+]
+
+PARTICIPANT_KEY_COLUMNS = ("match_id", "puuid")
+PARTICIPANT_CONTEXT_COLUMNS = [field.column for field in PARTICIPANT_FIELDS if field.source is None]
+
+_PYTHON_TYPES = {"STRING": str, "INTEGER": int, "BOOLEAN": bool, "JSON": Any, "TIMESTAMP": datetime}
+
+
+def record_type(name: str, fields: List[Field]) -> type:
+    """필드 선언 순서대로 값을 담는 NamedTuple 레코드 타입 (행 dict보다 작고, 없는 컬럼 이름은 바로 AttributeError)"""
+    return NamedTuple(name, [
+        (field.column, _PYTHON_TYPES[field.bq_type] if field.mode == "REQUIRED" else Optional[_PYTHON_TYPES[field.bq_type]])
+        for field in fields
+    ])
+
+
+# match_participants 행 (detailed_stats는 빠른 디코딩 경로면 원본 JSON 문자열, 아니면 참가자 dict)
+ParticipantRecord = record_type("ParticipantRecord", PARTICIPANT_FIELDS)
+
+
+def sql_string(value: str) -> str:
+    """SQL 문자열 리터럴 (역슬래시, 작은따옴표 이스케이프 - 대부분 없으므로 검사 후 필요할 때만 replace)"""
+    if "'" in value or "\\" in value:
+        value = value.replace("\\", "\\\\").replace("'", "\\'")
+    return "'" + value + "'"
+
+
+def json_text(value) -> str:
+    """JSON 컬럼 값 문자열 (빠른 디코딩 경로는 이미 원본 JSON 문자열)"""
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def _extract_expression(field: Field) -> str:
+    if field.source is None:
+        return field.column
+    if field.source == WHOLE_PARTICIPANT:
+        return f"get({RAW_PARTICIPANT_KEY!r}, participant)"
+    return f"get({field.source!r}, {field.default!r})"
+
+
+def _encode_expression(field: Field, name: str) -> str:
+    """값(지역 변수 name) -> SQL 리터럴 식"""
+    if field.bq_type == "STRING":
+        expression = f"sql_string({name})"
+    elif field.bq_type == "BOOLEAN":
+        expression = f"('TRUE' if {name} else 'FALSE')"
+    elif field.bq_type == "JSON":
+        expression = f"'PARSE_JSON(' + sql_string(json_text({name})) + ')'"
+    elif field.bq_type == "TIMESTAMP":
+        # 벽시계 시각은 시간대 없이 초 단위까지 (strftime보다 빠름)
+        timestamp = f"{name}.isoformat(' ', 'seconds')[:19]" if field.wall_clock else f"{name}.isoformat()"
+        expression = f"\"TIMESTAMP('\" + {timestamp} + \"')\""
+    elif field.mode == "REQUIRED":
+        return name  # 정수는 % 포맷에서 바로 문자열로 변환
+    else:
+        expression = f"str({name})"
+
+    if field.mode == "NULLABLE":
+        expression = f"('NULL' if {name} is None else {expression})"
+    return expression
+
+
+def _compile(name: str, source: str, **names) -> Callable:
+    namespace = {'sql_string': sql_string, 'json_text': json_text, **names}
+    exec(compile(source, f"<match_fields.{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def compile_participant_extractor(fields: List[Field], record: type) -> Callable[..., List]:
+    """
+    필드 선언으로 참가자 레코드 변환 함수 생성 (record는 fields 순서의 NamedTuple)
+    참가자별로 한 번 꺼낸 get만 사용하고, 매치 단위 값은 인자로 받습니다.
+    레코드는 생성자 호출 없이 tuple.__new__로 바로 만듭니다.
+    """
+    context = [field.column for field in fields if field.source is None]
+    values = ", ".join(_extract_expression(field) for field in fields)
+    source = (
+        f"def extract_participant_rows(participants, {', '.join(context)}):\n"
+        f"    rows = []\n"
+        f"    append = rows.append\n"
+        f"    for participant in participants:\n"
+        f"        get = participant.get\n"
+        f"        append(new_record(record, ({values},)))\n"
+        f"    return rows\n"
+    )
+    return _compile("extract_participant_rows", source, record=record, new_record=tuple.__new__)
+
+
+def compile_struct_encoder(fields: List[Field]) -> Callable[[tuple], str]:
+    """
+    필드 선언으로 레코드 -> MERGE 소스용 STRUCT 문자열 인코더 생성 (쿼리 길이를 줄이도록 한 줄)
+    레코드를 필드 순서대로 풀어 템플릿 % 포맷 한 번으로 문자열을 만듭니다.
+    """
+    names = [f"v{index}" for index in range(len(fields))]
+    template = "STRUCT(" + ", ".join(f"%s AS {field.column}" for field in fields) + ")"
+    values = ", ".join(_encode_expression(field, name) for field, name in zip(fields, names))
+    source = (
+        f"def encode_struct(row):\n"
+        f"    {', '.join(names)}, = row\n"
+        f"    return {template!r} % ({values},)\n"
+    )
+    return _compile("encode_struct", source)
+
+
+# 모듈 로드 시 한 번 생성
+extract_participant_rows = compile_participant_extractor(PARTICIPANT_FIELDS, ParticipantRecord)
+encode_participant_struct = compile_struct_encoder(PARTICIPANT_FIELDS)
@@ -0,0 +1,168 @@
+import os
+import math
+import json
+import hashlib
+import threading
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    고정 크기 블룸 필터
+    capacity개까지 넣었을 때 오탐률이 false_positive_rate 이하가 되도록 비트 수와 해시 수를 정합니다.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.001):
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = max(8, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # 128비트 해시 하나를 두 개로 나눠 이중 해싱
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class KnownMatchIndex:
+    """
+    이미 matches 테이블에 저장된 match_id 인덱스
+    시작 시 한 번 로드하며 메모리 사용량은 capacity로 고정됩니다.
+    블룸 필터 특성상 false_positive_rate 확률로 새 매치를 저장된 것으로 오판해 건너뛸 수 있습니다.
+    """
+
+    def __init__(self, capacity: int = 2_000_000, false_positive_rate: float = 0.001,
+                 path: Optional[str] = None):
+        self.path = path
+        self.filter = BloomFilter(capacity, false_positive_rate)
+        self.built_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def add(self, match_id: str):
+        with self._lock:
+            self.filter.add(match_id)
+
+    def add_many(self, match_ids: Iterable[str]) -> int:
+        added = 0
+        with self._lock:
+            for match_id in match_ids:
+                self.filter.add(match_id)
+                added += 1
+        return added
+
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self.filter
+
+    def __len__(self) -> int:
+        return self.filter.count
+
+    def save(self) -> bool:
+        """비트 배열과 메타데이터를 파일로 저장"""
+        if not self.path:
+            return False
+
+        meta = {
+            'capacity': self.filter.capacity,
+            'false_positive_rate': self.filter.false_positive_rate,
+            'count': self.filter.count,
+            'built_at': self.built_at.isoformat() if self.built_at else None
+        }
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with self._lock:
+                with open(tmp_path, 'wb') as f:
+                    header = json.dumps(meta).encode('utf-8')
+                    f.write(len(header).to_bytes(4, 'little'))
+                    f.write(header)
+                    f.write(self.filter.bits)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            logger.warning(f"매치 인덱스 저장 실패: {e}")
+            return False
+
+    def load(self) -> bool:
+        """파일에서 인덱스 로드 (설정이 달라졌으면 무시)"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+
+        try:
+            with open(self.path, 'rb') as f:
+                header_size = int.from_bytes(f.read(4), 'little')
+                meta = json.loads(f.read(header_size))
+                bits = f.read()
+        except (OSError, ValueError) as e:
+            logger.warning(f"매치 인덱스 로드 실패: {e}")
+            return False
+
+        if (meta.get('capacity') != self.filter.capacity
+                or meta.get('false_positive_rate') != self.filter.false_positive_rate
+                or len(bits) != len(self.filter.bits)):
+            logger.info("매치 인덱스 설정이 변경되어 새로 생성합니다.")
+            return False
+
+        self.filter.bits = bytearray(bits)
+        self.filter.count = meta.get('count', 0)
+        self.built_at = datetime.fromisoformat(meta['built_at']) if meta.get('built_at') else None
+        return True
+
+    def refresh_from_bigquery(self, bq_client) -> Optional[int]:
+        """
+        BigQuery matches 테이블의 match_id로 인덱스 갱신
+        저장된 인덱스가 있으면 그 이후 수집된 매치만 읽습니다.
+        조회에 실패하면 None을 반환하고 built_at은 그대로 둡니다 (다음 갱신 때 같은 구간을 다시 읽음).
+        """
+        since = self.built_at
+        refreshed_at = datetime.now(ZoneInfo("Asia/Seoul"))
+
+        try:
+            added = self.add_many(bq_client.iter_known_match_ids(since=since))
+        except Exception as e:
+            logger.warning(f"매치 인덱스 갱신 실패 (기존 인덱스 유지): {e}")
+            return None
+
+        self.built_at = refreshed_at
+        return added
+
+    @classmethod
+    def load_or_build(cls, bq_client, capacity: int, false_positive_rate: float,
+                      path: Optional[str] = None) -> "KnownMatchIndex":
+        """로컬 파일이 있으면 로드 후 증분 갱신, 없으면 BigQuery에서 전체 생성"""
+        index = cls(capacity, false_positive_rate, path)
+        loaded = index.load()
+
+        added = index.refresh_from_bigquery(bq_client)
+        if added is None:
+            # 갱신 실패 시 불완전한 인덱스를 새 기준 시각으로 저장하지 않음
+            return index
+        index.save()
+
+        logger.info(f"매치 인덱스 준비 완료: {len(index)}개 "
+                   f"({'로컬 로드 후 ' if loaded else ''}BigQuery에서 {added}개 추가, "
+                   f"{len(index.filter.bits) / 1024 / 1024:.1f}MB)")
+        return index
+
+    def get_stats(self) -> Dict:
+        return {
+            'known_match_ids': len(self),
+            'index_bytes': len(self.filter.bits),
+            'index_hashes': self.filter.num_hashes
+        }
@@ -2,6 +2,7 @@ from google.cloud import bigquery
 from typing import List
 import structlog
 from google.cloud.exceptions import NotFound
+from match_fields import PARTICIPANT_FIELDS
 
 logger = structlog.get_logger()
 
@@ -66,6 +67,35 @@ class MatchDataSchema:
         table_id = "match_participants"
         table_ref = self.client.dataset(self.dataset_id).table(table_id)
 
+        try:
+            self.client.get_table(table_ref)
+            print(f"테이블 --{table_id}-- 이미 존재")
+            return True
+        except NotFound:
+            # 컬럼 선언은 match_fields.PARTICIPANT_FIELDS (변환 함수, MERGE 인코더와 공유)
+            schema = [
+                bigquery.SchemaField(field.column, field.bq_type, mode=field.mode)
+                for field in PARTICIPANT_FIELDS
+            ]
+
+            table = bigquery.Table(table_ref, schema=schema)
+
+            # 날짜별 파티셔닝
+            table.time_partitioning = bigquery.TimePartitioning(field="game_creation")
+
+            # 클러스터링
+            table.clustering_fields = ["champion_id", "team_position", "win"]
+
+            table = self.client.create_table(table)
+            print(f"{table_id} 생성 완료")
+            return True
+    
+    def create_match_timeline_frames_table(self) -> bool:
+        """매치 타임라인 분 단위 프레임 테이블 생성 (참가자별 골드/경험치/위치)"""
+
+        table_id = "match_timeline_frames"
+        table_ref = self.client.dataset(self.dataset_id).table(table_id)
+
         try:
             self.client.get_table(table_ref)
             print(f"테이블 --{table_id}-- 이미 존재")
@@ -74,70 +104,32 @@ class MatchDataSchema:
             schema = [
                 # 관계 키들
                   bigquery.SchemaField("match_id", "STRING", mode="REQUIRED"),
+                  bigquery.SchemaField("minute", "INTEGER", mode="REQUIRED"),
                   bigquery.SchemaField("participant_id", "INTEGER", mode="REQUIRED"),
-                  bigquery.SchemaField("puuid", "STRING", mode="REQUIRED"),
-
-                  # 플레이어 기본 정보
-                  bigquery.SchemaField("summoner_name", "STRING", mode="NULLABLE"),
-                  bigquery.SchemaField("riot_id_game_name", "STRING", mode="NULLABLE"),
-                  bigquery.SchemaField("riot_id_tagline", "STRING", mode="NULLABLE"),
-                  bigquery.SchemaField("summoner_level", "INTEGER", mode="NULLABLE"),
 
-                  # 챔피언 정보
-                  bigquery.SchemaField("champion_id", "INTEGER", mode="REQUIRED"),
-                  bigquery.SchemaField("champion_name", "STRING", mode="REQUIRED"),
-                  bigquery.SchemaField("champion_level", "INTEGER", mode="REQUIRED"),
+                  # 프레임 통계
+                  bigquery.SchemaField("total_gold", "INTEGER", mode="NULLABLE"),
+                  bigquery.SchemaField("current_gold", "INTEGER", mode="NULLABLE"),
+                  bigquery.SchemaField("xp", "INTEGER", mode="NULLABLE"),
+                  bigquery.SchemaField("level", "INTEGER", mode="NULLABLE"),
+                  bigquery.SchemaField("minions_killed", "INTEGER", mode="NULLABLE"),
+                  bigquery.SchemaField("jungle_minions_killed", "INTEGER", mode="NULLABLE"),
 
-                  # 게임 결과
-                  bigquery.SchemaField("win", "BOOLEAN", mode="REQUIRED"),
-                  bigquery.SchemaField("team_id", "INTEGER", mode="REQUIRED"),
-                  bigquery.SchemaField("team_position", "STRING", mode="NULLABLE"),
-                  bigquery.SchemaField("individual_position", "STRING", mode="NULLABLE"),
-
-                  # 핵심 통계 (KDA)
-                  bigquery.SchemaField("kills", "INTEGER", mode="REQUIRED"),
-                  bigquery.SchemaField("deaths", "INTEGER", mode="REQUIRED"),
-                  bigquery.SchemaField("assists", "INTEGER", mode="REQUIRED"),
-
-                  # 게임 플레이 통계
-                  bigquery.SchemaField("total_minions_killed", "INTEGER", mode="REQUIRED"),
-                  bigquery.SchemaField("neutral_minions_killed", "INTEGER", mode="REQUIRED"),
-                  bigquery.SchemaField("gold_earned", "INTEGER", mode="REQUIRED"),
-                  bigquery.SchemaField("total_damage_dealt_to_champions", "INTEGER", mode="REQUIRED"),
-                  bigquery.SchemaField("vision_score", "INTEGER", mode="REQUIRED"),
-
-                  # 아이템 정보
-                  bigquery.SchemaField("item0", "INTEGER", mode="NULLABLE"),
-                  bigquery.SchemaField("item1", "INTEGER", mode="NULLABLE"),
-                  bigquery.SchemaField("item2", "INTEGER", mode="NULLABLE"),
-                  bigquery.SchemaField("item3", "INTEGER", mode="NULLABLE"),
-                  bigquery.SchemaField("item4", "INTEGER", mode="NULLABLE"),
-                  bigquery.SchemaField("item5", "INTEGER", mode="NULLABLE"),
-                  bigquery.SchemaField("item6", "INTEGER", mode="NULLABLE"),
-
-                  # 스펠 정보
-                  bigquery.SchemaField("summoner1_id", "INTEGER", mode="NULLABLE"),
-                  bigquery.SchemaField("summoner2_id", "INTEGER", mode="NULLABLE"),
-
-                  # 특수 모드 (아레나 등)
-                  bigquery.SchemaField("placement", "INTEGER", mode="NULLABLE"),
-                  bigquery.SchemaField("subteam_placement", "INTEGER", mode="NULLABLE"),
-
-                  # 상세 통계 (JSON으로 모든 추가 데이터)
-                  bigquery.SchemaField("detailed_stats", "JSON", mode="NULLABLE"),
+                  # 위치
+                  bigquery.SchemaField("position_x", "INTEGER", mode="NULLABLE"),
+                  bigquery.SchemaField("position_y", "INTEGER", mode="NULLABLE"),
 
                   # 메타데이터
-                  bigquery.SchemaField("game_creation", "TIMESTAMP", mode="REQUIRED"),  # 파티셔닝용
                   bigquery.SchemaField("collected_at", "TIMESTAMP", mode="REQUIRED")
             ]
 
             table = bigquery.Table(table_ref, schema=schema)
 
             # 날짜별 파티셔닝
-            table.time_partitioning = bigquery.TimePartitioning(field="game_creation")
+            table.time_partitioning = bigquery.TimePartitioning(field="collected_at")
 
             # 클러스터링
-            table.clustering_fields = ["champion_id", "team_position", "win"]
+            table.clustering_fields = ["match_id", "participant_id"]
 
             table = self.client.create_table(table)
             print(f"{table_id} 생성 완료")
@@ -0,0 +1,336 @@
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from riot_client import RiotClient, PLATFORM_ROUTING
+from staged_pipeline import StagedMatchPipeline
+from ladder_reader import LadderReader
+from timeline_stage import TimelineStage
+from records import ChallengerRecord, MatchRecord, ParticipantRecord
+
+logger = logging.getLogger(__name__)
+
+
+def parse_platforms(value: str) -> List[str]:
+    """쉼표로 구분된 플랫폼 목록 파싱 (대문자 변환, 중복 제거, 순서 유지)"""
+    platforms = []
+    for platform in value.split(','):
+        platform = platform.strip().upper()
+        if not platform or platform in platforms:
+            continue
+        if platform not in PLATFORM_ROUTING:
+            raise ValueError(f"지원하지 않는 플랫폼입니다: {platform}")
+        platforms.append(platform)
+
+    if not platforms:
+        raise ValueError("RIOT_PLATFORMS가 비어 있습니다.")
+    return platforms
+
+
+class MultiRegionCollector:
+    """
+    여러 플랫폼 병렬 수집
+    플랫폼마다 RiotClient를 하나씩 두고 스레드(async 엔진은 하나의 이벤트 루프)에서 동시에 수집합니다.
+    Riot 레이트 리밋은 라우팅 값(지역) 단위로 적용되므로 같은 지역을 쓰는 플랫폼(KR, JP1 -> asia)은
+    레이트 리미터와 타임라인 예산을 공유하고, 다른 지역끼리는 예산이 독립이라 처리량이 지역 수만큼 늘어납니다.
+    플랫폼이 하나면 통계는 해당 클라이언트 값을 그대로 반환합니다.
+    """
+
+    def __init__(self, config, platforms: List[str], client_class=RiotClient):
+        self.platforms = platforms
+        self.clients: Dict[str, RiotClient] = {}
+        self.region_rate_limits = {}
+        self.region_timeline_budgets = {}
+        self.failed_platforms: List[str] = []
+
+        # 매치 캐시 용량은 전체 예산이므로 플랫폼 수로 나눔
+        match_cache_max_bytes = config.MATCH_CACHE_MAX_BYTES // len(platforms)
+
+        for platform in platforms:
+            region = PLATFORM_ROUTING[platform]
+            client = client_class(config, platform=platform, rate_limits=self.region_rate_limits.get(region),
+                                  match_cache_max_bytes=match_cache_max_bytes,
+                                  timeline_budget=self.region_timeline_budgets.get(region))
+            self.region_rate_limits.setdefault(region, client.rate_limits)
+            self.region_timeline_budgets.setdefault(region, client.timeline_budget)
+            self.clients[platform] = client
+
+        logger.info(f"수집 플랫폼: {', '.join(platforms)} "
+                   f"(지역 {len(self.region_rate_limits)}개: {', '.join(self.region_rate_limits)})")
+
+    def attach(self, **components):
+        """known_match_index, player_watermarks, checkpoint 등 공유 컴포넌트를 모든 클라이언트에 주입"""
+        for client in self.clients.values():
+            for name, component in components.items():
+                setattr(client, name, component)
+
+    def warm_up(self) -> int:
+        """모든 클라이언트의 호스트 연결을 동시에 미리 수립하고 성공한 호스트 수 반환"""
+        return sum(self._run_parallel(lambda platform, client: client.warm_up_connections()).values())
+
+    def _run_parallel(self, fn: Callable) -> Dict:
+        """플랫폼별로 fn(platform, client)를 동시에 실행해 플랫폼 -> 결과 반환"""
+        with ThreadPoolExecutor(max_workers=len(self.clients), thread_name_prefix="platform") as executor:
+            futures = {platform: executor.submit(fn, platform, client) for platform, client in self.clients.items()}
+            return {platform: future.result() for platform, future in futures.items()}
+
+    def _split_by_platform(self, players: List[ChallengerRecord]) -> Dict[str, List[ChallengerRecord]]:
+        by_platform = {platform: [] for platform in self.platforms}
+        for player in players:
+            by_platform[player.platform_id].append(player)
+        return by_platform
+
+    @staticmethod
+    def _merge(results) -> Tuple[List[MatchRecord], List[ParticipantRecord]]:
+        matches, participants = [], []
+        for platform_matches, platform_participants in results:
+            matches.extend(platform_matches)
+            participants.extend(platform_participants)
+        return matches, participants
+
+    def get_challenger_data(self) -> List[ChallengerRecord]:
+        """플랫폼별 챌린저 리그 조회 후 변환 (platform_id 포함, 실패한 플랫폼은 제외하고 failed_platforms에 기록)"""
+        def fetch(platform, client):
+            raw_data = client.get_challenger_league()
+            return client.extract_challenger_data(raw_data) if raw_data else None
+
+        challenger_data = []
+        for platform, data in self._run_parallel(fetch).items():
+            if data is None:
+                logger.error(f"챌린저 데이터 수집 실패: {platform}")
+                self.failed_platforms.append(platform)
+                continue
+            challenger_data.extend(data)
+        return challenger_data
+
+    def select_top_players(self, challenger_data: List[ChallengerRecord], count: int) -> List[ChallengerRecord]:
+        """플랫폼별 상위 count명"""
+        by_platform = self._split_by_platform(challenger_data)
+        return [player for platform in self.platforms for player in by_platform[platform][:count]]
+
+    def stream_ladder(self, tiers: List[str], write_batch: Callable[[List[ChallengerRecord]], bool],
+                      batch_size: int = 1000, max_pages: int = 0) -> Dict:
+        """
+        플랫폼별로 래더를 스트리밍 조회하며 배치마다 write_batch로 저장 (플랫폼끼리 동시 진행)
+        write_batch는 여러 플랫폼 스레드에서 호출될 수 있습니다.
+        """
+        def stream(platform, client):
+            reader = LadderReader(client, tiers, batch_size=batch_size, max_pages=max_pages)
+            failed_batches = 0
+            for batch in reader.iter_batches():
+                if not write_batch(batch):
+                    failed_batches += 1
+            return {**reader.get_stats(), 'ladder_failed_batches': failed_batches}
+
+        totals = {}
+        for platform_stats in self._run_parallel(stream).values():
+            for key, value in platform_stats.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def collect_matches(self, players: List[ChallengerRecord], matches_per_player: int,
+                        max_workers: Optional[int] = None) -> Tuple[List[MatchRecord], List[ParticipantRecord]]:
+        """플랫폼별 RiotClient.collect_matches_for_challengers를 스레드로 동시에 실행"""
+        by_platform = self._split_by_platform(players)
+        results = self._run_parallel(lambda platform, client: client.collect_matches_for_challengers(
+            by_platform[platform],
+            matches_per_player=matches_per_player,
+            max_workers=max_workers
+        ))
+        return self._merge(results.values())
+
+    def iter_match_batches(self, players: List[ChallengerRecord], matches_per_player: int, max_workers: Optional[int] = None,
+                           batch_matches: int = 50, memory_limit_mb: float = 0) -> Iterator[Tuple[List[MatchRecord], List[ParticipantRecord]]]:
+        """
+        플랫폼별 RiotClient.iter_match_batches를 스레드로 동시에 실행하고 배치가 나오는 대로 넘김
+        큐에는 플랫폼 수만큼만 배치를 담아 두므로 저장이 느리면 수집 스레드가 기다립니다 (메모리 상한 유지).
+        memory_limit_mb는 전체 버퍼 상한이라 플랫폼별로 나눠 적용합니다.
+        호출한 쪽이 중간에 멈추면 각 플랫폼은 진행 중인 배치까지만 수집하고 끝냅니다.
+        """
+        by_platform = self._split_by_platform(players)
+        batch_options = {'max_workers': max_workers, 'batch_matches': batch_matches,
+                         'memory_limit_mb': memory_limit_mb / len(self.clients)}
+
+        if len(self.clients) == 1:
+            platform, client = next(iter(self.clients.items()))
+            yield from client.iter_match_batches(by_platform[platform], matches_per_player, **batch_options)
+            return
+
+        batches = queue.Queue(maxsize=len(self.clients))
+        stopped = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            while not stopped.is_set():
+                try:
+                    batches.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(platform, client):
+            try:
+                for batch in client.iter_match_batches(by_platform[platform], matches_per_player, **batch_options):
+                    if not put(batch):
+                        return
+            finally:
+                put(done)
+
+        with ThreadPoolExecutor(max_workers=len(self.clients), thread_name_prefix="platform") as executor:
+            futures = [executor.submit(produce, platform, client) for platform, client in self.clients.items()]
+            try:
+                remaining = len(futures)
+                while remaining:
+                    item = batches.get()
+                    if item is done:
+                        remaining -= 1
+                        continue
+                    yield item
+            finally:
+                stopped.set()
+
+        # 플랫폼 수집 중 예외가 있었으면 그대로 전달
+        for future in futures:
+            future.result()
+
+    async def collect_matches_async(self, players: List[ChallengerRecord], matches_per_player: int) -> Tuple[List[MatchRecord], List[ParticipantRecord]]:
+        """플랫폼별 AsyncRiotClient 수집을 하나의 이벤트 루프에서 동시에 실행"""
+        by_platform = self._split_by_platform(players)
+        results = await asyncio.gather(*(
+            client.collect_matches_async(by_platform[platform], matches_per_player=matches_per_player)
+            for platform, client in self.clients.items()
+        ))
+        return self._merge(results)
+
+    def run_staged(self, players: List[ChallengerRecord], bq_client, matches_per_player: int,
+                   on_batch_written: Optional[Callable[[List[str], List[Tuple[str, datetime]]], None]] = None,
+                   **pipeline_options) -> Dict:
+        """
+        플랫폼별 StagedMatchPipeline을 동시에 실행하고 결과 합산
+        on_batch_written은 여러 플랫폼 스레드에서 호출될 수 있습니다.
+        """
+        by_platform = self._split_by_platform(players)
+        results = self._run_parallel(lambda platform, client: StagedMatchPipeline(
+            client, bq_client, **pipeline_options
+        ).run(by_platform[platform], matches_per_player=matches_per_player, on_batch_written=on_batch_written))
+
+        merged = {'matches': 0, 'participants': 0, 'failed_batches': 0, 'failed_transform_batches': 0, 'stages': {}}
+        for platform, result in results.items():
+            for key in ('matches', 'participants', 'failed_batches', 'failed_transform_batches'):
+                merged[key] += result[key]
+            for stage, stage_stats in result['stages'].items():
+                merged['stages'][f"{platform.lower()}_{stage}" if len(self.clients) > 1 else stage] = stage_stats
+        return merged
+
+    def run_timelines(self, match_ids: List[str], bq_client, batch_matches: int = 5, workers: int = 4) -> Dict:
+        """match_id 접두사({플랫폼}_)로 플랫폼을 나눠 타임라인 스테이지를 동시에 실행하고 통계 합산"""
+        by_platform = {platform: [] for platform in self.platforms}
+        for match_id in match_ids:
+            platform = match_id.split('_', 1)[0]
+            if platform in by_platform:
+                by_platform[platform].append(match_id)
+
+        results = self._run_parallel(lambda platform, client: TimelineStage(
+            client, bq_client, batch_matches=batch_matches, workers=workers
+        ).run(by_platform[platform]))
+
+        totals = {}
+        for platform_stats in results.values():
+            for key, value in platform_stats.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    @property
+    def skipped_known_matches(self) -> int:
+        return sum(client.skipped_known_matches for client in self.clients.values())
+
+    def request_outcome(self, method: str) -> Tuple[int, int]:
+        """플랫폼 합산 (요청 수, 실패 수)"""
+        outcomes = [client.request_outcome(method) for client in self.clients.values()]
+        return sum(requests for requests, _ in outcomes), sum(errors for _, errors in outcomes)
+
+    def _single_client(self) -> Optional[RiotClient]:
+        return next(iter(self.clients.values())) if len(self.clients) == 1 else None
+
+    def get_rate_limit_stats(self) -> Dict:
+        """지역별 레이트 리미터 합산 통계 (RiotClient.get_rate_limit_stats와 같은 키, 앱 윈도우 사용량은 지역별)"""
+        single_client = self._single_client()
+        if single_client:
+            return single_client.get_rate_limit_stats()
+
+        region_stats = {region: rate_limits.get_stats() for region, rate_limits in self.region_rate_limits.items()}
+        total_requests = sum(stats['total_requests'] for stats in region_stats.values())
+        rate_limited_requests = sum(stats['rate_limited_requests'] for stats in region_stats.values())
+        total_wait_time = sum(stats['total_wait_time'] for stats in region_stats.values())
+        total_response_time = sum(stats['avg_response_time'] * stats['total_requests'] for stats in region_stats.values())
+        retry_stats = [client.get_retry_stats() for client in self.clients.values()]
+
+        return {
+            'total_requests': total_requests,
+            'rate_limited_requests': rate_limited_requests,
+            'rate_limit_percentage': (rate_limited_requests / total_requests * 100) if total_requests > 0 else 0,
+            'current_delay': max((stats['current_delay'] for stats in region_stats.values()), default=0),
+            'total_wait_time': total_wait_time,
+            'avg_wait_time_per_request': total_wait_time / total_requests if total_requests > 0 else 0,
+            'avg_response_time': total_response_time / total_requests if total_requests > 0 else 0,
+            'app_window_usage': {region: stats['app_window_usage'] for region, stats in region_stats.items()},
+            'coalesced_requests': sum(client.coalesced_requests for client in self.clients.values()),
+            'retries': sum(stats['retries'] for stats in retry_stats),
+            'retries_exhausted': sum(stats['retries_exhausted'] for stats in retry_stats),
+            'circuit_breaker_opens': sum(stats['circuit_breaker_opens'] for stats in retry_stats)
+        }
+
+    def get_queue_filter_stats(self) -> Dict:
+        """큐 필터 통계 (플랫폼 합산, 절약한 상세 호출 추정치는 플랫폼별 추정치의 합)"""
+        single_client = self._single_client()
+        if single_client:
+            return single_client.get_queue_filter_stats()
+
+        totals = {}
+        for client in self.clients.values():
+            for key, value in client.get_queue_filter_stats().items():
+                totals[key] = value if key == 'queue_filter' else totals.get(key, 0) + value
+        return totals
+
+    def get_endpoint_rate_limit_stats(self) -> Dict:
+        """엔드포인트별 레이트 리미터 통계 (여러 지역이면 "지역/엔드포인트" 키)"""
+        single_client = self._single_client()
+        if single_client:
+            return single_client.get_endpoint_rate_limit_stats()
+
+        return {
+            f"{region}/{endpoint}": stats
+            for region, rate_limits in self.region_rate_limits.items()
+            for endpoint, stats in rate_limits.get_global_stats().items()
+        }
+
+    def get_region_request_counts(self) -> Dict[str, int]:
+        """지역별 API 요청 수"""
+        return {region: rate_limits.get_stats()['total_requests'] for region, rate_limits in self.region_rate_limits.items()}
+
+    def get_connection_stats(self) -> Dict:
+        """HTTP 커넥션 재사용 통계 (플랫폼 합산)"""
+        totals = {}
+        for client in self.clients.values():
+            for key, value in client.get_connection_stats().items():
+                if key != 'connection_reuse_percentage':
+                    totals[key] = totals.get(key, 0) + value
+        pooled_requests = totals.get('new_connections', 0) + totals.get('reused_connections', 0)
+        totals['connection_reuse_percentage'] = (totals.get('reused_connections', 0) / pooled_requests * 100) if pooled_requests > 0 else 0
+        return totals
+
+    def get_cache_stats(self) -> Dict:
+        """매치 상세 캐시 통계 (플랫폼 합산)"""
+        totals = {}
+        for client in self.clients.values():
+            for key, value in client.get_cache_stats().items():
+                if key != 'cache_hit_ratio':
+                    totals[key] = totals.get(key, 0) + value
+        lookups = totals.get('cache_hits', 0) + totals.get('cache_misses', 0)
+        totals['cache_hit_ratio'] = totals.get('cache_hits', 0) / lookups if lookups > 0 else 0
+        return totals
@@ -1,8 +1,21 @@
-from riot_client import RiotClient
+from riot_client import RiotClient, current_rss_mb, MATCH_V5_IDS, MATCH_V5_DETAIL
+from async_riot_client import AsyncRiotClient
 from bigquery_client import BigQueryClient
+from match_index import KnownMatchIndex
+from watermark_store import PlayerWatermarkStore
+from checkpoint_store import PipelineCheckpoint
+from activity_planner import ActivityPlanner
+from multi_region import MultiRegionCollector, parse_platforms
+from ladder_reader import parse_tiers, PAGED_TIERS, DIVISIONS
+from budget_planner import CollectionBudgetPlanner, RunProfile
+from transform_pool import MatchTransformPool
 import sys
 import os
+import json
 import time
+import argparse
+import threading
+import asyncio
 from datetime import datetime
 
 # 상위 디렉토리의 모듈들 접근
@@ -32,17 +45,42 @@ except ImportError as e:
         is_production = os.getenv("ENV") == "production"
         matches_per_player = 20 if is_production else 5
         challenger_count = 300 if is_production else 50
+        RIOT_PLATFORMS = os.getenv("RIOT_PLATFORMS", "KR")
+        LADDER_TIERS = os.getenv("LADDER_TIERS", "CHALLENGER")
+        LADDER_WRITE_BATCH_SIZE = 1000
+        LADDER_MAX_PAGES = 0
+        TIMELINE_ENABLED = False
+        COLLECTION_ENGINE = os.getenv("COLLECTION_ENGINE", "sync")
+        THREAD_POOL_WORKERS = 8
+        STAGED_BATCH_SIZE = 50
+        STAGE_QUEUE_SIZE = 200
+        COLUMNAR_TRANSFORM = False
+        TRANSFORM_PROCESSES = 0
+        FAST_JSON_DECODE = True
+        HTTP_WARMUP = False
+        MATCH_STREAM_BATCH_SIZE = 0
+        MATCH_STREAM_MEMORY_LIMIT_MB = 0
+        KNOWN_MATCH_INDEX_ENABLED = False
+        WATERMARK_ENABLED = False
+        CHECKPOINT_ENABLED = False
+        ACTIVITY_PLANNER_ENABLED = False
+        RUN_TIME_BUDGET_SECONDS = 0
+        PLAN_PROFILE_PATH = None
     
     # 기본 모니터링 클래스
     class PipelineMonitoring:
         def log_pipeline_start(self): 
             logger.info("파이프라인 시작")
-        def log_pipeline_failure(self, msg, stage): 
-            logger.error(f"파이프라인 실패 [{stage}]: {msg}")
+        def log_pipeline_failure(self, msg, stage, details=None): 
+            logger.error(f"파이프라인 실패 [{stage}]: {msg}" + (f" {details}" if details else ""))
         def log_pipeline_success(self, stats, duration): 
             logger.info(f"파이프라인 성공: {stats}, 시간: {duration}초")
         def log_api_performance(self, stats): 
             logger.info(f"API 성능: {stats}")
+        def log_endpoint_performance(self, stats): 
+            logger.info(f"엔드포인트별 API 성능: {stats}")
+        def send_alert(self, message, severity="INFO", extra_data=None):
+            logger.warning(f"[{severity}] {message}: {extra_data}")
     
     def configure_logging(level):
         logging.basicConfig(level=getattr(logging, level))
@@ -83,13 +121,40 @@ def run_data_pipeline():
         monitoring = PipelineMonitoring(config)
         monitoring.log_pipeline_start()
         
+        # 시간 예산이 있으면 최근 실행 프로필로 예산 안에 드는 최대 수집 규모 선택 (설정값보다 늘리지는 않음)
+        run_profile = RunProfile(config.PLAN_PROFILE_PATH)
+        run_profile.load()
+        if config.RUN_TIME_BUDGET_SECONDS > 0:
+            plan = CollectionBudgetPlanner(config, run_profile.values).fit(
+                config.RUN_TIME_BUDGET_SECONDS,
+                max_challengers=config.challenger_count,
+                max_matches=config.matches_per_player
+            )
+            if plan is None:
+                logger.warning("시간 예산 안에 드는 수집 규모 없음, 설정값으로 진행",
+                              budget_seconds=config.RUN_TIME_BUDGET_SECONDS)
+            else:
+                config.challenger_count = plan['challenger_count']
+                config.matches_per_player = plan['matches_per_player']
+                logger.info("시간 예산에 맞춰 수집 규모 조정",
+                           budget_seconds=config.RUN_TIME_BUDGET_SECONDS,
+                           estimated_seconds=plan['estimated_seconds'],
+                           estimated_requests=plan['requests']['total'])
+        
         logger.info("Riot 데이터 파이프라인 시작", 
                    environment="Production" if config.is_production else "Development",
                    challenger_count=config.challenger_count,
                    matches_per_player=config.matches_per_player)
 
-        # 클라이언트 초기화
-        riot_client = RiotClient(config)
+        # 플랫폼별 클라이언트 초기화 (수집 엔진 선택, 같은 지역 플랫폼끼리 레이트 리밋 공유)
+        use_async_engine = config.COLLECTION_ENGINE == "async"
+        collector = MultiRegionCollector(
+            config,
+            parse_platforms(config.RIOT_PLATFORMS),
+            client_class=AsyncRiotClient if use_async_engine else RiotClient
+        )
+        if config.HTTP_WARMUP:
+            collector.warm_up()
         bq_client = BigQueryClient(config)
 
         # BigQuery 설정 확인
@@ -98,82 +163,356 @@ def run_data_pipeline():
         dataset_check = bq_client.create_dataset_if_not_exists()
         table_check = bq_client.create_challengers_table_if_not_exists()
         match_tables_check = bq_client.create_match_tables_if_not_exists()
+        timeline_table_check = bq_client.create_timeline_table_if_not_exists() if config.TIMELINE_ENABLED else True
 
-        if not all([dataset_check, table_check, match_tables_check]):
+        if not all([dataset_check, table_check, match_tables_check, timeline_table_check]):
             error_msg = "BigQuery 테이블 설정 실패"
             monitoring.log_pipeline_failure(error_msg, "bigquery_setup")
             return False
+        
+        # 이미 저장된 match_id 인덱스 로드 (시작 시 1회)
+        known_match_index = None
+        if config.KNOWN_MATCH_INDEX_ENABLED:
+            known_match_index = KnownMatchIndex.load_or_build(
+                bq_client,
+                capacity=config.KNOWN_MATCH_INDEX_CAPACITY,
+                false_positive_rate=config.KNOWN_MATCH_INDEX_FPR,
+                path=config.KNOWN_MATCH_INDEX_PATH
+            )
+            collector.attach(known_match_index=known_match_index)
     
-        # 챌린저 데이터 수집
+        # 이전 실행이 중단됐으면 체크포인트에서 재개
+        checkpoint = None
+        resumed_from_checkpoint = False
+        if config.CHECKPOINT_ENABLED:
+            checkpoint = PipelineCheckpoint(
+                config.CHECKPOINT_PATH,
+                save_every=config.CHECKPOINT_SAVE_EVERY,
+                max_age_hours=config.CHECKPOINT_MAX_AGE_HOURS
+            )
+            resumed_from_checkpoint = checkpoint.load()
+            if resumed_from_checkpoint:
+                logger.info("체크포인트에서 재개", **checkpoint.get_stats())
+            collector.attach(checkpoint=checkpoint)
+        
+        # 챌린저 데이터 수집 및 변환 (플랫폼별 동시 조회, 일부 플랫폼 실패 시 나머지로 진행)
         logger.data_pipeline_log(stage="challenger_collection", success=True)
-        raw_data = riot_client.get_challenger_league()
+        challenger_data = collector.get_challenger_data()
 
-        if not raw_data:
+        if not challenger_data:
             error_msg = "챌린저 데이터 수집 실패"
             monitoring.log_pipeline_failure(error_msg, "challenger_collection")
             return False
         
-        # 챌린저 데이터 변환
-        challenger_data = riot_client.extract_challenger_data(raw_data)
+        if collector.failed_platforms:
+            monitoring.send_alert(
+                f"일부 플랫폼 챌린저 데이터 수집 실패: {', '.join(collector.failed_platforms)}",
+                "WARNING",
+                {'failed_platforms': collector.failed_platforms}
+            )
+        
         logger.info("챌린저 데이터 변환 완료", 
-                   challenger_count=len(challenger_data))
+                   challenger_count=len(challenger_data),
+                   platforms=collector.platforms)
+
+        top_players = collector.select_top_players(challenger_data, config.challenger_count)
+
+        # 이전 스냅샷 대비 새 게임 수로 수집 계획 (MERGE로 덮어쓰기 전에 조회, 재개 시 처음 기준 유지)
+        activity_planner = None
+        if config.ACTIVITY_PLANNER_ENABLED:
+            if checkpoint is not None and checkpoint.activity_baseline is not None:
+                previous_games = checkpoint.activity_baseline
+            else:
+                previous_games = bq_client.fetch_challenger_games([player.puuid for player in top_players])
+                if checkpoint is not None:
+                    checkpoint.activity_baseline = previous_games
+                    checkpoint.save()
+            activity_planner = ActivityPlanner(
+                default_count=config.matches_per_player,
+                max_count=config.ACTIVITY_MAX_MATCHES_PER_PLAYER
+            )
 
         # 챌린저 데이터 삽입
         logger.data_pipeline_log(stage="challenger_storage", 
                                count=len(challenger_data), 
                                success=True)
         
-        challenger_success = bq_client.insert_challenger_data(challenger_data)
+        batch_size = config.LADDER_WRITE_BATCH_SIZE
+        challenger_success = all(
+            bq_client.insert_challenger_data(challenger_data[i:i + batch_size])
+            for i in range(0, len(challenger_data), batch_size)
+        )
 
         if not challenger_success:
             error_msg = "챌린저 데이터 저장 실패"
             monitoring.log_pipeline_failure(error_msg, "challenger_storage")
             return False
+        
+        # 챌린저 아래 티어는 페이지를 넘기며 배치 단위로 저장 (래더 전체를 메모리에 올리지 않음)
+        ladder_stats = {}
+        ladder_tiers = [tier for tier in parse_tiers(config.LADDER_TIERS) if tier != "CHALLENGER"]
+        if ladder_tiers:
+            logger.data_pipeline_log(stage="ladder_storage", success=True)
+            ladder_start_time = time.time()
+            ladder_stats = collector.stream_ladder(
+                ladder_tiers,
+                write_batch=bq_client.insert_challenger_data,
+                batch_size=batch_size,
+                max_pages=config.LADDER_MAX_PAGES
+            )
+            logger.performance_log(
+                operation="ladder_streaming",
+                duration=time.time() - ladder_start_time,
+                items_processed=ladder_stats['ladder_entries'],
+                tiers=ladder_tiers,
+                pages=ladder_stats['ladder_pages'],
+                batches=ladder_stats['ladder_batches']
+            )
+            
+            if ladder_stats['ladder_failed_batches']:
+                error_msg = f"래더 데이터 저장 실패 ({ladder_stats['ladder_failed_batches']}개 배치)"
+                monitoring.log_pipeline_failure(error_msg, "ladder_storage")
+                return False
+            if ladder_stats['ladder_failed_requests']:
+                monitoring.send_alert(
+                    f"일부 래더 페이지 조회 실패: {ladder_stats['ladder_failed_requests']}건",
+                    "WARNING",
+                    ladder_stats
+                )
     
         # 매치 데이터 수집 (Config 적용)
         logger.data_pipeline_log(stage="match_collection", success=True)
-        top_players = challenger_data[:config.challenger_count]
+        if activity_planner is not None:
+            top_players = activity_planner.plan(top_players, previous_games)
+        top_puuids = [player.puuid for player in top_players]
+        
+        # 플레이어별 기준점 로드 (로컬 파일에 없는 플레이어는 BigQuery에서 채움)
+        player_watermarks = None
+        if config.WATERMARK_ENABLED:
+            player_watermarks = PlayerWatermarkStore(config.WATERMARK_PATH)
+            loaded_count = player_watermarks.load()
+            seeded_count = player_watermarks.seed_from_bigquery(bq_client, top_puuids)
+            if checkpoint is not None:
+                # 재개한 실행은 이전 실행에서 조회를 마친 플레이어를 다시 조회하지 않으므로 그때 목록으로 상한 계산
+                for puuid, match_ids in checkpoint.player_match_ids.items():
+                    player_watermarks.record_listing(puuid, match_ids)
+            collector.attach(player_watermarks=player_watermarks)
+            logger.info("플레이어 기준점 준비 완료",
+                       loaded_from_file=loaded_count,
+                       seeded_from_bigquery=seeded_count)
         
         logger.info("매치 데이터 수집 시작",
                    target_players=len(top_players),
-                   matches_per_player=config.matches_per_player)
+                   matches_per_player=config.matches_per_player,
+                   engine=config.COLLECTION_ENGINE)
+        
+        # 저장 완료된 매치를 인덱스와 체크포인트에 반영하고 기준점 갱신용으로 모아 둠 (저장 실패 시 다음 실행에서 같은 구간을 다시 조회)
+        # (staged 엔진은 여러 플랫폼 스레드에서 동시에 호출, 기준점은 수집이 끝난 뒤 한 번에 갱신)
+        stored_match_ids = []
+        mark_stored_lock = threading.Lock()
+        
+        def mark_stored(match_ids, match_games):
+            """match_ids: 저장한 match_id 목록, match_games: 저장한 매치별 (match_id, game_creation) 목록"""
+            with mark_stored_lock:
+                stored_match_ids.extend(match_ids)
+                if known_match_index is not None:
+                    known_match_index.add_many(match_ids)
+                if player_watermarks is not None:
+                    player_watermarks.record_stored(match_games)
+                if checkpoint is not None:
+                    checkpoint.mark_written(match_ids)
+                    checkpoint.save()
+        
+        # sync/threaded 엔진은 배치 크기가 있으면 수집하면서 배치마다 저장 (staged는 자체 배치 저장)
+        streaming = config.MATCH_STREAM_BATCH_SIZE > 0 and config.COLLECTION_ENGINE in ("sync", "threaded")
         
         match_start_time = time.time()
-        matches, participants = riot_client.collect_matches_for_challengers(
-            top_players, 
-            matches_per_player=config.matches_per_player
-        )
-        match_duration = time.time() - match_start_time
+        if config.COLLECTION_ENGINE == "staged":
+            # 수집과 저장을 동시에 진행 (배치 저장이 끝날 때마다 반영)
+            # 변환 프로세스 풀은 플랫폼별 파이프라인이 함께 사용 (변환 CPU 작업이 수집 스레드와 GIL을 다투지 않음)
+            transform_pool = (MatchTransformPool(config.TRANSFORM_PROCESSES, fast_decode=config.FAST_JSON_DECODE)
+                              if config.TRANSFORM_PROCESSES else None)
+            try:
+                staged_result = collector.run_staged(
+                    top_players, bq_client,
+                    matches_per_player=config.matches_per_player,
+                    on_batch_written=mark_stored,
+                    batch_size=config.STAGED_BATCH_SIZE,
+                    queue_size=config.STAGE_QUEUE_SIZE,
+                    detail_workers=config.THREAD_POOL_WORKERS,
+                    columnar=config.COLUMNAR_TRANSFORM,
+                    transform_pool=transform_pool
+                )
+            finally:
+                if transform_pool:
+                    transform_pool.close()
+            match_duration = time.time() - match_start_time
+            match_count = staged_result['matches']
+            participant_count = staged_result['participants']
+            
+            for stage, stage_stats in staged_result['stages'].items():
+                logger.performance_log(
+                    operation=f"stage_{stage}",
+                    duration=stage_stats['elapsed_seconds'],
+                    items_processed=stage_stats['items'],
+                    failures=stage_stats['failures'],
+                    queue_wait_seconds=stage_stats['queue_wait_seconds']
+                )
+            
+            if staged_result['failed_batches']:
+                error_msg = f"매치 데이터 저장 실패 ({staged_result['failed_batches']}개 배치)"
+                monitoring.log_pipeline_failure(error_msg, "match_storage", {
+                    'failed_transform_batches': staged_result['failed_transform_batches']
+                })
+                return False
+        elif streaming:
+            # 고정 크기 배치를 저장한 뒤 바로 해제하므로 최대 메모리가 수집 규모(챌린저 수)와 무관
+            logger.data_pipeline_log(stage="match_storage", success=True)
+            match_count = participant_count = stream_batches = 0
+            stream_failed = False
+            for matches, participants in collector.iter_match_batches(
+                top_players,
+                matches_per_player=config.matches_per_player,
+                max_workers=config.THREAD_POOL_WORKERS if config.COLLECTION_ENGINE == "threaded" else None,
+                batch_matches=config.MATCH_STREAM_BATCH_SIZE,
+                memory_limit_mb=config.MATCH_STREAM_MEMORY_LIMIT_MB
+            ):
+                if not bq_client.insert_match_data(matches) or not bq_client.insert_participants_data(participants):
+                    stream_failed = True
+                    break
+                mark_stored(
+                    [match.match_id for match in matches],
+                    [(match.match_id, match.game_creation) for match in matches]
+                )
+                match_count += len(matches)
+                participant_count += len(participants)
+                stream_batches += 1
+                # 다음 배치를 수집하는 동안 저장한 배치를 붙잡고 있지 않도록 해제
+                del matches, participants
+            match_duration = time.time() - match_start_time
+            
+            if checkpoint is not None:
+                checkpoint.save()
+            
+            if stream_failed:
+                error_msg = f"매치 데이터 저장 실패 ({stream_batches + 1}번째 배치)"
+                monitoring.log_pipeline_failure(error_msg, "match_storage")
+                return False
+            
+            logger.info("매치 스트리밍 저장 완료",
+                       batches=stream_batches,
+                       batch_size=config.MATCH_STREAM_BATCH_SIZE,
+                       memory_limit_mb=config.MATCH_STREAM_MEMORY_LIMIT_MB,
+                       rss_mb=current_rss_mb())
+        else:
+            if use_async_engine:
+                matches, participants = asyncio.run(collector.collect_matches_async(
+                    top_players, 
+                    matches_per_player=config.matches_per_player
+                ))
+            else:
+                matches, participants = collector.collect_matches(
+                    top_players, 
+                    matches_per_player=config.matches_per_player,
+                    max_workers=config.THREAD_POOL_WORKERS if config.COLLECTION_ENGINE == "threaded" else None
+                )
+            match_duration = time.time() - match_start_time
+            match_count = len(matches)
+            participant_count = len(participants)
+            
+            # 저장 전에 실패해도 다음 실행이 ID 조회를 반복하지 않도록 기록
+            if checkpoint is not None:
+                checkpoint.save()
 
-        if not matches or not participants:
+        # 새 매치가 없는 것은 매치 조회가 모두 에러 없이 끝났고, 실제로 보낸 ID 조회가 빈 목록이었거나
+        # 기존 매치를 건너뛴 경우만 정상 (match-v5 장애, 서킷 열림, 403 등으로 모두 실패한 실행은 실패 처리)
+        id_requests, id_errors = collector.request_outcome(MATCH_V5_IDS)
+        _, detail_errors = collector.request_outcome(MATCH_V5_DETAIL)
+        if (not match_count or not participant_count) and (
+                id_errors or detail_errors or not (id_requests or collector.skipped_known_matches)):
             error_msg = "매치 데이터 수집 실패"
-            monitoring.log_pipeline_failure(error_msg, "match_collection")
+            monitoring.log_pipeline_failure(error_msg, "match_collection", {
+                'match_id_requests': id_requests,
+                'match_id_errors': id_errors,
+                'match_detail_errors': detail_errors
+            })
             return False
         
         logger.performance_log(
             operation="match_data_collection",
             duration=match_duration,
-            items_processed=len(matches),
-            matches_collected=len(matches),
-            participants_collected=len(participants)
+            items_processed=match_count,
+            matches_collected=match_count,
+            participants_collected=participant_count
         )
 
-        # 매치 데이터 저장
-        logger.data_pipeline_log(stage="match_storage", 
-                               count=len(matches), 
-                               success=True)
-        
-        match_success = bq_client.insert_match_data(matches)
-        participant_success = bq_client.insert_participants_data(participants)
+        if config.COLLECTION_ENGINE != "staged" and not streaming:
+            # 매치 데이터 저장
+            logger.data_pipeline_log(stage="match_storage", 
+                                   count=match_count, 
+                                   success=True)
+            
+            match_success = bq_client.insert_match_data(matches)
+            participant_success = bq_client.insert_participants_data(participants)
 
-        if not match_success or not participant_success:
-            error_msg = "매치 데이터 저장 실패"
-            monitoring.log_pipeline_failure(error_msg, "match_storage")
-            return False
+            if not match_success or not participant_success:
+                error_msg = "매치 데이터 저장 실패"
+                monitoring.log_pipeline_failure(error_msg, "match_storage")
+                return False
+            
+            mark_stored(
+                [match.match_id for match in matches],
+                [(match.match_id, match.game_creation) for match in matches]
+            )
+        
+        if known_match_index is not None:
+            known_match_index.save()
+        advanced_watermarks = 0
+        if player_watermarks is not None:
+            advanced_watermarks = player_watermarks.apply_stored_games(known_match_index)
+            player_watermarks.save()
+        
+        # 저장한 매치의 타임라인을 배치 단위로 조회/저장 (선택)
+        timeline_stats = {}
+        timeline_duration = 0
+        if config.TIMELINE_ENABLED and stored_match_ids:
+            logger.data_pipeline_log(stage="timeline_collection", count=len(stored_match_ids), success=True)
+            timeline_start_time = time.time()
+            timeline_stats = collector.run_timelines(
+                stored_match_ids, bq_client,
+                batch_matches=config.TIMELINE_BATCH_MATCHES,
+                workers=config.TIMELINE_WORKERS
+            )
+            timeline_duration = time.time() - timeline_start_time
+            logger.performance_log(
+                operation="timeline_collection",
+                duration=timeline_duration,
+                items_processed=timeline_stats['timeline_matches'],
+                frames=timeline_stats['timeline_frames']
+            )
+            
+            if timeline_stats['timeline_failed_batches']:
+                error_msg = f"타임라인 데이터 저장 실패 ({timeline_stats['timeline_failed_batches']}개 배치)"
+                monitoring.log_pipeline_failure(error_msg, "timeline_storage")
+                return False
+            if timeline_stats['timeline_failed_matches']:
+                monitoring.send_alert(
+                    f"일부 매치 타임라인 조회 실패: {timeline_stats['timeline_failed_matches']}개",
+                    "WARNING",
+                    timeline_stats
+                )
+        
+        # 수집/저장이 모두 끝났으므로 체크포인트 삭제
+        if checkpoint is not None:
+            checkpoint.clear()
         
         # API 성능 통계 로깅
-        rate_limit_stats = riot_client.get_rate_limit_stats()
+        rate_limit_stats = collector.get_rate_limit_stats()
         monitoring.log_api_performance(rate_limit_stats)
+        endpoint_stats = collector.get_endpoint_rate_limit_stats()
+        monitoring.log_endpoint_performance(endpoint_stats)
+        connection_stats = collector.get_connection_stats()
+        cache_stats = collector.get_cache_stats()
         
         # 최종 확인
         bq_client.test_connection()
@@ -183,14 +522,54 @@ def run_data_pipeline():
         total_duration = time.time() - start_time
         final_stats = {
             'challengers': len(challenger_data),
-            'matches': len(matches),
-            'participants': len(participants),
+            'platforms': collector.platforms,
+            'failed_platforms': collector.failed_platforms,
+            'matches': match_count,
+            'participants': participant_count,
             'api_requests': rate_limit_stats.get('total_requests', 0),
-            'rate_limited_requests': rate_limit_stats.get('rate_limited_requests', 0)
+            'rate_limited_requests': rate_limit_stats.get('rate_limited_requests', 0),
+            'coalesced_requests': rate_limit_stats.get('coalesced_requests', 0),
+            'retries': rate_limit_stats.get('retries', 0),
+            'retries_exhausted': rate_limit_stats.get('retries_exhausted', 0),
+            'circuit_breaker_opens': rate_limit_stats.get('circuit_breaker_opens', 0),
+            'api_requests_by_endpoint': {
+                endpoint: stats.get('total_requests', 0) for endpoint, stats in endpoint_stats.items()
+            },
+            'api_requests_by_region': collector.get_region_request_counts(),
+            'new_connections': connection_stats.get('new_connections', 0),
+            'reused_connections': connection_stats.get('reused_connections', 0),
+            'match_cache_hits': cache_stats.get('cache_hits', 0),
+            'match_cache_hit_ratio': round(cache_stats.get('cache_hit_ratio', 0), 3),
+            'skipped_known_matches': collector.skipped_known_matches,
+            'match_id_errors': id_errors,
+            'match_detail_errors': detail_errors,
+            **collector.get_queue_filter_stats(),
+            'advanced_watermarks': advanced_watermarks,
+            'resumed_from_checkpoint': resumed_from_checkpoint,
+            **ladder_stats,
+            **timeline_stats,
+            **(activity_planner.get_stats() if activity_planner else {})
         }
         
         monitoring.log_pipeline_success(final_stats, total_duration)
         
+        # 다음 실행의 수집 계획에 쓸 실측값 갱신 (래더 페이지 수는 페이지 제한 없이 끝까지 조회한 경우만)
+        ladder_divisions = ladder_division_pages = 0
+        if ladder_stats and not config.LADDER_MAX_PAGES and not ladder_stats['ladder_failed_requests']:
+            platform_count = len(collector.platforms)
+            ladder_divisions = sum(len(DIVISIONS) for tier in ladder_tiers if tier in PAGED_TIERS) * platform_count
+            ladder_division_pages = ladder_stats['ladder_pages'] - sum(
+                1 for tier in ladder_tiers if tier not in PAGED_TIERS) * platform_count
+        run_profile.record(
+            rate_limit_stats, endpoint_stats, cache_stats,
+            listed_match_ids=final_stats['filtered_match_ids'],
+            total_duration=total_duration,
+            api_duration=match_duration + timeline_duration,
+            ladder_divisions=ladder_divisions,
+            ladder_division_pages=ladder_division_pages
+        )
+        run_profile.save()
+        
         logger.info("데이터 파이프라인 완료", 
                    total_duration_seconds=total_duration,
                    **final_stats)
@@ -208,7 +587,49 @@ def run_data_pipeline():
             
         return False
     
+def print_collection_plan(budget_seconds=None, challenger_count=None, matches_per_player=None, **assumptions):
+    """
+    API 호출 없이 수집 계획 출력 (--dry-run)
+    설정(또는 인자로 준) 규모의 예상 요청 수와 소요 시간, 예산을 주면 예산 안에 드는 최대 규모도 함께 출력합니다.
+    """
+    config = Config()
+    run_profile = RunProfile(config.PLAN_PROFILE_PATH)
+    run_profile.load()
+    planner = CollectionBudgetPlanner(config, run_profile.values, **assumptions)
+
+    challenger_count = challenger_count or config.challenger_count
+    matches_per_player = matches_per_player or config.matches_per_player
+    plan = {'configured': planner.estimate(challenger_count, matches_per_player)}
+    budget_seconds = budget_seconds or config.RUN_TIME_BUDGET_SECONDS
+    if budget_seconds:
+        # 실제 실행과 같이 설정(또는 인자) 규모보다 늘리지 않음
+        plan['fitted'] = planner.fit(budget_seconds, max_challengers=challenger_count, max_matches=matches_per_player)
+
+    print(json.dumps(plan, indent=2, ensure_ascii=False))
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Riot 데이터 파이프라인")
+    parser.add_argument("--dry-run", action="store_true", help="API 호출 없이 수집 계획(예상 요청 수, 소요 시간)만 출력")
+    parser.add_argument("--budget", type=float, help="시간 예산(초), 예산 안에 드는 최대 수집 규모 계산")
+    parser.add_argument("--challenger-count", type=int, help="플랫폼별 챌린저 수 (예산 계산 시 상한)")
+    parser.add_argument("--matches-per-player", type=int, help="플레이어당 매치 수 (예산 계산 시 상한)")
+    parser.add_argument("--response-time", type=float, help="평균 응답 시간(초) 가정값")
+    parser.add_argument("--dedup-ratio", type=float, help="상세 조회하지 않는 매치 ID 비율(중복/기저장) 가정값")
+    parser.add_argument("--cache-hit-ratio", type=float, help="매치 상세 캐시 적중률 가정값")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        print_collection_plan(
+            budget_seconds=args.budget,
+            challenger_count=args.challenger_count,
+            matches_per_player=args.matches_per_player,
+            response_time=args.response_time,
+            dedup_ratio=args.dedup_ratio,
+            cache_hit_ratio=args.cache_hit_ratio
+        )
+        exit(0)
+
     success = run_data_pipeline()
     if not success:
         print("파이프라인 실행 실패")
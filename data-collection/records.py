@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from match_fields import ParticipantRecord  # 참가자 레코드는 필드 선언에서 생성 (여기서 함께 import)
+
+
+class ChallengerRecord(NamedTuple):
+    """
+    challengers 테이블 행 (래더 엔트리 변환 결과)
+    match_count는 수집 계획(ActivityPlanner)이 정한 플레이어별 매치 수로, 저장하지 않습니다.
+    """
+    puuid: str
+    league_points: int
+    wins: int
+    losses: int
+    is_veteran: bool
+    is_hot_streak: bool
+    collected_at: datetime
+    platform_id: str = "KR"
+    tier: str = "CHALLENGER"
+    rank: str = "I"
+    match_count: Optional[int] = None
+
+    def matches_to_collect(self, default: int) -> int:
+        """수집할 매치 수 (수집 계획이 없으면 default, 계획상 0이면 0)"""
+        return default if self.match_count is None else self.match_count
+
+
+class MatchRecord(NamedTuple):
+    """matches 테이블 행 (collected_at은 저장 시각으로 MERGE에서 채움)"""
+    match_id: str
+    data_version: str
+    game_creation: datetime
+    game_duration: int
+    game_mode: str
+    game_type: str
+    game_version: str
+    queue_id: int
+    map_id: int
+    platform_id: str
+    game_end_timestamp: Optional[datetime]
+    participants_count: int
+    teams_data: List[Dict]
+
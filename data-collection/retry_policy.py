@@ -0,0 +1,206 @@
+import time
+import random
+import asyncio
+import threading
+import logging
+from typing import Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    엔드포인트 계열(league-v4, match-v5 등)별 서킷 브레이커
+    연속 실패가 failure_threshold번 쌓이면 reset_timeout 동안 요청을 멈추고(open),
+    그 뒤에는 요청 하나만 먼저 보내 결과를 보고(half-open) 다시 열지 닫을지 정합니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, probe_interval: float = 0.5):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_interval = probe_interval
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self.probe_in_flight = False
+        self.open_count = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Tuple[float, bool]:
+        """(요청 전에 기다려야 할 시간, 이 요청이 half-open 시험 요청인지) - 시간이 0이면 바로 요청"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0.0, False
+
+            now = time.time()
+            if self.state == self.OPEN:
+                if now < self.opened_until:
+                    return self.opened_until - now, False
+                self.state = self.HALF_OPEN
+
+            # half-open: 시험 요청 하나만 통과
+            if self.probe_in_flight:
+                return self.probe_interval, False
+            self.probe_in_flight = True
+            return 0.0, True
+
+    def wait_time(self) -> float:
+        """요청을 보내기 전에 기다려야 할 시간 (0이면 바로 요청)"""
+        return self.acquire()[0]
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.open_count += 1
+                    logger.warning(f"서킷 브레이커 열림: {self.reset_timeout:.0f}초 동안 요청 중지 "
+                                   f"(연속 실패 {self.consecutive_failures}회)")
+                self.state = self.OPEN
+                self.opened_until = time.time() + self.reset_timeout
+
+    def release_probe(self):
+        """성공/실패로 판단할 수 없는 응답(429 등)이면 다음 시험 요청 허용"""
+        with self._lock:
+            self.probe_in_flight = False
+
+
+class RetryEngine:
+    """
+    Riot API 공통 재시도 정책
+    429는 Retry-After(없으면 기본 대기)만큼, 5xx와 타임아웃/연결 오류는 지터를 준 지수 백오프만큼 기다린 뒤
+    max_retries번까지 재시도합니다. 5xx와 네트워크 오류는 서킷 브레이커 실패로 집계합니다.
+    실제 요청과 대기는 호출하는 클라이언트(동기/비동기)가 수행하고, 이 클래스는 대기 시간만 계산합니다.
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 2.0, max_delay: float = 60.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+        # 통계 추적 (계열별)
+        self.retries: Dict[str, int] = {}
+        self.retry_wait_time: Dict[str, float] = {}
+        self.gave_up: Dict[str, int] = {}
+
+    @staticmethod
+    def family(method: str) -> str:
+        """메서드 키(match-v5.detail)에서 엔드포인트 계열(match-v5) 추출"""
+        return method.split('.', 1)[0]
+
+    def breaker(self, method: str) -> CircuitBreaker:
+        family = self.family(method)
+        with self._lock:
+            if family not in self.breakers:
+                self.breakers[family] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[family]
+
+    def backoff(self, attempt: int) -> float:
+        """지수 백오프의 절반은 고정, 절반은 무작위 (동시에 실패한 요청들이 같은 순간에 재시도하지 않도록)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _retry_after(self, headers: Optional[Mapping]) -> Optional[float]:
+        if not headers or headers.get('Retry-After') is None:
+            return None
+        try:
+            return min(self.max_delay, float(headers.get('Retry-After')))
+        except ValueError:
+            return None
+
+    def _schedule_retry(self, method: str, attempt: int, delay: float) -> Optional[float]:
+        family = self.family(method)
+        with self._lock:
+            if attempt >= self.max_retries:
+                self.gave_up[family] = self.gave_up.get(family, 0) + 1
+                return None
+            self.retries[family] = self.retries.get(family, 0) + 1
+            self.retry_wait_time[family] = self.retry_wait_time.get(family, 0.0) + delay
+        return delay
+
+    def on_response(self, method: str, attempt: int, status: int,
+                    headers: Optional[Mapping] = None) -> Optional[float]:
+        """응답 상태로 재시도 여부 결정 (재시도하면 대기 시간, 아니면 None)"""
+        breaker = self.breaker(method)
+
+        if status == 429:
+            breaker.release_probe()
+            retry_after = self._retry_after(headers)
+            return self._schedule_retry(method, attempt, retry_after if retry_after is not None else self.base_delay)
+
+        if status >= 500:
+            breaker.record_failure()
+            return self._schedule_retry(method, attempt, self.backoff(attempt))
+
+        # 404 등 클라이언트 오류도 서버는 정상 응답한 것
+        breaker.record_success()
+        return None
+
+    def on_error(self, method: str, attempt: int) -> Optional[float]:
+        """타임아웃/연결 오류 시 재시도 여부 결정"""
+        self.breaker(method).record_failure()
+        return self._schedule_retry(method, attempt, self.backoff(attempt))
+
+    def wait_for_circuit(self, method: str) -> bool:
+        """
+        서킷이 열려 있으면 닫히거나 시험 요청 차례가 올 때까지 대기
+        half-open 시험 요청이면 True - 응답/에러를 기록하지 못하고 끝나면 release_probe를 호출해야 합니다.
+        """
+        breaker = self.breaker(method)
+        while True:
+            wait, probe = breaker.acquire()
+            if wait <= 0:
+                return probe
+            time.sleep(wait)
+
+    async def async_wait_for_circuit(self, method: str) -> bool:
+        """서킷이 열려 있으면 대기 (비동기, 반환값은 wait_for_circuit과 같음)"""
+        breaker = self.breaker(method)
+        while True:
+            wait, probe = breaker.acquire()
+            if wait <= 0:
+                return probe
+            await asyncio.sleep(wait)
+
+    def release_probe(self, method: str):
+        """시험 요청이 예상하지 못한 예외로 끝났을 때 다음 시험 요청 허용 (계열 전체가 대기에서 멈추지 않도록)"""
+        self.breaker(method).release_probe()
+
+    def get_stats(self) -> Dict:
+        """재시도/서킷 브레이커 통계 반환"""
+        with self._lock:
+            families = set(self.retries) | set(self.gave_up) | set(self.breakers)
+            return {
+                'retries': sum(self.retries.values()),
+                'retry_wait_time': sum(self.retry_wait_time.values()),
+                'retries_exhausted': sum(self.gave_up.values()),
+                'circuit_breaker_opens': sum(breaker.open_count for breaker in self.breakers.values()),
+                'retry_by_family': {
+                    family: {
+                        'retries': self.retries.get(family, 0),
+                        'retry_wait_time': self.retry_wait_time.get(family, 0.0),
+                        'retries_exhausted': self.gave_up.get(family, 0),
+                        'circuit_state': self.breakers[family].state if family in self.breakers else CircuitBreaker.CLOSED,
+                        'circuit_breaker_opens': self.breakers[family].open_count if family in self.breakers else 0
+                    }
+                    for family in sorted(families)
+                }
+            }
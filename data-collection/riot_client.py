@@ -1,11 +1,22 @@
 import os
+import json
 import requests
 import time
 import logging
+import threading
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http_session import PooledHttpSession
+from concurrency import ThreadSafeIdSet
+from match_cache import MatchDetailCache
+from match_decoder import MatchDecoder, TimelineDecoder
+from match_fields import extract_participant_rows
+from records import ChallengerRecord, MatchRecord, ParticipantRecord
+from retry_policy import RetryEngine
 
 # 상위 디렉토리의 모듈들 import
 import sys
@@ -15,7 +26,8 @@ sys.path.insert(0, parent_dir)
 
 try:
     from config import Config
-    from rate_limiter import AdaptiveRateLimit
+    from rate_limiter import RateLimitManager, RiotRateLimit
+    from rate_limit_backend import create_rate_limit_store
 except ImportError as e:
     print(f"Import error: {e}")
     print("config.py와 rate_limiter.py가 상위 디렉토리에 있는지 확인하세요.")
@@ -23,12 +35,40 @@ except ImportError as e:
     class Config:
         RIOT_BASE_URL = "https://kr.api.riotgames.com"
         RIOT_MATCH_URL = "https://asia.api.riotgames.com"
+        RIOT_API_HOST_TEMPLATE = "https://{host}.api.riotgames.com"
         DEFAULT_QUEUE = "RANKED_SOLO_5x5"
         DEFAULT_MATCH_COUNT = 20
         API_RATE_LIMIT_DELAY = 0.5
         RETRY_DELAY = 2.0
         MAX_RETRIES = 3
+        RETRY_MAX_DELAY = 60.0
+        CIRCUIT_FAILURE_THRESHOLD = 5
+        CIRCUIT_RESET_TIMEOUT = 30.0
         PLAYER_BATCH_DELAY = 1.0
+        HTTP_POOL_CONNECTIONS = 4
+        HTTP_POOL_MAXSIZE = 10
+        HTTP_KEEPALIVE_IDLE = 60
+        HTTP_TIMEOUT = 30.0
+        HTTP_WARMUP = False
+        COLLECTION_ENGINE = os.getenv("COLLECTION_ENGINE", "sync")
+        ASYNC_MAX_CONCURRENCY = 20
+        THREAD_POOL_WORKERS = 8
+        RIOT_APP_RATE_LIMITS = "20:1,100:120"
+        RATE_LIMIT_WINDOW_PADDING = 0.05
+        RATE_LIMIT_BACKEND = "memory"
+        RATE_LIMIT_SQLITE_PATH = "/tmp/riot_rate_limit.sqlite3"
+        RATE_LIMIT_REDIS_URL = "redis://localhost:6379/0"
+        MATCH_CACHE_ENABLED = False
+        MATCH_CACHE_DIR = "/tmp/riot_match_cache"
+        MATCH_CACHE_MAX_BYTES = 256 * 1024 * 1024
+        MATCH_CACHE_SEGMENT_BYTES = 16 * 1024 * 1024
+        TIMELINE_RATE_LIMITS = "5:1,40:120"
+        MATCH_QUEUE_IDS = "420"
+        MATCH_TYPE = "ranked"
+        QUEUE_FILTER_SAMPLE_PLAYERS = 0
+        FAST_JSON_DECODE = True
+        WATERMARK_MAX_NEW_MATCHES = 100
+        MATCH_IDS_PAGE_SIZE = 100
         riot_api_key = os.getenv("RIOT_API_KEY")
         project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
         dataset_id = "riot_analytics"
@@ -36,24 +76,93 @@ except ImportError as e:
         matches_per_player = 20 if is_production else 5
         challenger_count = 300 if is_production else 50
     
-    # 단순한 레이트 리미터 폴백
-    class AdaptiveRateLimit:
-        def __init__(self, initial_delay=0.5, max_delay=10.0, min_delay=0.1):
-            self.delay = initial_delay
-        def wait_if_needed(self):
+    # 단순한 레이트 리미터 폴백 (고정 딜레이)
+    class RiotRateLimit:
+        def __init__(self, app_limits="20:1,100:120", **kwargs):
+            self.delay = 0.5
+        def wait_if_needed(self, method=None):
             import time
             time.sleep(self.delay)
-        def record_response(self, status_code, response_time=None):
-            if status_code == 429:
-                self.delay = min(self.delay * 1.5, 10.0)
+        async def async_wait_if_needed(self, method=None):
+            import asyncio
+            await asyncio.sleep(self.delay)
+        def record_response(self, status_code, response_time=None, headers=None, method=None):
+            pass
+        async def async_record_response(self, status_code, response_time=None, headers=None, method=None):
+            pass
         def get_stats(self):
             return {'total_requests': 0, 'rate_limited_requests': 0, 'rate_limit_percentage': 0, 'total_wait_time': 0, 'avg_wait_time_per_request': 0}
+    
+    class RateLimitManager:
+        def __init__(self, app_limits="20:1,100:120", **kwargs):
+            self.limiters = {}
+        def get_limiter(self, endpoint):
+            return self.limiters.setdefault(endpoint, RiotRateLimit())
+        def get_global_stats(self):
+            return {endpoint: limiter.get_stats() for endpoint, limiter in self.limiters.items()}
+        def get_stats(self):
+            return RiotRateLimit().get_stats()
+        def create_budget(self, name, limits):
+            return RiotRateLimit(limits)
+    
+    def create_rate_limit_store(backend="memory", **kwargs):
+        return None
 
 # 로거 설정
 logger = logging.getLogger(__name__)
 
+KST = ZoneInfo("Asia/Seoul")
+
+
+def current_rss_mb() -> Optional[float]:
+    """현재 프로세스 RSS(MB), 리눅스(/proc)가 아니면 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def estimate_records_bytes(records) -> int:
+    """레코드 목록이 차지하는 대략적인 메모리(바이트): 레코드 튜플과 필드 값 크기의 합 (중첩 객체는 한 단계만)"""
+    return sum(sys.getsizeof(record) + sum(map(sys.getsizeof, record)) for record in records)
+
+# 레이트 리밋 메서드 키 (X-Method-Rate-Limit이 적용되는 엔드포인트 단위)
+LEAGUE_V4_CHALLENGER = "league-v4.challenger"
+LEAGUE_V4_GRANDMASTER = "league-v4.grandmaster"
+LEAGUE_V4_MASTER = "league-v4.master"
+LEAGUE_EXP_V4_ENTRIES = "league-exp-v4.entries"
+MATCH_V5_IDS = "match-v5.ids"
+MATCH_V5_DETAIL = "match-v5.detail"
+MATCH_V5_TIMELINE = "match-v5.timeline"
+
+# 최상위 티어 -> (league-v4 경로, 레이트 리밋 메서드 키)
+APEX_LEAGUES = {
+    "CHALLENGER": ("challengerleagues", LEAGUE_V4_CHALLENGER),
+    "GRANDMASTER": ("grandmasterleagues", LEAGUE_V4_GRANDMASTER),
+    "MASTER": ("masterleagues", LEAGUE_V4_MASTER)
+}
+
+# 플랫폼 -> match-v5 지역 라우팅 값 (레이트 리밋도 라우팅 값 단위로 적용됨)
+PLATFORM_ROUTING = {
+    "KR": "asia", "JP1": "asia",
+    "NA1": "americas", "BR1": "americas", "LA1": "americas", "LA2": "americas",
+    "EUW1": "europe", "EUN1": "europe", "TR1": "europe", "RU": "europe", "ME1": "europe",
+    "OC1": "sea", "PH2": "sea", "SG2": "sea", "TH2": "sea", "TW2": "sea", "VN2": "sea"
+}
+
 class RiotClient:
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None, platform: Optional[str] = None,
+                 rate_limits: Optional["RateLimitManager"] = None,
+                 match_cache_max_bytes: Optional[int] = None,
+                 timeline_budget: Optional["RiotRateLimit"] = None):
+        """
+        platform을 지정하면 해당 플랫폼 호스트와 지역 라우팅 호스트로 요청합니다 (없으면 RIOT_BASE_URL/RIOT_MATCH_URL).
+        rate_limits를 넘기면 같은 지역 라우팅 값을 쓰는 다른 클라이언트와 레이트 리밋 예산을 공유합니다.
+        timeline_budget도 같은 방식으로 지역 단위 타임라인 예산을 공유합니다 (없으면 rate_limits 저장소에 새로 생성).
+        match_cache_max_bytes는 이 클라이언트의 매치 캐시 용량입니다 (없으면 MATCH_CACHE_MAX_BYTES 전체).
+        """
         load_dotenv()
         self.config = config or Config()
         self.api_key = self.config.riot_api_key
@@ -61,43 +170,204 @@ class RiotClient:
         if not self.api_key:
             raise ValueError("RIOT_API_KEY가 설정되지 않았습니다. 환경변수를 확인해주세요.")
         
-        self.base_url = self.config.RIOT_BASE_URL
-        self.match_url = self.config.RIOT_MATCH_URL
+        if platform:
+            self.platform = platform.upper()
+            if self.platform not in PLATFORM_ROUTING:
+                raise ValueError(f"지원하지 않는 플랫폼입니다: {platform}")
+            self.region = PLATFORM_ROUTING[self.platform]
+            self.base_url = self.config.RIOT_API_HOST_TEMPLATE.format(host=self.platform.lower())
+            self.match_url = self.config.RIOT_API_HOST_TEMPLATE.format(host=self.region)
+        else:
+            self.platform = "KR"
+            self.region = PLATFORM_ROUTING[self.platform]
+            self.base_url = self.config.RIOT_BASE_URL
+            self.match_url = self.config.RIOT_MATCH_URL
         self.queue = self.config.DEFAULT_QUEUE
         
         self.headers = {
             'X-Riot-Token': self.api_key
         }
-        self.kst_now = datetime.now(ZoneInfo("Asia/Seoul"))
+        self.kst_now = datetime.now(KST)
         
-        # 적응형 레이트 리미터 설정
-        self.rate_limiter = AdaptiveRateLimit(
-            initial_delay=self.config.API_RATE_LIMIT_DELAY,
-            max_delay=10.0,
-            min_delay=0.1
+        # 호스트별 커넥션 풀 세션 (TLS 연결 재사용)
+        self.http = PooledHttpSession(
+            headers=self.headers,
+            pool_connections=self.config.HTTP_POOL_CONNECTIONS,
+            # 스레드 풀 모드에서 워커가 커넥션을 기다리지 않도록 풀 크기 확보
+            pool_maxsize=max(self.config.HTTP_POOL_MAXSIZE, self.config.THREAD_POOL_WORKERS),
+            keepalive_idle=self.config.HTTP_KEEPALIVE_IDLE,
+            timeout=self.config.HTTP_TIMEOUT
         )
+        
+        # 엔드포인트별 레이트 리미터 (앱 전체 한도는 공유, 첫 응답 전까지는 설정값 사용)
+        # 상태 저장소를 sqlite/redis로 두면 여러 프로세스가 같은 예산을 나눠 씀 (지역 라우팅 값별로 분리)
+        if rate_limits is None:
+            rate_limit_store = create_rate_limit_store(
+                backend=self.config.RATE_LIMIT_BACKEND,
+                sqlite_path=self.config.RATE_LIMIT_SQLITE_PATH,
+                redis_url=self.config.RATE_LIMIT_REDIS_URL
+            )
+            rate_limits = RateLimitManager(
+                app_limits=self.config.RIOT_APP_RATE_LIMITS,
+                window_padding=self.config.RATE_LIMIT_WINDOW_PADDING,
+                default_retry_after=self.config.RETRY_DELAY,
+                store=rate_limit_store,
+                namespace=f"riot-rate:{self.region}" if platform else "riot-rate"
+            )
+        self.rate_limits = rate_limits
+        
+        # 타임라인 전용 요청 예산 (앱 한도 안에서 매치 수집 몫을 남기도록 추가로 제한, 지역 단위)
+        if timeline_budget is None:
+            timeline_budget = self.rate_limits.create_budget("timeline", self.config.TIMELINE_RATE_LIMITS)
+        self.timeline_budget = timeline_budget
+        
+        # 재시도/백오프 정책과 엔드포인트 계열별 서킷 브레이커
+        self.retry_engine = RetryEngine(
+            max_retries=self.config.MAX_RETRIES,
+            base_delay=self.config.RETRY_DELAY,
+            max_delay=self.config.RETRY_MAX_DELAY,
+            failure_threshold=self.config.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=self.config.CIRCUIT_RESET_TIMEOUT
+        )
+        
+        # 매치 상세 응답 로컬 캐시 (실행 간 재사용)
+        self.match_cache = None
+        if self.config.MATCH_CACHE_ENABLED:
+            self.match_cache = MatchDetailCache(
+                # 플랫폼별 클라이언트가 같은 세그먼트 파일에 쓰지 않도록 디렉토리 분리
+                cache_dir=os.path.join(self.config.MATCH_CACHE_DIR, self.platform.lower()) if platform else self.config.MATCH_CACHE_DIR,
+                max_bytes=match_cache_max_bytes or self.config.MATCH_CACHE_MAX_BYTES,
+                segment_bytes=self.config.MATCH_CACHE_SEGMENT_BYTES
+            )
+        
+        # 매치 상세 응답 디코더 (msgspec 설치 시 필요한 필드만 디코딩)
+        self.match_decoder = MatchDecoder(fast=self.config.FAST_JSON_DECODE)
+        self.timeline_decoder = TimelineDecoder(fast=self.config.FAST_JSON_DECODE)
+        
+        # 매치 ID 조회 필터 (큐 ID 목록, 큐를 지정하지 않으면 게임 유형) 및 절약한 상세 호출 추정용 통계
+        self.queue_ids = [int(queue) for queue in self.config.MATCH_QUEUE_IDS.split(',') if queue.strip()]
+        self.match_type = self.config.MATCH_TYPE or None
+        self.filtered_match_ids = 0
+        self.queue_filter_samples_left = self.config.QUEUE_FILTER_SAMPLE_PLAYERS
+        self.queue_filter_sampled_players = 0
+        self.queue_filter_sampled_kept = 0
+        self.queue_filter_sampled_skipped = 0
+        
+        # 이미 저장된 match_id 인덱스 (파이프라인에서 주입)
+        self.known_match_index = None
+        self.skipped_known_matches = 0
+        
+        # 다른 플레이어/스레드가 이미 처리했거나 처리 중이라 보내지 않은 매치 상세 요청 수
+        self.coalesced_requests = 0
+        
+        # 플레이어별 수집 기준점 (파이프라인에서 주입)
+        self.player_watermarks = None
+        
+        # 중단/재개용 진행 상황 체크포인트 (파이프라인에서 주입)
+        self.checkpoint = None
+        
+        # 메서드별 요청 수와 실패 수 (재시도 후 최종 결과 기준, 404는 정상 응답)
+        self.request_counts: Dict[str, int] = {}
+        self.request_errors: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+    
+    def _record_request(self, method: str, ok: bool):
+        with self._stats_lock:
+            self.request_counts[method] = self.request_counts.get(method, 0) + 1
+            if not ok:
+                self.request_errors[method] = self.request_errors.get(method, 0) + 1
+    
+    def claim_match(self, claimed_ids: ThreadSafeIdSet, match_id: str) -> bool:
+        """매치 상세 처리 선점 (이미 처리했거나 처리 중이면 False, 막은 중복 요청 수 집계)"""
+        if claimed_ids.claim(match_id):
+            return True
+        self._count_coalesced()
+        return False
+    
+    def _count_coalesced(self):
+        with self._stats_lock:
+            self.coalesced_requests += 1
+    
+    def request_outcome(self, method: str) -> Tuple[int, int]:
+        """메서드의 (요청 수, 실패 수)"""
+        with self._stats_lock:
+            return self.request_counts.get(method, 0), self.request_errors.get(method, 0)
+    
+    def _request(self, method: str, url: str, params: Optional[Dict] = None) -> requests.Response:
+        """
+        레이트 리밋, 재시도, 서킷 브레이커를 적용한 GET 요청
+        재시도 대상(429, 5xx, 타임아웃/연결 오류)은 MAX_RETRIES번까지 다시 보내고,
+        모두 실패하면 마지막 응답을 반환하거나 마지막 예외를 그대로 던집니다.
+        """
+        try:
+            response = self._request_with_retries(method, url, params)
+        except Exception:
+            self._record_request(method, ok=False)
+            raise
+        self._record_request(method, ok=response.status_code < 400 or response.status_code == 404)
+        return response
+    
+    def _request_with_retries(self, method: str, url: str, params: Optional[Dict]) -> requests.Response:
+        limiter = self.rate_limits.get_limiter(method)
+        attempt = 0
+        
+        while True:
+            # 엔드포인트 계열이 불안정하면 대기 후 레이트 리밋 대기
+            probe = self.retry_engine.wait_for_circuit(method)
+            recorded = False
+            try:
+                limiter.wait_if_needed()
+                
+                try:
+                    start_time = time.time()
+                    response = self.http.get(url, params=params)
+                    response_time = time.time() - start_time
+                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                    recorded = True
+                    delay = self.retry_engine.on_error(method, attempt)
+                    if delay is None:
+                        raise
+                    logger.warning(f"요청 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.config.MAX_RETRIES}): {e}")
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                
+                # 레이트 리미터에 응답 기록 (429면 Retry-After 동안 해당 범위 차단)
+                limiter.record_response(response.status_code, response_time, headers=response.headers)
+                
+                recorded = True
+                delay = self.retry_engine.on_response(method, attempt, response.status_code, response.headers)
+                if delay is None:
+                    return response
+            finally:
+                # 시험 요청이 결과를 기록하기 전에 다른 예외로 끝나면 시험 요청 표시 해제
+                if probe and not recorded:
+                    self.retry_engine.release_probe(method)
+            
+            logger.warning(f"{response.status_code} 응답, {delay:.1f}초 후 재시도 "
+                           f"({attempt + 1}/{self.config.MAX_RETRIES}): {url}")
+            time.sleep(delay)
+            attempt += 1
+    
+    def warm_up_connections(self) -> int:
+        """플랫폼/지역 호스트 TLS 연결을 미리 수립 (수집 시작 직전에 호출, 성공한 호스트 수 반환)"""
+        return self.http.warm_up(self.base_url, self.match_url)
     
     def get_challenger_league(self) -> Optional[Dict]:
         """챌린저 리그 정보 조회"""
-        url = f"{self.base_url}/lol/league/v4/challengerleagues/by-queue/{self.queue}"
-        
-        # 레이트 리밋 대기
-        self.rate_limiter.wait_if_needed()
+        return self.get_apex_league("CHALLENGER")
+    
+    def get_apex_league(self, tier: str) -> Optional[Dict]:
+        """최상위 티어(챌린저/그랜드마스터/마스터) 리그 정보 조회 (리그 전체가 한 번에 응답됨)"""
+        path, method = APEX_LEAGUES[tier]
+        url = f"{self.base_url}/lol/league/v4/{path}/by-queue/{self.queue}"
         
         try:
-            start_time = time.time()
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response_time = time.time() - start_time
-            
-            # 레이트 리미터에 응답 기록
-            self.rate_limiter.record_response(response.status_code, response_time)
+            response = self._request(method, url)
             
             if response.status_code == 200:
-                logger.info(f"챌린저 리그 데이터 조회 성공 (응답시간: {response_time:.2f}s)")
+                logger.info(f"{tier} 리그 데이터 조회 성공 (응답시간: {response.elapsed.total_seconds():.2f}s)")
                 return response.json()
-            elif response.status_code == 429:
-                logger.warning(f"레이트 리밋 발생, 자동 조정됨")
-                return self.get_challenger_league()  # 재귀 호출로 재시도
             else:
                 logger.error(f"API 호출 실패: {response.status_code} - {response.text}")
                 return None
@@ -114,56 +384,93 @@ class RiotClient:
         except Exception as e:
             logger.error(f"예상치 못한 에러: {e}")
             return None
+    
+    def get_league_entries_page(self, tier: str, division: str, page: int = 1) -> Optional[List[Dict]]:
+        """league-exp 티어/디비전 엔트리 한 페이지 조회 (빈 목록이면 마지막 페이지 이후, 실패 시 None)"""
+        url = f"{self.base_url}/lol/league-exp/v4/entries/{self.queue}/{tier}/{division}"
+        
+        try:
+            response = self._request(LEAGUE_EXP_V4_ENTRIES, url, params={"page": page})
+            
+            if response.status_code == 200:
+                entries = response.json()
+                logger.debug(f"리그 엔트리 조회 성공: {tier} {division} {page}페이지 {len(entries)}명")
+                return entries
+            else:
+                logger.error(f"리그 엔트리 조회 실패: {response.status_code} ({tier} {division} {page}페이지)")
+                return None
+
+        except requests.exceptions.Timeout:
+            logger.error(f"리그 엔트리 조회 타임아웃: {tier} {division} {page}페이지")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"리그 엔트리 조회 요청 에러: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"리그 엔트리 조회 예상치 못한 에러: {e}")
+            return None
 
-    def extract_challenger_data(self, raw_data: Dict) -> List[Dict]:
+    def extract_challenger_data(self, raw_data: Dict) -> List[ChallengerRecord]:
         """챌린저 데이터 변환"""
 
         if not raw_data or "entries" not in raw_data:
             return []
         
-        processed_data = []
+        return list(self.iter_ladder_entries(raw_data["entries"], tier=raw_data.get("tier", "CHALLENGER")))
+    
+    def iter_ladder_entries(self, entries: List[Dict], tier: Optional[str] = None) -> Iterator[ChallengerRecord]:
+        """리그 엔트리 변환 (league-v4 리그 응답은 티어가 상위 필드, league-exp 엔트리는 항목마다 티어 포함)"""
         current_time = self.kst_now
 
-        for entry in raw_data["entries"]:
-            processed_entry = {
-                  'puuid': entry['puuid'],
-                  'league_points': entry['leaguePoints'],
-                  'wins': entry['wins'],
-                  'losses': entry['losses'],
-                  'is_veteran': entry['veteran'],
-                  'is_hot_streak': entry['hotStreak'],
-                  'collected_at': current_time
-              }
-            processed_data.append(processed_entry)
-
-        return processed_data
-    
-    def get_match_ids_by_puuid(self, puuid: str, count: int = None) -> List[str]:
-        """puuid 기반으로 최근 매치 조회"""
+        for entry in entries:
+            yield ChallengerRecord(
+                puuid=entry['puuid'],
+                league_points=entry['leaguePoints'],
+                wins=entry['wins'],
+                losses=entry['losses'],
+                is_veteran=entry['veteran'],
+                is_hot_streak=entry['hotStreak'],
+                platform_id=self.platform,
+                tier=entry.get('tier', tier),
+                rank=entry.get('rank', 'I'),
+                collected_at=current_time
+            )
+    
+    @staticmethod
+    def _match_ids_params(count: int, since: Optional[int] = None, start: int = 0,
+                          queue: Optional[int] = None, match_type: Optional[str] = None) -> Dict:
+        """
+        매치 ID 목록 조회 파라미터 (since는 startTime으로 쓰는 epoch 초)
+        queue를 지정하면 해당 큐만, 아니면 match_type(ranked 등) 유형만 조회합니다.
+        """
+        params = {"count": count}
+        if since is not None:
+            params["startTime"] = since
+        if start:
+            params["start"] = start
+        if queue is not None:
+            params["queue"] = queue
+        elif match_type:
+            params["type"] = match_type
+        return params
+    
+    def get_match_ids_by_puuid(self, puuid: str, count: int = None,
+                               since: Optional[int] = None, start: int = 0,
+                               queue: Optional[int] = None, match_type: Optional[str] = None) -> List[str]:
+        """puuid 기반으로 최근 매치 조회 (since 이후 매치 중 start번째부터 count개, queue/match_type으로 필터)"""
         if count is None:
             count = self.config.DEFAULT_MATCH_COUNT
             
         url = f"{self.match_url}/lol/match/v5/matches/by-puuid/{puuid}/ids"
-        params = {"count": count}
-        
-        # 레이트 리밋 대기
-        self.rate_limiter.wait_if_needed()
+        params = self._match_ids_params(count, since, start, queue, match_type)
 
         try:
-            start_time = time.time()
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            response_time = time.time() - start_time
-            
-            # 레이트 리미터에 응답 기록
-            self.rate_limiter.record_response(response.status_code, response_time)
+            response = self._request(MATCH_V5_IDS, url, params=params)
             
             if response.status_code == 200:
                 match_ids = response.json()
                 logger.debug(f"매치 ID 조회 성공: {len(match_ids)}개 (PUUID: {puuid[:10]}...)")
                 return match_ids
-            elif response.status_code == 429:
-                logger.warning("매치 ID 조회 레이트 리밋, 자동 재시도")
-                return self.get_match_ids_by_puuid(puuid, count)
             elif response.status_code == 404:
                 logger.warning(f"플레이어 매치 기록 없음: {puuid[:10]}...")
                 return []
@@ -184,27 +491,124 @@ class RiotClient:
             logger.error(f"매치 ID 조회 예상치 못한 에러: {e}")
             return []
         
+    def get_new_match_ids(self, puuid: str, count: int) -> List[str]:
+        """
+        기준점 이후의 매치 ID만 조회 (MATCH_QUEUE_IDS 큐만, 큐를 지정하지 않으면 MATCH_TYPE 유형만)
+        기준점이 없는 플레이어는 최근 count개를, 있는 플레이어는 기준점 이후 매치를
+        count개(최대 WATERMARK_MAX_NEW_MATCHES개)까지 페이지 단위로 조회합니다.
+        큐를 여러 개 지정하면 큐마다 조회한 뒤 최신순으로 합칩니다.
+        """
+        watermark = self.player_watermarks.get(puuid) if self.player_watermarks else None
+        limit = count if watermark is None else min(count, self.config.WATERMARK_MAX_NEW_MATCHES)
+        
+        match_ids = self._merge_queue_results(
+            [self._list_match_ids(puuid, count, watermark, queue) for queue in self.queue_ids or [None]],
+            limit
+        )
+        
+        # 일부 플레이어는 필터 없이도 조회해 필터로 걸러낸 비율 추정
+        if self._take_queue_filter_sample():
+            unfiltered = self.get_match_ids_by_puuid(
+                puuid, min(limit, self.config.MATCH_IDS_PAGE_SIZE),
+                since=None if watermark is None else watermark + 1
+            )
+            self._record_queue_filter_sample(unfiltered, match_ids)
+        
+        if self.player_watermarks:
+            self.player_watermarks.record_listing(puuid, match_ids)
+        if watermark is not None:
+            logger.debug(f"기준점 이후 매치 {len(match_ids)}개 (PUUID: {puuid[:10]}...)")
+        return match_ids
+    
+    def _list_match_ids(self, puuid: str, count: int, watermark: Optional[int], queue: Optional[int]) -> List[str]:
+        """큐 하나에 대해 기준점 규칙대로 매치 ID 조회"""
+        if watermark is None:
+            return self.get_match_ids_by_puuid(puuid, count, queue=queue, match_type=self.match_type)
+        
+        limit = min(count, self.config.WATERMARK_MAX_NEW_MATCHES)
+        match_ids = []
+        while len(match_ids) < limit:
+            page_size = min(self.config.MATCH_IDS_PAGE_SIZE, limit - len(match_ids))
+            # 기준점 매치 자체는 제외
+            page = self.get_match_ids_by_puuid(puuid, page_size, since=watermark + 1, start=len(match_ids),
+                                               queue=queue, match_type=self.match_type)
+            match_ids.extend(page)
+            if len(page) < page_size:
+                break
+        return match_ids
+    
+    def _merge_queue_results(self, results: List[List[str]], limit: int) -> List[str]:
+        """큐별 매치 ID 목록을 최신순으로 합쳐 limit개 반환 (match_id 숫자 부분이 게임 ID)"""
+        if len(results) == 1:
+            match_ids = results[0]
+        else:
+            match_ids = sorted(set().union(*results), key=lambda match_id: int(match_id.rsplit('_', 1)[-1]), reverse=True)[:limit]
+        
+        with self._stats_lock:
+            self.filtered_match_ids += len(match_ids)
+        return match_ids
+    
+    def _take_queue_filter_sample(self) -> bool:
+        """필터 효과 추정용 샘플을 더 조회할지 여부 (QUEUE_FILTER_SAMPLE_PLAYERS명까지)"""
+        if not self.queue_ids and not self.match_type:
+            return False
+        with self._stats_lock:
+            if self.queue_filter_samples_left <= 0:
+                return False
+            self.queue_filter_samples_left -= 1
+            return True
+    
+    def _record_queue_filter_sample(self, unfiltered_ids: List[str], filtered_ids: List[str]):
+        """필터 없이 조회한 최근 매치 중 필터를 통과한 매치와 걸러진 매치 수 집계"""
+        filtered = set(filtered_ids)
+        kept = sum(1 for match_id in unfiltered_ids if match_id in filtered)
+        with self._stats_lock:
+            self.queue_filter_sampled_players += 1
+            self.queue_filter_sampled_kept += kept
+            self.queue_filter_sampled_skipped += len(unfiltered_ids) - kept
+        
     def get_match_details(self, match_id: str) -> Optional[Dict]:
-        """매치 상세정보 조회"""
-        url = f"{self.match_url}/lol/match/v5/matches/{match_id}"
+        """매치 상세정보 조회 (로컬 캐시 우선)"""
+        cached = self.get_cached_match_details(match_id)
+        if cached is not None:
+            return cached
+        
+        return self._fetch_match_details(match_id)
+    
+    def get_match_payload(self, match_id: str) -> Optional[bytes]:
+        """매치 상세 원본 응답 바이트 (로컬 캐시 우선, 디코딩은 받는 쪽에서 - 프로세스 풀 변환용)"""
+        if self.match_cache:
+            payload = self.match_cache.get(match_id)
+            if payload is not None:
+                logger.debug(f"매치 상세정보 캐시 적중: {match_id}")
+                return payload
+        
+        return self._fetch_match_payload(match_id)
+    
+    def _fetch_match_details(self, match_id: str) -> Optional[Dict]:
+        """매치 상세정보 API 호출 후 디코딩"""
+        payload = self._fetch_match_payload(match_id)
+        if payload is None:
+            return None
         
-        # 레이트 리밋 대기
-        self.rate_limiter.wait_if_needed()
+        try:
+            return self.match_decoder.decode(payload)
+        except Exception as e:
+            logger.error(f"매치 상세정보 디코딩 에러: {match_id} - {e}")
+            return None
+    
+    def _fetch_match_payload(self, match_id: str) -> Optional[bytes]:
+        """매치 상세정보 API 호출 (원본 응답 바이트, 성공하면 로컬 캐시에 저장)"""
+        url = f"{self.match_url}/lol/match/v5/matches/{match_id}"
 
         try:
-            start_time = time.time()
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response_time = time.time() - start_time
-            
-            # 레이트 리미터에 응답 기록
-            self.rate_limiter.record_response(response.status_code, response_time)
+            response = self._request(MATCH_V5_DETAIL, url)
             
             if response.status_code == 200:
                 logger.debug(f"매치 상세정보 조회 성공: {match_id}")
-                return response.json()
-            elif response.status_code == 429:
-                logger.warning(f"매치 상세정보 조회 레이트 리밋, 자동 재시도: {match_id}")
-                return self.get_match_details(match_id)
+                if self.match_cache:
+                    self.match_cache.put(match_id, response.content)
+                return response.content
             elif response.status_code == 404:
                 logger.warning(f"매치를 찾을 수 없음: {match_id}")
                 return None
@@ -225,166 +629,362 @@ class RiotClient:
             logger.error(f"매치 상세정보 조회 예상치 못한 에러: {e}")
             return None
         
-    def extract_match_data(self, match_data: Dict) -> Dict:
+    def get_match_timeline(self, match_id: str) -> Optional[Dict]:
+        """매치 타임라인 조회 (응답이 커서 캐시하지 않음)"""
+        url = f"{self.match_url}/lol/match/v5/matches/{match_id}/timeline"
+        self.timeline_budget.wait_if_needed()
+
+        try:
+            response = self._request(MATCH_V5_TIMELINE, url)
+            
+            if response.status_code == 200:
+                logger.debug(f"매치 타임라인 조회 성공: {match_id}")
+                return self.timeline_decoder.decode(response.content)
+            elif response.status_code == 404:
+                logger.warning(f"매치 타임라인을 찾을 수 없음: {match_id}")
+                return None
+            else:
+                logger.error(f"매치 타임라인 조회 실패: {response.status_code} - {match_id}")
+                return None
+            
+        except requests.exceptions.Timeout:
+            logger.error(f"매치 타임라인 조회 타임아웃: {match_id}")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"매치 타임라인 조회 요청 에러: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"매치 타임라인 조회 예상치 못한 에러: {e}")
+            return None
+        
+    def is_known_match(self, match_id: str) -> bool:
+        """이미 저장된 매치인지 확인하고 건너뛴 횟수 집계"""
+        if self.known_match_index is None or match_id not in self.known_match_index:
+            return False
+        
+        with self._stats_lock:
+            self.skipped_known_matches += 1
+        logger.debug(f"이미 저장된 매치 스킵: {match_id}")
+        return True
+        
+    def get_cached_match_details(self, match_id: str) -> Optional[Dict]:
+        """로컬 캐시에 있는 매치 상세정보 반환 (없으면 None)"""
+        if not self.match_cache:
+            return None
+        
+        payload = self.match_cache.get(match_id)
+        if payload is None:
+            return None
+        
+        try:
+            logger.debug(f"매치 상세정보 캐시 적중: {match_id}")
+            return self.match_decoder.decode(payload)
+        except ValueError:
+            logger.warning(f"매치 캐시 데이터 손상: {match_id}")
+            return None
+        
+    def extract_match_data(self, match_data: Dict) -> Optional[MatchRecord]:
         """매치 데이터 변환"""
 
         if not match_data:
-            return {}
+            return None
         
         metadata = match_data.get("metadata", {})
         info = match_data.get("info", {})
 
         # 기본 매치 정보
-        match_record = {
-            'match_id': metadata.get('matchId'),  # 매치 고유 ID (REQUIRED)
-            'data_version': metadata.get('dataVersion', '1.0'),  # API 데이터 버전 (REQUIRED)
-            'game_creation': datetime.fromtimestamp(info.get('gameCreation', 0) / 1000, tz=ZoneInfo("Asia/Seoul")),  # 게임 생성 시간 KST (REQUIRED)
-            'game_duration': info.get('gameDuration', 0),  # 게임 지속 시간(초) (REQUIRED)
-            'game_mode': info.get('gameMode', 'CLASSIC'),  # 게임 모드 (CLASSIC, ARAM, CHERRY 등) (REQUIRED)
-            'game_type': info.get('gameType', 'MATCHED_GAME'),  # 게임 타입 (MATCHED_GAME 등) (REQUIRED)
-            'game_version': info.get('gameVersion', '14.18'),  # 게임 클라이언트 버전 (REQUIRED)
-            'queue_id': info.get('queueId', 420),  # 큐 ID (420=랭크, 1700=아레나 등) (REQUIRED)
-            'map_id': info.get('mapId', 11),  # 맵 ID (11=소환사의 협곡) (REQUIRED)
-            'platform_id': info.get('platformId', 'KR'),  # 플랫폼 ID (KR, NA1 등) (REQUIRED)
-            'game_end_timestamp': datetime.fromtimestamp(info.get('gameEndTimestamp', 0) / 1000, tz=ZoneInfo("Asia/Seoul")) if info.get('gameEndTimestamp') else None,  # 게임 종료 시간 KST (NULLABLE)
-            'participants_count': len(info.get('participants', [])),  # 실제 참가자 수 (REQUIRED)
-            'teams_data': info.get('teams', [])  # 팀별 상세 정보 리스트 (REPEATED)
-        }
-
-        return match_record
+        return MatchRecord(
+            match_id=metadata.get('matchId'),  # 매치 고유 ID (REQUIRED)
+            data_version=metadata.get('dataVersion', '1.0'),  # API 데이터 버전 (REQUIRED)
+            game_creation=datetime.fromtimestamp(info.get('gameCreation', 0) / 1000, tz=KST),  # 게임 생성 시간 KST (REQUIRED)
+            game_duration=info.get('gameDuration', 0),  # 게임 지속 시간(초) (REQUIRED)
+            game_mode=info.get('gameMode', 'CLASSIC'),  # 게임 모드 (CLASSIC, ARAM, CHERRY 등) (REQUIRED)
+            game_type=info.get('gameType', 'MATCHED_GAME'),  # 게임 타입 (MATCHED_GAME 등) (REQUIRED)
+            game_version=info.get('gameVersion', '14.18'),  # 게임 클라이언트 버전 (REQUIRED)
+            queue_id=info.get('queueId', 420),  # 큐 ID (420=랭크, 1700=아레나 등) (REQUIRED)
+            map_id=info.get('mapId', 11),  # 맵 ID (11=소환사의 협곡) (REQUIRED)
+            platform_id=info.get('platformId', 'KR'),  # 플랫폼 ID (KR, NA1 등) (REQUIRED)
+            game_end_timestamp=datetime.fromtimestamp(info.get('gameEndTimestamp', 0) / 1000, tz=KST) if info.get('gameEndTimestamp') else None,  # 게임 종료 시간 KST (NULLABLE)
+            participants_count=len(info.get('participants', [])),  # 실제 참가자 수 (REQUIRED)
+            teams_data=info.get('teams', [])  # 팀별 상세 정보 리스트 (REPEATED)
+        )
     
-    def extract_participants_data(self, match_data: Dict) -> List[Dict]:
-        """매치 참가자 데이터 변환 (BigQuery 스키마와 완전 일치)"""
+    def extract_participants_data(self, match_data: Dict) -> List[ParticipantRecord]:
+        """매치 참가자 데이터 변환 (BigQuery 스키마와 완전 일치, 컬럼 매핑은 match_fields.PARTICIPANT_FIELDS)"""
 
         if not match_data:
             return []
-        
+
         metadata = match_data.get("metadata", {})
         info = match_data.get("info", {})
-        match_id = metadata.get("matchId")
-        game_creation_kst = datetime.fromtimestamp(info.get('gameCreation', 0) / 1000, tz=ZoneInfo("Asia/Seoul"))  # KST 변환
 
-        participants_data = []
+        # 매치 단위 값은 한 번만 계산하고, 참가자 행은 필드 선언으로 생성한 변환 함수로 만듦
+        return extract_participant_rows(
+            info.get("participants", []),
+            match_id=metadata.get("matchId"),
+            game_creation=datetime.fromtimestamp(info.get('gameCreation', 0) / 1000, tz=KST),  # 게임 생성 시간 KST (파티셔닝용)
+            collected_at=datetime.now(KST)  # 데이터 수집 시간 KST
+        )
 
-        for participant in info.get("participants", []):
-            participant_record = {
-                # 관계 키들
-                'match_id': match_id,  # 매치 ID (REQUIRED)
-                'participant_id': participant.get('participantId', 0),  # 참가자 번호 (REQUIRED)
-                'puuid': participant.get('puuid'),  # 플레이어 고유 ID (REQUIRED)
-                
-                # 플레이어 기본 정보
-                'summoner_name': participant.get('summonerName'),  # 소환사명 (NULLABLE)
-                'riot_id_game_name': participant.get('riotIdGameName'),  # 라이엇 게임명 (NULLABLE)
-                'riot_id_tagline': participant.get('riotIdTagline'),  # 라이엇 태그 (NULLABLE)
-                'summoner_level': participant.get('summonerLevel'),  # 소환사 레벨 (NULLABLE)
-                
-                # 챔피언 정보
-                'champion_id': participant.get('championId', 0),  # 챔피언 ID (REQUIRED)
-                'champion_name': participant.get('championName', 'Unknown'),  # 챔피언 이름 (REQUIRED)
-                'champion_level': participant.get('champLevel', 1),  # 챔피언 레벨 (REQUIRED)
-                
-                # 게임 결과
-                'win': participant.get('win', False),  # 승리 여부 (REQUIRED)
-                'team_id': participant.get('teamId', 100),  # 팀 ID (100=블루, 200=레드) (REQUIRED)
-                'team_position': participant.get('teamPosition'),  # 팀 내 포지션 (NULLABLE)
-                'individual_position': participant.get('individualPosition'),  # 개별 포지션 (NULLABLE)
-                
-                # 핵심 통계 (KDA)
-                'kills': participant.get('kills', 0),  # 킬 수 (REQUIRED)
-                'deaths': participant.get('deaths', 0),  # 데스 수 (REQUIRED)
-                'assists': participant.get('assists', 0),  # 어시스트 수 (REQUIRED)
-                
-                # 게임 플레이 통계
-                'total_minions_killed': participant.get('totalMinionsKilled', 0),  # CS (미니언 킬) (REQUIRED)
-                'neutral_minions_killed': participant.get('neutralMinionsKilled', 0),  # 정글 몬스터 킬 (REQUIRED)
-                'gold_earned': participant.get('goldEarned', 0),  # 획득 골드 (REQUIRED)
-                'total_damage_dealt_to_champions': participant.get('totalDamageDealtToChampions', 0),  # 챔피언 딜량 (REQUIRED)
-                'vision_score': participant.get('visionScore', 0),  # 시야 점수 (REQUIRED)
-                
-                # 아이템 정보 (6개 슬롯 + 장신구)
-                'item0': participant.get('item0', 0),  # 아이템 슬롯 0 (NULLABLE)
-                'item1': participant.get('item1', 0),  # 아이템 슬롯 1 (NULLABLE)
-                'item2': participant.get('item2', 0),  # 아이템 슬롯 2 (NULLABLE)
-                'item3': participant.get('item3', 0),  # 아이템 슬롯 3 (NULLABLE)
-                'item4': participant.get('item4', 0),  # 아이템 슬롯 4 (NULLABLE)
-                'item5': participant.get('item5', 0),  # 아이템 슬롯 5 (NULLABLE)
-                'item6': participant.get('item6', 0),  # 아이템 슬롯 6 (장신구) (NULLABLE)
-                
-                # 스펠 정보
-                'summoner1_id': participant.get('summoner1Id'),  # 소환사 주문 1 (NULLABLE)
-                'summoner2_id': participant.get('summoner2Id'),  # 소환사 주문 2 (NULLABLE)
-                
-                # 특수 모드 (아레나 등)
-                'placement': participant.get('placement'),  # 순위 (아레나 모드용) (NULLABLE)
-                'subteam_placement': participant.get('subteamPlacement'),  # 서브팀 순위 (NULLABLE)
-                
-                # 상세 통계 및 메타데이터
-                'detailed_stats': participant,  # 전체 상세 통계 (JSON) (NULLABLE)
-                'game_creation': game_creation_kst,  # 게임 생성 시간 KST (파티셔닝용) (REQUIRED)
-                'collected_at': datetime.now(ZoneInfo("Asia/Seoul"))  # 데이터 수집 시간 KST (REQUIRED)
-            }
+    def _collect_player_matches(self, puuid: str, matches_per_player: int,
+                                processed_match_ids: ThreadSafeIdSet) -> tuple[List[MatchRecord], List[ParticipantRecord]]:
+        """한 플레이어의 최근 매치 수집 (스레드 풀 작업 단위)"""
+
+        # 이전 실행에서 ID 조회를 마친 플레이어는 재개 시 건너뜀 (남은 매치는 체크포인트에서 처리)
+        if self.checkpoint and self.checkpoint.is_player_done(puuid):
+            return [], []
 
-            participants_data.append(participant_record)
+        # 유저별 최근 매치 ID 조회 (기준점 이후만)
+        match_ids = self.get_new_match_ids(puuid, matches_per_player)
+        if self.checkpoint:
+            self.checkpoint.record_player(puuid, match_ids)
 
-        return participants_data
+        return self._collect_match_ids(match_ids, processed_match_ids)
     
-    def collect_matches_for_challengers(self, challenger_data: List[Dict], matches_per_player: int = 5) -> tuple[List[Dict], List[Dict]]:
-        """챌린저 유저들 매치 데이터 수집"""
+    def _collect_match_ids(self, match_ids: List[str],
+                           processed_match_ids: ThreadSafeIdSet) -> tuple[List[MatchRecord], List[ParticipantRecord]]:
+        """매치 ID 목록의 상세 조회 및 변환 (처리 중이거나 저장된 매치 제외)"""
 
-        all_matches = []
-        all_participants = []
-        processed_match_ids = set()
+        player_matches = []
+        player_participants = []
 
-        print(f"총 {len(challenger_data)}명의 챌린저 유저 매치 수집 시작")
+        for match_id in match_ids:
+            # 이미 처리했거나 다른 스레드가 처리 중인 매치 스킵
+            if not self.claim_match(processed_match_ids, match_id):
+                continue
+            
+            # BigQuery에 이미 저장된 매치 스킵
+            if self.is_known_match(match_id):
+                continue
+            
+            # 매치 상세 정보 조회
+            match_details = self.get_match_details(match_id)
+            if not match_details:
+                # 실패한 매치는 다른 플레이어 차례에 다시 시도
+                processed_match_ids.discard(match_id)
+                continue
 
-        for i, player in enumerate(challenger_data):
-            puuid = player['puuid']
-            print(f"{i+1}/{len(challenger_data)} - PUUID : {puuid[:20]}")
+            # 매치 기본정보 추출
+            match_record = self.extract_match_data(match_details)
+            if match_record:
+                player_matches.append(match_record)
 
-            # 유저별 최근 매치 ID 조회
-            match_ids = self.get_match_ids_by_puuid(puuid, matches_per_player)
+            # 매치 상세정보 추출
+            participants = self.extract_participants_data(match_details)
+            player_participants.extend(participants)
 
-            for match_id in match_ids:
-                # 이미 처리한 매치 스킵
-                if match_id in processed_match_ids:
-                    continue
-                
-                # 매치 상세 정보 조회
-                match_details = self.get_match_details(match_id)
-                if not match_details:
-                    continue
+        return player_matches, player_participants
+    
+    def pending_match_ids(self) -> List[str]:
+        """체크포인트에 남은 미저장 match_id 중 이 플랫폼 매치 (match_id 형식: {플랫폼}_{게임ID})"""
+        if not self.checkpoint:
+            return []
+        prefix = f"{self.platform}_"
+        return [match_id for match_id in self.checkpoint.pending_match_ids() if match_id.startswith(prefix)]
+    
+    def _collect_resumed_matches(self, processed_match_ids: ThreadSafeIdSet) -> tuple[List[MatchRecord], List[ParticipantRecord]]:
+        """체크포인트에 남은 미저장 매치 수집 (로컬 캐시에 있으면 API 호출 없음)"""
+        if not self.checkpoint:
+            return [], []
+        
+        pending_match_ids = self.pending_match_ids()
+        if pending_match_ids:
+            logger.info(f"체크포인트에서 재개: 미저장 매치 {len(pending_match_ids)}개, "
+                       f"완료 플레이어 {len(self.checkpoint.player_match_ids)}명")
+        return self._collect_match_ids(pending_match_ids, processed_match_ids)
+    
+    def collect_matches_for_challengers(self, challenger_data: List[ChallengerRecord], matches_per_player: int = 5,
+                                        max_workers: Optional[int] = None) -> tuple[List[MatchRecord], List[ParticipantRecord]]:
+        """
+        챌린저 유저들 매치 데이터 수집
+        max_workers가 2 이상이면 스레드 풀로 여러 플레이어를 동시에 수집합니다.
+        플레이어에 match_count가 있으면(수집 계획) matches_per_player 대신 사용합니다.
+        """
+
+        all_matches, all_participants = [], []
+        for player_matches, player_participants in self._iter_player_matches(
+            challenger_data, matches_per_player, max_workers
+        ):
+            all_matches.extend(player_matches)
+            all_participants.extend(player_participants)
+
+        self._log_collection_summary(len(all_matches), len(all_participants))
+        return all_matches, all_participants
+
+    def iter_match_batches(self, challenger_data: List[ChallengerRecord], matches_per_player: int = 5,
+                           max_workers: Optional[int] = None, batch_matches: int = 50,
+                           memory_limit_mb: float = 0) -> Iterator[tuple[List[MatchRecord], List[ParticipantRecord]]]:
+        """
+        챌린저 유저들 매치 데이터를 (매치, 참가자) 배치 단위로 수집 (메모리 상한 스트리밍)
+        매치가 batch_matches개 모일 때마다 배치를 넘기고 새 목록으로 시작하므로,
+        호출한 쪽이 배치를 저장하고 놓으면 최대 메모리가 전체 수집 규모와 무관하게 유지됩니다.
+        memory_limit_mb가 있으면 아직 넘기지 않은 레코드의 추정 크기가 상한을 넘을 때 배치가 덜 찼어도 바로 넘깁니다.
+        (프로세스 RSS는 해제 후에도 잘 줄지 않아 한 번 넘으면 이후 배치가 모두 1개씩 저장되므로 버퍼 크기 기준)
+        """
+
+        batch_matches_buffer, batch_participants_buffer = [], []
+        buffered_bytes = 0
+        memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        match_count = participant_count = early_flushes = 0
 
-                # 매치 기본정보 추출
-                match_record = self.extract_match_data(match_details)
-                if match_record:
-                    all_matches.append(match_record)
+        for player_matches, player_participants in self._iter_player_matches(
+            challenger_data, matches_per_player, max_workers
+        ):
+            batch_matches_buffer.extend(player_matches)
+            batch_participants_buffer.extend(player_participants)
+            if memory_limit_bytes:
+                buffered_bytes += estimate_records_bytes(player_matches) + estimate_records_bytes(player_participants)
 
+            # 플레이어 하나가 여러 매치를 넘기므로 batch_matches개씩 잘라서 넘김 (참가자는 매치와 같은 순서)
+            while len(batch_matches_buffer) >= batch_matches:
+                head_match_ids = {match.match_id for match in batch_matches_buffer[:batch_matches]}
+                split = next((index for index, participant in enumerate(batch_participants_buffer)
+                              if participant.match_id not in head_match_ids), len(batch_participants_buffer))
+                head_matches, head_participants = batch_matches_buffer[:batch_matches], batch_participants_buffer[:split]
+                batch_matches_buffer, batch_participants_buffer = batch_matches_buffer[batch_matches:], batch_participants_buffer[split:]
+                if memory_limit_bytes:
+                    buffered_bytes -= estimate_records_bytes(head_matches) + estimate_records_bytes(head_participants)
+                match_count += len(head_matches)
+                participant_count += len(head_participants)
+                yield head_matches, head_participants
+
+            if batch_matches_buffer and memory_limit_bytes and buffered_bytes >= memory_limit_bytes:
+                early_flushes += 1
+                if early_flushes == 1:
+                    logger.warning(f"메모리 상한 도달 (버퍼 약 {buffered_bytes / 1024 / 1024:.1f}MB >= {memory_limit_mb}MB), "
+                                  f"배치를 {len(batch_matches_buffer)}개 매치에서 바로 저장합니다")
+                match_count += len(batch_matches_buffer)
+                participant_count += len(batch_participants_buffer)
+                yield batch_matches_buffer, batch_participants_buffer
+                batch_matches_buffer, batch_participants_buffer = [], []
+                buffered_bytes = 0
+
+        if batch_matches_buffer:
+            match_count += len(batch_matches_buffer)
+            participant_count += len(batch_participants_buffer)
+            yield batch_matches_buffer, batch_participants_buffer
+
+        if early_flushes:
+            logger.info(f"메모리 상한으로 배치를 일찍 저장한 횟수: {early_flushes}회")
+        self._log_collection_summary(match_count, participant_count)
+
+    def _iter_player_matches(self, challenger_data: List[ChallengerRecord], matches_per_player: int,
+                             max_workers: Optional[int]) -> Iterator[tuple[List[MatchRecord], List[ParticipantRecord]]]:
+        """
+        플레이어별 (매치, 참가자) 수집 결과를 순차 수집과 같은 순서로 넘김 (체크포인트 재개분이 먼저)
+        스레드 풀은 스레드 수의 2배까지만 미리 제출해 넘기지 못한 결과가 쌓이지 않게 합니다.
+        """
+
+        processed_match_ids = ThreadSafeIdSet()
+        
+        # 중단된 실행에서 조회만 하고 저장하지 못한 매치 먼저 처리
+        yield self._collect_resumed_matches(processed_match_ids)
+
+        if max_workers and max_workers > 1:
+            print(f"총 {len(challenger_data)}명의 챌린저 유저 매치 수집 시작 (스레드 {max_workers}개)")
+
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="match-collector") as executor:
+                pending = deque()
+                try:
+                    for player in challenger_data:
+                        pending.append(executor.submit(
+                            self._collect_player_matches,
+                            player.puuid, player.matches_to_collect(matches_per_player), processed_match_ids
+                        ))
+                        if len(pending) >= max_workers * 2:
+                            yield pending.popleft().result()
+                    while pending:
+                        yield pending.popleft().result()
+                finally:
+                    # 호출한 쪽이 중간에 멈추면(저장 실패 등) 아직 시작하지 않은 작업은 취소
+                    for future in pending:
+                        future.cancel()
+        else:
+            print(f"총 {len(challenger_data)}명의 챌린저 유저 매치 수집 시작")
+
+            for i, player in enumerate(challenger_data):
+                puuid = player.puuid
+                if self.checkpoint and self.checkpoint.is_player_done(puuid):
+                    continue
+                print(f"{i+1}/{len(challenger_data)} - PUUID : {puuid[:20]}")
+
+                yield self._collect_player_matches(
+                    puuid, player.matches_to_collect(matches_per_player), processed_match_ids
+                )
                 
-                # 매치 상세정보 추출
-                participants = self.extract_participants_data(match_details)
-                all_participants.extend(participants)
+                # 플레이어별 처리 후 딜레이 (설정값 사용)
+                if i < len(challenger_data) - 1:  # 마지막 플레이어가 아닌 경우만
+                    time.sleep(self.config.PLAYER_BATCH_DELAY)
 
-                processed_match_ids.add(match_id)
-            
-            # 플레이어별 처리 후 딜레이 (설정값 사용)
-            if i < len(challenger_data) - 1:  # 마지막 플레이어가 아닌 경우만
-                time.sleep(self.config.PLAYER_BATCH_DELAY)
+    def _log_collection_summary(self, match_count: int, participant_count: int):
+        """매치 수집 완료 후 레이트 리미터/커넥션/캐시 통계 출력"""
 
-        # 레이트 리미터 통계 출력
-        stats = self.rate_limiter.get_stats()
-        logger.info(f"매치 수집 완료: {len(all_matches)}개 매치, {len(all_participants)}명 참가자")
+        stats = self.get_rate_limit_stats()
+        logger.info(f"매치 수집 완료: {match_count}개 매치, {participant_count}명 참가자, "
+                   f"기존 매치 {self.skipped_known_matches}개 스킵")
         logger.info(f"API 호출 통계: {stats['total_requests']}회 요청, "
                    f"{stats['rate_limited_requests']}회 레이트 리밋 "
-                   f"({stats['rate_limit_percentage']:.1f}%)")
+                   f"({stats['rate_limit_percentage']:.1f}%), "
+                   f"중복 상세 요청 {stats['coalesced_requests']}회 생략")
         logger.info(f"총 대기시간: {stats['total_wait_time']:.1f}초, "
                    f"평균 요청당 대기: {stats['avg_wait_time_per_request']:.2f}초")
         
-        return all_matches, all_participants
+        connection_stats = self.get_connection_stats()
+        logger.info(f"커넥션 통계: 신규 {connection_stats['new_connections']}개, "
+                   f"재사용 {connection_stats['reused_connections']}회 "
+                   f"({connection_stats['connection_reuse_percentage']:.1f}%)")
+        
+        if self.match_cache:
+            self.match_cache.flush()
+            cache_stats = self.get_cache_stats()
+            logger.info(f"매치 캐시 통계: 적중 {cache_stats['cache_hits']}회, "
+                       f"미적중 {cache_stats['cache_misses']}회 "
+                       f"(적중률 {cache_stats['cache_hit_ratio'] * 100:.1f}%)")
     
     def get_rate_limit_stats(self) -> Dict:
-        """레이트 리미터 통계 반환"""
-        return self.rate_limiter.get_stats()
+        """레이트 리미터 통계 반환 (전체 엔드포인트 합산, 재시도 통계 포함)"""
+        stats = self.rate_limits.get_stats()
+        retry_stats = self.retry_engine.get_stats()
+        stats['retries'] = retry_stats['retries']
+        stats['retries_exhausted'] = retry_stats['retries_exhausted']
+        stats['circuit_breaker_opens'] = retry_stats['circuit_breaker_opens']
+        stats['coalesced_requests'] = self.coalesced_requests
+        return stats
+    
+    def get_retry_stats(self) -> Dict:
+        """재시도/서킷 브레이커 통계 반환 (엔드포인트 계열별 포함)"""
+        return self.retry_engine.get_stats()
+    
+    def get_queue_filter_stats(self) -> Dict:
+        """
+        큐 필터 통계 반환
+        샘플 플레이어에서 걸러진 매치 비율로, 필터가 없었다면 추가로 필요했을 매치 상세 호출 수를 추정합니다.
+        """
+        with self._stats_lock:
+            skipped_per_kept = (self.queue_filter_sampled_skipped / self.queue_filter_sampled_kept
+                                if self.queue_filter_sampled_kept > 0 else 0)
+            return {
+                'queue_filter': ','.join(map(str, self.queue_ids)) or self.match_type or 'none',
+                'filtered_match_ids': self.filtered_match_ids,
+                'queue_filter_sampled_players': self.queue_filter_sampled_players,
+                'queue_filter_sampled_kept': self.queue_filter_sampled_kept,
+                'queue_filter_sampled_skipped': self.queue_filter_sampled_skipped,
+                'estimated_avoided_detail_calls': round(self.filtered_match_ids * skipped_per_kept)
+            }
+    
+    def get_endpoint_rate_limit_stats(self) -> Dict:
+        """엔드포인트별 레이트 리미터 통계 반환"""
+        return self.rate_limits.get_global_stats()
+    
+    def get_cache_stats(self) -> Dict:
+        """매치 상세 캐시 적중률 통계 반환"""
+        if not self.match_cache:
+            return {'cache_hits': 0, 'cache_misses': 0, 'cache_hit_ratio': 0}
+        return self.match_cache.get_stats()
+    
+    def get_connection_stats(self) -> Dict:
+        """HTTP 커넥션 재사용 통계 반환"""
+        return self.http.get_stats()
 
 
                     
@@ -406,7 +1006,7 @@ if __name__ == "__main__":
         print(f"총 {len(challenger_data)}명의 데이터 수집 완료")
 
         for i,player in enumerate(challenger_data[:5]):
-            print(f"{i+1}. LP: {player['league_points']}, 승률 : {player['wins']}/{player['losses']}")
+            print(f"{i+1}. LP: {player.league_points}, 승률 : {player.wins}/{player.losses}")
     else:
         print("챌린저 데이터가 없습니다.")
 
@@ -420,16 +1020,16 @@ if __name__ == "__main__":
     # 샘플데이터 출력
     if matches:
           print(f"\n첫 번째 매치 예시:")
-          print(f"매치 ID: {matches[0]['match_id']}")
-          print(f"게임 모드: {matches[0]['game_mode']}")
-          print(f"게임 시간: {matches[0]['game_duration']}초")
+          print(f"매치 ID: {matches[0].match_id}")
+          print(f"게임 모드: {matches[0].game_mode}")
+          print(f"게임 시간: {matches[0].game_duration}초")
 
     if participants:
         print(f"\n첫 번째 참가자 예시:")
         p = participants[0]
-        print(f"챔피언: {p['champion_name']}")
-        print(f"KDA: {p['kills']}/{p['deaths']}/{p['assists']}")
-        print(f"승리: {p['win']}")
+        print(f"챔피언: {p.champion_name}")
+        print(f"KDA: {p.kills}/{p.deaths}/{p.assists}")
+        print(f"승리: {p.win}")
 
 
 
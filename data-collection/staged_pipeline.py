@@ -0,0 +1,438 @@
+import time
+import queue
+import threading
+import logging
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from concurrency import ThreadSafeIdSet
+from columnar_transform import ColumnarMatchTransformer
+from records import ChallengerRecord
+
+logger = logging.getLogger(__name__)
+
+# 스테이지 종료 신호
+_DONE = object()
+
+
+class StageStats:
+    """스테이지별 처리량 집계 (처리 건수, 작업 시간, 큐 대기 시간)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.failures = 0
+        self.busy_time = 0.0
+        self.wait_time = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, busy: float, wait: float = 0.0, items: int = 1, failed: bool = False):
+        with self._lock:
+            if failed:
+                self.failures += items
+            else:
+                self.items += items
+            self.busy_time += busy
+            self.wait_time += wait
+
+    def get_stats(self) -> Dict:
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0
+        return {
+            'items': self.items,
+            'failures': self.failures,
+            'elapsed_seconds': round(elapsed, 3),
+            'busy_seconds': round(self.busy_time, 3),
+            'queue_wait_seconds': round(self.wait_time, 3),
+            'items_per_second': round(self.items / elapsed, 2) if elapsed > 0 else 0
+        }
+
+
+class StagedMatchPipeline:
+    """
+    매치 수집/저장 단계 파이프라인
+    ID 조회 → 상세 조회(워커 여러 개) → 변환 → BigQuery 저장 스테이지를 크기 제한 큐로 연결해,
+    앞 단계가 계속 API를 호출하는 동안 완성된 배치를 바로 저장합니다.
+    큐가 가득 차면 앞 단계가 멈추므로 메모리에는 큐 크기만큼만 쌓입니다.
+    columnar이면 변환 단계가 행 dict 대신 컬럼 버퍼(ColumnBatch)를 채우고 저장 단계는 로드 작업으로 저장합니다.
+    transform_pool(MatchTransformPool)이 있으면 상세 조회 단계는 원본 응답 바이트만 넘기고,
+    변환 단계는 batch_size 매치씩 워커 프로세스로 보내 로드 파일로 직렬화된 배치를 받습니다 (항상 컬럼 저장).
+    """
+
+    def __init__(self, riot_client, bq_client, batch_size: int = 50,
+                 queue_size: int = 200, detail_workers: int = 4, columnar: bool = False,
+                 transform_pool=None):
+        self.riot_client = riot_client
+        self.bq_client = bq_client
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.detail_workers = max(1, detail_workers)
+        self.transform_pool = transform_pool
+        self.columnar = columnar or transform_pool is not None
+
+        self.stages = {name: StageStats(name) for name in ("match_ids", "match_details", "transform", "bigquery_write")}
+        self.written_matches = 0
+        self.written_participants = 0
+        self.failed_batches = 0
+        self.failed_transform_batches = 0
+
+    def run(self, players: List[ChallengerRecord], matches_per_player: int,
+            on_batch_written: Optional[Callable[[List[str], List[Tuple[str, datetime]]], None]] = None) -> Dict:
+        """
+        전체 스테이지 실행 후 통계 반환
+        on_batch_written은 배치 저장이 성공할 때마다 (match_id 목록, 매치별 (match_id, game_creation) 목록)으로 호출됩니다.
+        """
+        id_queue = queue.Queue(maxsize=self.queue_size)
+        detail_queue = queue.Queue(maxsize=self.queue_size)
+        batch_queue = queue.Queue(maxsize=max(1, self.queue_size // self.batch_size))
+
+        threads = [threading.Thread(target=self._fetch_match_ids, name="stage-match-ids",
+                                    args=(players, matches_per_player, id_queue))]
+        threads += [threading.Thread(target=self._fetch_match_details, name=f"stage-match-details-{i}",
+                                     args=(id_queue, detail_queue))
+                    for i in range(self.detail_workers)]
+        if self.transform_pool:
+            transform = self._transform_processes
+        else:
+            transform = self._transform_columns if self.columnar else self._transform
+        threads.append(threading.Thread(target=transform, name="stage-transform",
+                                        args=(detail_queue, batch_queue)))
+        threads.append(threading.Thread(target=self._write_batches, name="stage-bigquery-write",
+                                        args=(batch_queue, on_batch_written)))
+
+        logger.info(f"단계 파이프라인 시작: {len(players)}명, 상세 조회 워커 {self.detail_workers}개, "
+                   f"배치 {self.batch_size}개, 큐 {self.queue_size}개{', 컬럼 변환' if self.columnar else ''}"
+                   f"{f', 변환 프로세스 {self.transform_pool.processes}개' if self.transform_pool else ''}")
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stage_stats = self.get_stage_stats()
+        for name, stats in stage_stats.items():
+            logger.info(f"[{name}] {stats['items']}건, {stats['items_per_second']}건/초, "
+                       f"작업 {stats['busy_seconds']}초, 큐 대기 {stats['queue_wait_seconds']}초, "
+                       f"실패 {stats['failures']}건")
+
+        return {
+            'matches': self.written_matches,
+            'participants': self.written_participants,
+            'failed_batches': self.failed_batches + self.failed_transform_batches,
+            'failed_transform_batches': self.failed_transform_batches,
+            'stages': stage_stats
+        }
+
+    def _fetch_match_ids(self, players: List[ChallengerRecord], matches_per_player: int, id_queue: queue.Queue):
+        """스테이지 1: 플레이어별 매치 ID 조회 후 처음 보는 ID만 다음 단계로 전달"""
+        stats = self.stages["match_ids"]
+        stats.started_at = time.time()
+        claimed_ids = ThreadSafeIdSet()
+
+        checkpoint = self.riot_client.checkpoint
+
+        try:
+            # 중단된 실행에서 조회만 하고 저장하지 못한 매치 먼저 전달
+            for match_id in self.riot_client.pending_match_ids():
+                if self.riot_client.claim_match(claimed_ids, match_id) and not self.riot_client.is_known_match(match_id):
+                    id_queue.put(match_id)
+
+            for player in players:
+                if checkpoint and checkpoint.is_player_done(player.puuid):
+                    continue
+
+                start = time.time()
+                try:
+                    match_ids = self.riot_client.get_new_match_ids(
+                        player.puuid, player.matches_to_collect(matches_per_player)
+                    )
+                except Exception as e:
+                    logger.error(f"매치 ID 스테이지 에러: {e}")
+                    stats.record(time.time() - start, failed=True)
+                    continue
+
+                if checkpoint:
+                    checkpoint.record_player(player.puuid, match_ids)
+
+                new_ids = [match_id for match_id in match_ids
+                           if self.riot_client.claim_match(claimed_ids, match_id)
+                           and not self.riot_client.is_known_match(match_id)]
+                busy = time.time() - start
+
+                wait_start = time.time()
+                for match_id in new_ids:
+                    id_queue.put(match_id)
+                stats.record(busy, wait=time.time() - wait_start)
+        finally:
+            for _ in range(self.detail_workers):
+                id_queue.put(_DONE)
+            stats.finished_at = time.time()
+
+    def _fetch_match_details(self, id_queue: queue.Queue, detail_queue: queue.Queue):
+        """스테이지 2: 매치 상세 조회 (워커 여러 개가 같은 큐를 나눠 처리, 프로세스 풀 변환이면 디코딩 없이 원본 바이트)"""
+        stats = self.stages["match_details"]
+        if stats.started_at is None:
+            stats.started_at = time.time()
+        fetch = self.riot_client.get_match_payload if self.transform_pool else self.riot_client.get_match_details
+
+        try:
+            while True:
+                wait_start = time.time()
+                match_id = id_queue.get()
+                wait = time.time() - wait_start
+                if match_id is _DONE:
+                    break
+
+                start = time.time()
+                try:
+                    match_details = fetch(match_id)
+                except Exception as e:
+                    logger.error(f"매치 상세 스테이지 에러: {match_id} - {e}")
+                    match_details = None
+                busy = time.time() - start
+
+                if not match_details:
+                    stats.record(busy, wait, failed=True)
+                    continue
+
+                wait_start = time.time()
+                detail_queue.put(match_details)
+                stats.record(busy, wait + time.time() - wait_start)
+        finally:
+            detail_queue.put(_DONE)
+            stats.finished_at = time.time()
+
+    def _transform(self, detail_queue: queue.Queue, batch_queue: queue.Queue):
+        """스테이지 3: 응답을 테이블 레코드로 변환해 배치 단위로 묶음"""
+        stats = self.stages["transform"]
+        stats.started_at = time.time()
+        remaining_workers = self.detail_workers
+        batch_matches, batch_participants = [], []
+
+        try:
+            while remaining_workers:
+                wait_start = time.time()
+                match_details = detail_queue.get()
+                wait = time.time() - wait_start
+                if match_details is _DONE:
+                    remaining_workers -= 1
+                    continue
+
+                start = time.time()
+                try:
+                    match_record = self.riot_client.extract_match_data(match_details)
+                    participants = self.riot_client.extract_participants_data(match_details)
+                except Exception as e:
+                    logger.error(f"변환 스테이지 에러: {e}")
+                    stats.record(time.time() - start, wait, failed=True)
+                    continue
+
+                if match_record:
+                    batch_matches.append(match_record)
+                batch_participants.extend(participants)
+                busy = time.time() - start
+
+                if len(batch_matches) >= self.batch_size:
+                    wait_start = time.time()
+                    batch_queue.put((batch_matches, batch_participants))
+                    wait += time.time() - wait_start
+                    batch_matches, batch_participants = [], []
+                stats.record(busy, wait)
+
+            if batch_matches or batch_participants:
+                batch_queue.put((batch_matches, batch_participants))
+        finally:
+            batch_queue.put(_DONE)
+            stats.finished_at = time.time()
+
+    def _transform_columns(self, detail_queue: queue.Queue, batch_queue: queue.Queue):
+        """스테이지 3 (columnar): 응답을 컬럼 버퍼에 채워 batch_size 매치마다 (매치, 참가자) ColumnBatch로 넘김"""
+        stats = self.stages["transform"]
+        stats.started_at = time.time()
+        remaining_workers = self.detail_workers
+        transformer = ColumnarMatchTransformer()
+
+        try:
+            while remaining_workers:
+                wait_start = time.time()
+                match_details = detail_queue.get()
+                wait = time.time() - wait_start
+                if match_details is _DONE:
+                    remaining_workers -= 1
+                    continue
+
+                start = time.time()
+                try:
+                    transformer.append(match_details)
+                except Exception as e:
+                    logger.error(f"변환 스테이지 에러: {e}")
+                    stats.record(time.time() - start, wait, failed=True)
+                    continue
+                busy = time.time() - start
+
+                if len(transformer) >= self.batch_size:
+                    wait_start = time.time()
+                    batch_queue.put(transformer.flush())
+                    wait += time.time() - wait_start
+                stats.record(busy, wait)
+
+            if len(transformer):
+                batch_queue.put(transformer.flush())
+        finally:
+            batch_queue.put(_DONE)
+            stats.finished_at = time.time()
+
+    def _transform_processes(self, detail_queue: queue.Queue, batch_queue: queue.Queue):
+        """
+        스테이지 3 (프로세스 풀): 원본 응답을 batch_size 매치씩 묶어 워커 프로세스로 보내고,
+        로드 파일로 직렬화된 (매치, 참가자) 배치를 보낸 순서대로 넘김
+        변환 중인 묶음은 워커 수의 2배까지만 두어 원본 응답이 메모리에 쌓이지 않게 합니다.
+        """
+        stats = self.stages["transform"]
+        stats.started_at = time.time()
+        remaining_workers = self.detail_workers
+        max_pending = self.transform_pool.processes * 2
+        pending = deque()
+        chunk = []
+        broken = False
+
+        def fail_chunk(size: int):
+            # 변환하지 못한 묶음은 저장 실패 배치와 같이 집계해 파이프라인이 실패로 끝나게 함
+            self.failed_transform_batches += 1
+            stats.record(0.0, items=size, failed=True)
+
+        def stop_pool(error: Exception):
+            """워커 프로세스가 죽은 풀은 다시 쓸 수 없으므로 남은 묶음을 한 번에 실패 처리하고 이후 제출 중단"""
+            nonlocal broken
+            broken = True
+            logger.error(f"변환 프로세스 풀 중단, 남은 묶음 {len(pending)}개와 이후 응답은 변환하지 않습니다: {error}")
+            while pending:
+                future, size = pending.popleft()
+                future.cancel()
+                fail_chunk(size)
+
+        def submit(payloads: List[bytes]):
+            if broken:
+                fail_chunk(len(payloads))
+                return
+            try:
+                pending.append((self.transform_pool.submit(payloads), len(payloads)))
+            except BrokenProcessPool as e:
+                fail_chunk(len(payloads))
+                stop_pool(e)
+
+        def forward(block: bool) -> float:
+            """완료된 묶음 결과를 다음 단계로 넘기고 대기 시간 반환 (block이면 가장 오래된 묶음을 기다림)"""
+            waited = 0.0
+            while pending and (block or pending[0][0].done()):
+                future, size = pending.popleft()
+                wait_start = time.time()
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    waited += time.time() - wait_start
+                    fail_chunk(size)
+                    stop_pool(e)
+                    break
+                except Exception as e:
+                    logger.error(f"변환 스테이지 에러 (프로세스 풀): {e}")
+                    waited += time.time() - wait_start
+                    fail_chunk(size)
+                    block = False
+                    continue
+                if len(result.matches):
+                    batch_queue.put((result.matches, result.participants))
+                waited += time.time() - wait_start
+                if result.failures:
+                    self.failed_transform_batches += 1
+                    stats.record(0.0, items=result.failures, failed=True)
+                stats.record(result.busy_seconds, items=len(result.matches))
+                block = False
+            return waited
+
+        try:
+            while remaining_workers:
+                wait_start = time.time()
+                payload = detail_queue.get()
+                wait = time.time() - wait_start
+                if payload is _DONE:
+                    remaining_workers -= 1
+                    continue
+
+                chunk.append(payload)
+                if len(chunk) >= self.batch_size:
+                    submit(chunk)
+                    chunk = []
+                wait += forward(block=len(pending) > max_pending)
+                stats.record(0.0, wait, items=0)
+
+            if chunk:
+                submit(chunk)
+            while pending:
+                forward(block=True)
+        finally:
+            for future, _ in pending:
+                future.cancel()
+            batch_queue.put(_DONE)
+            stats.finished_at = time.time()
+
+    def _store_batch(self, batch_matches, batch_participants) -> Optional[Tuple[List[str], List[Tuple[str, datetime]]]]:
+        """배치 저장 후 저장한 match_id와 매치별 (match_id, game_creation) 목록 반환 (실패 시 None)"""
+        if self.columnar:
+            if not (self.bq_client.load_match_columns(batch_matches)
+                    and self.bq_client.load_participant_columns(batch_participants)):
+                return None
+            match_ids = batch_matches.column('match_id')
+            return match_ids, list(zip(match_ids, batch_matches.column('game_creation')))
+
+        if not (self.bq_client.insert_match_data(batch_matches)
+                and self.bq_client.insert_participants_data(batch_participants)):
+            return None
+        return ([match.match_id for match in batch_matches],
+                [(match.match_id, match.game_creation) for match in batch_matches])
+
+    def _write_batches(self, batch_queue: queue.Queue,
+                       on_batch_written: Optional[Callable[[List[str], List[Tuple[str, datetime]]], None]]):
+        """스테이지 4: 배치 단위 BigQuery MERGE"""
+        stats = self.stages["bigquery_write"]
+        stats.started_at = time.time()
+
+        try:
+            while True:
+                wait_start = time.time()
+                batch = batch_queue.get()
+                wait = time.time() - wait_start
+                if batch is _DONE:
+                    break
+
+                batch_matches, batch_participants = batch
+                start = time.time()
+                try:
+                    stored = self._store_batch(batch_matches, batch_participants)
+                except Exception as e:
+                    logger.error(f"BigQuery 저장 스테이지 에러: {e}")
+                    stored = None
+
+                if stored is None:
+                    self.failed_batches += 1
+                    stats.record(time.time() - start, wait, failed=True)
+                    continue
+
+                self.written_matches += len(batch_matches)
+                self.written_participants += len(batch_participants)
+                if on_batch_written:
+                    # 후처리 에러로 저장 스테이지가 멈추면 앞 단계가 큐에서 막히므로 로그만 남김
+                    try:
+                        on_batch_written(*stored)
+                    except Exception as e:
+                        logger.error(f"배치 저장 후처리 에러: {e}")
+                stats.record(time.time() - start, wait, items=len(batch_matches))
+        finally:
+            stats.finished_at = time.time()
+
+    def get_stage_stats(self) -> Dict:
+        """스테이지별 처리량 통계"""
+        return {name: stage.get_stats() for name, stage in self.stages.items()}
@@ -7,6 +7,7 @@ from zoneinfo import ZoneInfo
 sys.path.append("/app")
 
 from bigquery_client import BigQueryClient
+from records import ChallengerRecord, MatchRecord, ParticipantRecord
 
 def test_challenger_upsert():
     """챌린저 데이터 UPSERT 테스트"""
@@ -16,25 +17,25 @@ def test_challenger_upsert():
     bq = BigQueryClient()
 
     # 테스트 데이터 (같은 puuid로 2번 삽입)
-    test_data_1 = [{
-        "puuid": "test_player_1",
-        "league_points": 1000,
-        "wins": 100,
-        "losses": 50,
-        "is_veteran": True,
-        "is_hot_streak": False,
-        "collected_at": datetime.now(ZoneInfo("Asia/Seoul"))
-    }]
-
-    test_data_2 = [{
-        "puuid": "test_player_1",  # 같은 puuid
-        "league_points": 1100,     # 업데이트된 LP
-        "wins": 105,               # 업데이트된 승수
-        "losses": 51,              # 업데이트된 패수
-        "is_veteran": True,
-        "is_hot_streak": True,     # 상태 변화
-        "collected_at": datetime.now(ZoneInfo("Asia/Seoul"))
-    }]
+    test_data_1 = [ChallengerRecord(
+        puuid="test_player_1",
+        league_points=1000,
+        wins=100,
+        losses=50,
+        is_veteran=True,
+        is_hot_streak=False,
+        collected_at=datetime.now(ZoneInfo("Asia/Seoul"))
+    )]
+
+    test_data_2 = [ChallengerRecord(
+        puuid="test_player_1",  # 같은 puuid
+        league_points=1100,     # 업데이트된 LP
+        wins=105,               # 업데이트된 승수
+        losses=51,              # 업데이트된 패수
+        is_veteran=True,
+        is_hot_streak=True,     # 상태 변화
+        collected_at=datetime.now(ZoneInfo("Asia/Seoul"))
+    )]
 
     print("1차 챌린저 삽입")
     result1 = bq.insert_challenger_data(test_data_1)
@@ -72,37 +73,37 @@ def test_match_upsert():
       bq = BigQueryClient()
 
       # 테스트 매치 데이터 (같은 match_id로 2번 삽입)
-      test_match_1 = [{
-          "match_id": "TEST_MATCH_001",
-          "data_version": "1.0",
-          "game_creation": datetime.now(ZoneInfo("Asia/Seoul")),
-          "game_duration": 1800,  # 30분
-          "game_mode": "CLASSIC",
-          "game_type": "MATCHED_GAME",
-          "game_version": "14.18.1",
-          "queue_id": 420,
-          "map_id": 11,
-          "platform_id": "KR",
-          "game_end_timestamp": datetime.now(ZoneInfo("Asia/Seoul")),
-          "participants_count": 10,
-          "teams_data": [{"teamId": 100, "win": True}, {"teamId": 200, "win": False}]
-      }]
-
-      test_match_2 = [{
-          "match_id": "TEST_MATCH_001",  # 같은 match_id
-          "data_version": "1.1",         # 업데이트된 버전
-          "game_creation": datetime.now(ZoneInfo("Asia/Seoul")),
-          "game_duration": 1850,         # 업데이트된 시간
-          "game_mode": "CLASSIC",
-          "game_type": "MATCHED_GAME",
-          "game_version": "14.18.2",     # 업데이트된 버전
-          "queue_id": 420,
-          "map_id": 11,
-          "platform_id": "KR",
-          "game_end_timestamp": datetime.now(ZoneInfo("Asia/Seoul")),
-          "participants_count": 10,
-          "teams_data": [{"teamId": 100, "win": True}, {"teamId": 200, "win": False}]
-      }]
+      test_match_1 = [MatchRecord(
+          match_id="TEST_MATCH_001",
+          data_version="1.0",
+          game_creation=datetime.now(ZoneInfo("Asia/Seoul")),
+          game_duration=1800,  # 30분
+          game_mode="CLASSIC",
+          game_type="MATCHED_GAME",
+          game_version="14.18.1",
+          queue_id=420,
+          map_id=11,
+          platform_id="KR",
+          game_end_timestamp=datetime.now(ZoneInfo("Asia/Seoul")),
+          participants_count=10,
+          teams_data=[{"teamId": 100, "win": True}, {"teamId": 200, "win": False}]
+      )]
+
+      test_match_2 = [MatchRecord(
+          match_id="TEST_MATCH_001",  # 같은 match_id
+          data_version="1.1",         # 업데이트된 버전
+          game_creation=datetime.now(ZoneInfo("Asia/Seoul")),
+          game_duration=1850,         # 업데이트된 시간
+          game_mode="CLASSIC",
+          game_type="MATCHED_GAME",
+          game_version="14.18.2",     # 업데이트된 버전
+          queue_id=420,
+          map_id=11,
+          platform_id="KR",
+          game_end_timestamp=datetime.now(ZoneInfo("Asia/Seoul")),
+          participants_count=10,
+          teams_data=[{"teamId": 100, "win": True}, {"teamId": 200, "win": False}]
+      )]
 
       # 첫 번째 삽입
       print("1차 매치 삽입")
@@ -148,71 +149,71 @@ def test_participants_upsert():
     bq = BigQueryClient()
 
     # 테스트 매치 상세 데이터 (같은 match_id + puuid로 2번 삽입)
-    test_participants_1 = [{
-        "match_id": "TEST_MATCH_002",
-        "participant_id": 1,
-        "puuid": "test_player_participant_1",
-        "summoner_name": "TestPlayer1",
-        "riot_id_game_name": "TestPlayer",
-        "riot_id_tagline": "KR1",
-        "summoner_level": 100,
-        "champion_id": 1,
-        "champion_name": "Annie",
-        "champion_level": 18,
-        "win": True,
-        "team_id": 100,
-        "team_position": "MIDDLE",
-        "individual_position": "MIDDLE",
-        "kills": 10,
-        "deaths": 5,
-        "assists": 8,
-        "total_minions_killed": 150,
-        "neutral_minions_killed": 20,
-        "gold_earned": 15000,
-        "total_damage_dealt_to_champions": 25000,
-        "vision_score": 30,
-        "item0": 3089, "item1": 3020, "item2": 3135,
-        "item3": 3165, "item4": 3157, "item5": 3116, "item6": 3364,
-        "summoner1_id": 4, "summoner2_id": 14,
-        "placement": None,
-        "subteam_placement": None,
-        "detailed_stats": {"totalDamageDealt": 30000, "magicDamageDealt": 25000},
-        "game_creation": datetime.now(ZoneInfo("Asia/Seoul")),
-        "collected_at": datetime.now(ZoneInfo("Asia/Seoul"))
-    }]
-
-    test_participants_2 = [{
-        "match_id": "TEST_MATCH_002",      # 같은 match_id
-        "participant_id": 1,
-        "puuid": "test_player_participant_1",  # 같은 puuid
-        "summoner_name": "TestPlayer1Updated",  # 업데이트된 이름
-        "riot_id_game_name": "TestPlayer",
-        "riot_id_tagline": "KR1",
-        "summoner_level": 101,                  # 업데이트된 레벨
-        "champion_id": 1,
-        "champion_name": "Annie",
-        "champion_level": 18,
-        "win": True,
-        "team_id": 100,
-        "team_position": "MIDDLE",
-        "individual_position": "MIDDLE",
-        "kills": 12,                           # 업데이트된 킬수
-        "deaths": 4,                           # 업데이트된 데스
-        "assists": 10,                         # 업데이트된 어시스트
-        "total_minions_killed": 155,
-        "neutral_minions_killed": 22,
-        "gold_earned": 15500,
-        "total_damage_dealt_to_champions": 27000,
-        "vision_score": 35,
-        "item0": 3089, "item1": 3020, "item2": 3135,
-        "item3": 3165, "item4": 3157, "item5": 3116, "item6": 3364,
-        "summoner1_id": 4, "summoner2_id": 14,
-        "placement": None,
-        "subteam_placement": None,
-        "detailed_stats": {"totalDamageDealt": 32000, "magicDamageDealt": 27000},
-        "game_creation": datetime.now(ZoneInfo("Asia/Seoul")),
-        "collected_at": datetime.now(ZoneInfo("Asia/Seoul"))
-    }]
+    test_participants_1 = [ParticipantRecord(
+        match_id="TEST_MATCH_002",
+        participant_id=1,
+        puuid="test_player_participant_1",
+        summoner_name="TestPlayer1",
+        riot_id_game_name="TestPlayer",
+        riot_id_tagline="KR1",
+        summoner_level=100,
+        champion_id=1,
+        champion_name="Annie",
+        champion_level=18,
+        win=True,
+        team_id=100,
+        team_position="MIDDLE",
+        individual_position="MIDDLE",
+        kills=10,
+        deaths=5,
+        assists=8,
+        total_minions_killed=150,
+        neutral_minions_killed=20,
+        gold_earned=15000,
+        total_damage_dealt_to_champions=25000,
+        vision_score=30,
+        item0=3089, item1=3020, item2=3135,
+        item3=3165, item4=3157, item5=3116, item6=3364,
+        summoner1_id=4, summoner2_id=14,
+        placement=None,
+        subteam_placement=None,
+        detailed_stats={"totalDamageDealt": 30000, "magicDamageDealt": 25000},
+        game_creation=datetime.now(ZoneInfo("Asia/Seoul")),
+        collected_at=datetime.now(ZoneInfo("Asia/Seoul"))
+    )]
+
+    test_participants_2 = [ParticipantRecord(
+        match_id="TEST_MATCH_002",      # 같은 match_id
+        participant_id=1,
+        puuid="test_player_participant_1",  # 같은 puuid
+        summoner_name="TestPlayer1Updated",  # 업데이트된 이름
+        riot_id_game_name="TestPlayer",
+        riot_id_tagline="KR1",
+        summoner_level=101,                  # 업데이트된 레벨
+        champion_id=1,
+        champion_name="Annie",
+        champion_level=18,
+        win=True,
+        team_id=100,
+        team_position="MIDDLE",
+        individual_position="MIDDLE",
+        kills=12,                           # 업데이트된 킬수
+        deaths=4,                           # 업데이트된 데스
+        assists=10,                         # 업데이트된 어시스트
+        total_minions_killed=155,
+        neutral_minions_killed=22,
+        gold_earned=15500,
+        total_damage_dealt_to_champions=27000,
+        vision_score=35,
+        item0=3089, item1=3020, item2=3135,
+        item3=3165, item4=3157, item5=3116, item6=3364,
+        summoner1_id=4, summoner2_id=14,
+        placement=None,
+        subteam_placement=None,
+        detailed_stats={"totalDamageDealt": 32000, "magicDamageDealt": 27000},
+        game_creation=datetime.now(ZoneInfo("Asia/Seoul")),
+        collected_at=datetime.now(ZoneInfo("Asia/Seoul"))
+    )]
 
     # 첫 번째 삽입
     print("1차 매치 상세 삽입")
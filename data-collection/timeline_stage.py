@@ -0,0 +1,97 @@
+import logging
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TimelineStage:
+    """
+    매치 타임라인 수집 스테이지 (선택)
+    매치 batch_matches개씩 타임라인을 조회해 참가자별 분 단위 프레임(골드, 경험치, CS, 위치)으로 변환한 뒤 바로 저장합니다.
+    타임라인 응답은 변환 직후 버리므로 처리하는 매치 수와 관계없이 메모리에는 배치 하나 분량의 프레임만 남습니다.
+    요청은 클라이언트의 타임라인 전용 예산(TIMELINE_RATE_LIMITS)과 앱 레이트 리밋을 함께 따릅니다.
+    """
+
+    def __init__(self, riot_client, bq_client, batch_matches: int = 5, workers: int = 4):
+        self.riot_client = riot_client
+        self.bq_client = bq_client
+        self.batch_matches = batch_matches
+        self.workers = workers
+
+        self.matches = 0
+        self.frames = 0
+        self.failed_matches = 0
+        self.failed_batches = 0
+
+    def run(self, match_ids: Iterable[str]) -> Dict:
+        """타임라인 조회/변환/저장 후 통계 반환"""
+        match_ids = iter(match_ids)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="timeline") as executor:
+            while True:
+                chunk = list(islice(match_ids, self.batch_matches))
+                if not chunk:
+                    break
+
+                batch_frames = []
+                for match_frames in executor.map(self._fetch_frames, chunk):
+                    if match_frames is None:
+                        self.failed_matches += 1
+                        continue
+                    batch_frames.extend(match_frames)
+                    self.matches += 1
+
+                if not batch_frames:
+                    continue
+                if self.bq_client.insert_timeline_frames(batch_frames):
+                    self.frames += len(batch_frames)
+                else:
+                    self.failed_batches += 1
+
+        logger.info(f"{self.riot_client.platform} 타임라인 수집 완료: 매치 {self.matches}개, 프레임 {self.frames}행 "
+                   f"(조회 실패 {self.failed_matches}개, 저장 실패 배치 {self.failed_batches}개)")
+        return self.get_stats()
+
+    def _fetch_frames(self, match_id: str) -> Optional[List[Dict]]:
+        timeline = self.riot_client.get_match_timeline(match_id)
+        if timeline is None:
+            return None
+        return self.extract_frames(match_id, timeline)
+
+    def extract_frames(self, match_id: str, timeline: Dict) -> List[Dict]:
+        """
+        타임라인을 (매치, 분, 참가자) 단위 행으로 변환
+        프레임은 frameInterval(1분) 간격이고 마지막 프레임만 게임 종료 시점이므로 프레임 순서를 분으로 사용합니다.
+        """
+        collected_at = self.riot_client.kst_now
+        frames = (timeline.get('info') or {}).get('frames') or []
+
+        rows = []
+        for minute, frame in enumerate(frames):
+            for participant_frame in (frame.get('participantFrames') or {}).values():
+                position = participant_frame.get('position') or {}
+                rows.append({
+                    'match_id': match_id,
+                    'minute': minute,
+                    'participant_id': participant_frame['participantId'],
+                    'total_gold': participant_frame.get('totalGold'),
+                    'current_gold': participant_frame.get('currentGold'),
+                    'xp': participant_frame.get('xp'),
+                    'level': participant_frame.get('level'),
+                    'minions_killed': participant_frame.get('minionsKilled'),
+                    'jungle_minions_killed': participant_frame.get('jungleMinionsKilled'),
+                    'position_x': position.get('x'),
+                    'position_y': position.get('y'),
+                    'collected_at': collected_at
+                })
+        return rows
+
+    def get_stats(self) -> Dict:
+        return {
+            'timeline_matches': self.matches,
+            'timeline_frames': self.frames,
+            'timeline_failed_matches': self.failed_matches,
+            'timeline_failed_batches': self.failed_batches
+        }
@@ -0,0 +1,93 @@
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, NamedTuple, Optional
+
+from columnar_transform import ColumnarMatchTransformer, EncodedColumnBatch
+from match_decoder import MatchDecoder
+
+logger = logging.getLogger(__name__)
+
+# 저장 후처리(on_batch_written)에 필요한 컬럼만 값으로 돌려받음
+MATCH_RESULT_COLUMNS = ("match_id", "game_creation")
+PARTICIPANT_RESULT_COLUMNS = ()
+
+# 워커 프로세스별 디코더 (initializer에서 생성)
+_decoder: Optional[MatchDecoder] = None
+
+
+class EncodedMatchChunk(NamedTuple):
+    """워커 프로세스 변환 결과 (로드 파일로 직렬화된 매치/참가자 배치, 변환 실패 수, 워커 작업 시간)"""
+    matches: EncodedColumnBatch
+    participants: EncodedColumnBatch
+    failures: int
+    busy_seconds: float
+
+
+def available_cpus() -> int:
+    """이 프로세스가 쓸 수 있는 CPU 수 (컨테이너 CPU 제한이 걸린 affinity 우선)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _init_worker(fast_decode: bool):
+    global _decoder
+    _decoder = MatchDecoder(fast=fast_decode)
+
+
+def encode_match_payloads(payloads: List[bytes]) -> EncodedMatchChunk:
+    """(워커 프로세스) 원본 매치 응답 묶음을 디코딩 → 컬럼 변환 → 로드 파일 직렬화"""
+    start = time.process_time()
+    transformer = ColumnarMatchTransformer()
+    failures = 0
+
+    for payload in payloads:
+        try:
+            transformer.append(_decoder.decode(payload))
+        except Exception as e:
+            logger.error(f"매치 변환 워커 에러: {e}")
+            failures += 1
+
+    matches, participants = transformer.flush()
+    return EncodedMatchChunk(
+        matches.encode(MATCH_RESULT_COLUMNS),
+        participants.encode(PARTICIPANT_RESULT_COLUMNS),
+        failures,
+        time.process_time() - start
+    )
+
+
+class MatchTransformPool:
+    """
+    매치 변환/직렬화 프로세스 풀
+    원본 응답 바이트 묶음을 워커 프로세스에서 디코딩, 시각 변환, JSON 직렬화, 로드 파일 생성까지 처리해
+    CPU 작업이 수집 스레드(네트워크 I/O)와 GIL을 다투지 않게 합니다.
+    여러 플랫폼의 단계 파이프라인이 같은 풀을 함께 씁니다 (submit은 스레드 안전).
+    """
+
+    def __init__(self, processes: int = 0, fast_decode: bool = True):
+        self.processes = processes if processes > 0 else available_cpus()
+        # 수집 스레드가 도는 중에 fork하면 잠금 상태까지 복사되므로 spawn으로 워커 시작
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(fast_decode,)
+        )
+        logger.info(f"매치 변환 프로세스 풀 시작: 워커 {self.processes}개")
+
+    def submit(self, payloads: List[bytes]) -> Future:
+        """원본 응답 묶음 변환 요청 (결과는 EncodedMatchChunk)"""
+        return self._executor.submit(encode_match_payloads, payloads)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,121 @@
+import os
+import json
+import threading
+import logging
+from datetime import datetime
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerWatermarkStore:
+    """
+    플레이어별 수집 기준점(high-water mark) 저장소
+    puuid마다 마지막으로 저장한 매치의 game_creation(epoch 초)을 보관하고,
+    다음 실행에서 그 이후 매치만 조회하도록 startTime으로 사용합니다.
+    실행 중에 저장한 매치는 모아 두었다가 수집이 끝난 뒤 apply_stored_games로 한 번에 반영하므로,
+    같은 실행의 매치 ID 조회는 모두 실행 시작 시점의 기준점을 씁니다.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.watermarks: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # 이번 실행에서 플레이어별로 조회한 match_id와, 저장한 매치별 game_creation (반영 전)
+        self._listed: Dict[str, List[str]] = {}
+        self._stored_games: Dict[str, int] = {}
+
+    def load(self) -> int:
+        """로컬 파일에서 기준점 로드"""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.watermarks = {puuid: int(ts) for puuid, ts in json.load(f).items()}
+        except (OSError, ValueError) as e:
+            logger.warning(f"기준점 파일 로드 실패, 새로 시작합니다: {e}")
+            self.watermarks = {}
+
+        return len(self.watermarks)
+
+    def save(self) -> bool:
+        """임시 파일에 쓴 뒤 교체"""
+        if not self.path:
+            return False
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with self._lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.watermarks, f)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            logger.warning(f"기준점 파일 저장 실패: {e}")
+            return False
+
+    def get(self, puuid: str) -> Optional[int]:
+        with self._lock:
+            return self.watermarks.get(puuid)
+
+    def update(self, puuid: str, game_creation_epoch: int):
+        """기준점은 앞으로만 이동"""
+        with self._lock:
+            if game_creation_epoch > self.watermarks.get(puuid, 0):
+                self.watermarks[puuid] = game_creation_epoch
+
+    def seed_from_bigquery(self, bq_client, puuids: Iterable[str]) -> int:
+        """로컬 기준점이 없는 플레이어를 BigQuery 저장 데이터로 채움"""
+        with self._lock:
+            missing = [puuid for puuid in puuids if puuid not in self.watermarks]
+        if not missing:
+            return 0
+
+        seeded = bq_client.fetch_player_watermarks(missing)
+        for puuid, game_creation_epoch in seeded.items():
+            self.update(puuid, game_creation_epoch)
+        return len(seeded)
+
+    def record_listing(self, puuid: str, match_ids: Iterable[str]):
+        """이번 실행에서 조회한 플레이어의 매치 ID 목록 기록 (기준점 갱신 상한 계산용)"""
+        with self._lock:
+            self._listed.setdefault(puuid, []).extend(match_ids)
+
+    def record_stored(self, match_games: Iterable[Tuple[str, datetime]]):
+        """저장 완료된 매치의 (match_id, game_creation)을 모아 둠 (기준점은 apply_stored_games에서 갱신)"""
+        with self._lock:
+            for match_id, game_creation in match_games:
+                self._stored_games[match_id] = int(game_creation.timestamp())
+
+    def apply_stored_games(self, known_match_ids: Optional[Container[str]] = None) -> int:
+        """
+        모아 둔 저장 기록으로 기준점 갱신 (수집이 모두 끝난 뒤 한 번 호출, 갱신한 플레이어 수 반환)
+        수집 중에 옮기면 A의 매치에 함께 나온 B의 기준점이 B의 조회 전에 앞당겨져 그 사이 매치를 놓칩니다.
+        플레이어마다 자기가 조회한 매치 중 저장한 매치로만 옮기고, 조회했지만 저장하지 못한(상세 조회 실패 등)
+        가장 오래된 매치보다 뒤로는 옮기지 않아 그 매치가 다음 실행에서 다시 조회됩니다.
+        known_match_ids에 있는 매치는 이미 저장된 것으로 봅니다.
+        """
+        with self._lock:
+            listed, self._listed = self._listed, {}
+            stored_games, self._stored_games = self._stored_games, {}
+
+        advanced = 0
+        for puuid, match_ids in listed.items():
+            unresolved = [_game_id(match_id) for match_id in match_ids
+                          if match_id not in stored_games
+                          and not (known_match_ids is not None and match_id in known_match_ids)]
+            limit = min(unresolved) if unresolved else None
+            game_creation_epoch = max((stored_games[match_id] for match_id in match_ids
+                                       if match_id in stored_games and (limit is None or _game_id(match_id) < limit)),
+                                      default=0)
+            if game_creation_epoch > (self.get(puuid) or 0):
+                self.update(puuid, game_creation_epoch)
+                advanced += 1
+        return advanced
+
+
+def _game_id(match_id: str) -> int:
+    """match_id({플랫폼}_{게임ID})의 게임 ID (같은 플랫폼에서는 나중 게임일수록 큼)"""
+    return int(match_id.rsplit('_', 1)[-1])
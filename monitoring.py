@@ -130,3 +130,23 @@ class PipelineMonitoring:
                 "WARNING",
                 rate_limit_stats
             )
+            
+    def log_endpoint_performance(self, endpoint_stats: Dict[str, Dict[str, Any]]):
+        """엔드포인트별 API 성능 메트릭 로그"""
+        for endpoint, stats in endpoint_stats.items():
+            # 대기 시간은 처리 시간이 아니므로 duration/처리량 대신 필드(total_wait_time)로 기록
+            logger.info(
+                f"API endpoint metric: {endpoint}",
+                event_type="performance",
+                operation="api_endpoint",
+                endpoint=endpoint,
+                **stats
+            )
+            
+            rate_limit_percentage = stats.get('rate_limit_percentage', 0)
+            if rate_limit_percentage > 20:
+                self.send_alert(
+                    f"엔드포인트 레이트 리밋 발생률 높음 ({endpoint}): {rate_limit_percentage:.1f}%",
+                    "WARNING",
+                    {'endpoint': endpoint, **stats}
+                )
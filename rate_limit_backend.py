@@ -0,0 +1,200 @@
+import os
+import bisect
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# redis 사용 가능한지 확인
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+class InMemoryRateLimitStore:
+    """
+    프로세스 내부 레이트 리밋 상태 저장소
+    redis-py 클라이언트 중 레이트 리미터가 쓰는 명령(lock, zadd, zrange 등)만 같은 시그니처로 구현합니다.
+    """
+
+    def __init__(self):
+        self._zsets: Dict[str, List[Tuple[float, str]]] = {}
+        self._values: Dict[str, str] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._guard = threading.Lock()
+
+    def lock(self, name: str, timeout: Optional[float] = None):
+        """이름별 재진입 락 (redis Lock처럼 with 문으로 사용)"""
+        with self._guard:
+            return self._locks.setdefault(name, threading.RLock())
+
+    def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        with self._guard:
+            entries = self._zsets.setdefault(key, [])
+            for member, score in mapping.items():
+                bisect.insort(entries, (score, member))
+            return len(mapping)
+
+    def zremrangebyscore(self, key: str, min_score: float, max_score: float) -> int:
+        with self._guard:
+            entries = self._zsets.get(key, [])
+            kept = [entry for entry in entries if not (min_score <= entry[0] <= max_score)]
+            self._zsets[key] = kept
+            return len(entries) - len(kept)
+
+    def zcount(self, key: str, min_score: float, max_score: float) -> int:
+        with self._guard:
+            return sum(1 for score, _ in self._zsets.get(key, []) if min_score <= score <= max_score)
+
+    def zcard(self, key: str) -> int:
+        with self._guard:
+            return len(self._zsets.get(key, []))
+
+    def zrange(self, key: str, start: int, end: int, withscores: bool = False) -> List:
+        with self._guard:
+            entries = self._zsets.get(key, [])
+            # redis처럼 end 인덱스를 포함
+            stop = None if end == -1 else end + 1
+            selected = entries[start:stop]
+            if withscores:
+                return [(member, score) for score, member in selected]
+            return [member for _, member in selected]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._guard:
+            return self._values.get(key)
+
+    def set(self, key: str, value) -> bool:
+        with self._guard:
+            self._values[key] = str(value)
+            return True
+
+class SQLiteRateLimitStore:
+    """
+    파일 기반 SQLite 레이트 리밋 상태 저장소
+    같은 파일을 여는 여러 프로세스가 하나의 예산을 나눠 씁니다.
+    lock()은 BEGIN IMMEDIATE 트랜잭션으로 파일 쓰기 락을 잡습니다.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 30.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS zsets (key TEXT NOT NULL, member TEXT NOT NULL, score REAL NOT NULL, PRIMARY KEY (key, member))")
+        conn.execute("CREATE INDEX IF NOT EXISTS zsets_score ON zsets (key, score)")
+        conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 커넥션 (트랜잭션은 직접 관리)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def lock(self, name: str, timeout: Optional[float] = None):
+        """프로세스 간 배타 락 (중첩 호출 시 바깥 트랜잭션 재사용)"""
+        conn = self._connection()
+        if self._local.depth > 0:
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            self._local.depth = 0
+
+    def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        self._connection().executemany(
+            "INSERT OR REPLACE INTO zsets (key, member, score) VALUES (?, ?, ?)",
+            [(key, member, score) for member, score in mapping.items()]
+        )
+        return len(mapping)
+
+    def zremrangebyscore(self, key: str, min_score: float, max_score: float) -> int:
+        cursor = self._connection().execute(
+            "DELETE FROM zsets WHERE key = ? AND score >= ? AND score <= ?", (key, min_score, max_score)
+        )
+        return cursor.rowcount
+
+    def zcount(self, key: str, min_score: float, max_score: float) -> int:
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM zsets WHERE key = ? AND score >= ? AND score <= ?", (key, min_score, max_score)
+        ).fetchone()
+        return row[0]
+
+    def zcard(self, key: str) -> int:
+        row = self._connection().execute("SELECT COUNT(*) FROM zsets WHERE key = ?", (key,)).fetchone()
+        return row[0]
+
+    def zrange(self, key: str, start: int, end: int, withscores: bool = False) -> List:
+        # 한쪽만 음수면 전체 개수로 양수 인덱스로 바꿈
+        if (start < 0) != (end < 0):
+            total = self.zcard(key)
+            start = max(start + total, 0) if start < 0 else start
+            end = end + total if end < 0 else end
+        if end < start:
+            return []
+        # (key, score) 인덱스를 따라 필요한 행만 읽음 (윈도우 전체를 가져오지 않음)
+        if start < 0:
+            selected = self._connection().execute(
+                "SELECT member, score FROM zsets WHERE key = ? ORDER BY score DESC LIMIT ? OFFSET ?",
+                (key, end - start + 1, -end - 1)
+            ).fetchall()[::-1]
+        else:
+            selected = self._connection().execute(
+                "SELECT member, score FROM zsets WHERE key = ? ORDER BY score LIMIT ? OFFSET ?",
+                (key, end - start + 1, start)
+            ).fetchall()
+        if withscores:
+            return [(member, score) for member, score in selected]
+        return [member for member, _ in selected]
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._connection().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value) -> bool:
+        self._connection().execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, str(value)))
+        return True
+
+def create_rate_limit_store(backend: str = "memory", sqlite_path: Optional[str] = None,
+                            redis_url: Optional[str] = None):
+    """
+    설정값에 맞는 레이트 리밋 상태 저장소 생성
+    redis 백엔드는 redis-py 클라이언트를 그대로 저장소로 사용합니다.
+    """
+    if backend == "sqlite":
+        logger.info(f"Rate limit state backend: sqlite ({sqlite_path})")
+        return SQLiteRateLimitStore(sqlite_path)
+
+    if backend == "redis":
+        if not REDIS_AVAILABLE:
+            logger.warning("redis가 설치되지 않아 프로세스 내부 저장소를 사용합니다.")
+            return InMemoryRateLimitStore()
+        logger.info("Rate limit state backend: redis")
+        return redis.Redis.from_url(redis_url)
+
+    return InMemoryRateLimitStore()
@@ -1,14 +1,24 @@
 import time
+import asyncio
+import threading
 import logging
-from typing import Dict, Optional
+import uuid
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+from rate_limit_backend import InMemoryRateLimitStore
+
 logger = logging.getLogger(__name__)
 
+# 레이트 리밋 상태 저장소의 공용 락 이름
+LOCK_NAME = "riot-rate:lock"
+LOCK_TIMEOUT = 5
+
 class AdaptiveRateLimit:
     """
     적응형 레이트 리밋 관리자
     API 응답에 따라 동적으로 딜레이를 조정합니다.
+    상태 변경은 락으로 보호되어 여러 스레드에서 공유할 수 있습니다.
     """
     
     def __init__(self, initial_delay: float = 0.5, max_delay: float = 10.0, min_delay: float = 0.1):
@@ -24,34 +34,63 @@ class AdaptiveRateLimit:
         self.rate_limited_requests = 0
         self.total_wait_time = 0
         
-    def wait_if_needed(self) -> float:
+        self._lock = threading.Lock()
+        
+    def reserve(self) -> float:
+        """
+        다음 요청 슬롯을 예약하고 대기해야 할 시간을 반환
+        요청 시작 시점 간격을 delay 이상으로 유지하므로 동시 요청에도 안전합니다.
+        """
+        with self._lock:
+            current_time = time.time()
+            next_slot = max(current_time, self.last_request_time + self.delay)
+            self.last_request_time = next_slot
+            
+            wait_time = next_slot - current_time
+            if wait_time > 0:
+                self.total_wait_time += wait_time
+            return wait_time
+        
+    def wait_if_needed(self, method: Optional[str] = None) -> float:
         """필요시 대기하고 실제 대기 시간을 반환"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+        wait_time = self.reserve()
         
-        if time_since_last < self.delay:
-            wait_time = self.delay - time_since_last
+        if wait_time > 0:
             logger.debug(f"Rate limit wait: {wait_time:.2f}s")
             time.sleep(wait_time)
-            self.total_wait_time += wait_time
-            return wait_time
         
-        return 0
+        return wait_time
         
-    def record_response(self, status_code: int, response_time: Optional[float] = None):
-        """API 응답을 기록하고 딜레이를 조정"""
-        self.total_requests += 1
-        self.last_request_time = time.time()
+    async def async_wait_if_needed(self, method: Optional[str] = None) -> float:
+        """asyncio 환경용 대기 (이벤트 루프를 막지 않음)"""
+        wait_time = self.reserve()
         
-        if status_code == 429:  # Rate limited
-            self._handle_rate_limit()
-        elif status_code == 200:  # Success
-            self._handle_success(response_time)
-        elif status_code >= 500:  # Server error
-            self._handle_server_error()
-        else:
-            # Other errors don't affect rate limiting
-            pass
+        if wait_time > 0:
+            logger.debug(f"Rate limit wait: {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
+        
+        return wait_time
+        
+    def record_response(self, status_code: int, response_time: Optional[float] = None,
+                        headers: Optional[Dict] = None, method: Optional[str] = None):
+        """API 응답을 기록하고 딜레이를 조정 (헤더는 사용하지 않음)"""
+        with self._lock:
+            self.total_requests += 1
+            
+            if status_code == 429:  # Rate limited
+                self._handle_rate_limit()
+            elif status_code == 200:  # Success
+                self._handle_success(response_time)
+            elif status_code >= 500:  # Server error
+                self._handle_server_error()
+            else:
+                # Other errors don't affect rate limiting
+                pass
+            
+    async def async_record_response(self, status_code: int, response_time: Optional[float] = None,
+                                    headers: Optional[Dict] = None, method: Optional[str] = None):
+        """asyncio 환경용 응답 기록 (메모리 상태만 갱신하므로 바로 실행)"""
+        self.record_response(status_code, response_time, headers, method)
             
     def _handle_rate_limit(self):
         """레이트 리밋 발생 시 처리"""
@@ -82,44 +121,383 @@ class AdaptiveRateLimit:
             
     def get_stats(self) -> Dict:
         """레이트 리밋 통계 반환"""
-        rate_limit_percentage = (self.rate_limited_requests / self.total_requests * 100) if self.total_requests > 0 else 0
-        avg_wait_time = self.total_wait_time / self.total_requests if self.total_requests > 0 else 0
-        
-        return {
-            'total_requests': self.total_requests,
-            'rate_limited_requests': self.rate_limited_requests,
-            'rate_limit_percentage': rate_limit_percentage,
-            'current_delay': self.delay,
-            'total_wait_time': self.total_wait_time,
-            'avg_wait_time_per_request': avg_wait_time
-        }
+        with self._lock:
+            rate_limit_percentage = (self.rate_limited_requests / self.total_requests * 100) if self.total_requests > 0 else 0
+            avg_wait_time = self.total_wait_time / self.total_requests if self.total_requests > 0 else 0
+            
+            return {
+                'total_requests': self.total_requests,
+                'rate_limited_requests': self.rate_limited_requests,
+                'rate_limit_percentage': rate_limit_percentage,
+                'current_delay': self.delay,
+                'total_wait_time': self.total_wait_time,
+                'avg_wait_time_per_request': avg_wait_time
+            }
         
     def reset_stats(self):
         """통계 초기화"""
+        with self._lock:
+            self.total_requests = 0
+            self.rate_limited_requests = 0
+            self.total_wait_time = 0
+        logger.info("Rate limiter statistics reset")
+
+def parse_rate_limit_header(value: Optional[str]) -> List[Tuple[int, int]]:
+    """
+    Riot 레이트 리밋 헤더 파싱
+    "20:1,100:120" -> [(20, 1), (100, 120)] (요청 수, 윈도우 초)
+    """
+    if not value:
+        return []
+    
+    limits = []
+    for part in value.split(','):
+        try:
+            count, seconds = part.strip().split(':')
+            limits.append((int(count), int(seconds)))
+        except ValueError:
+            logger.warning(f"Invalid rate limit header part: {part!r}")
+    return limits
+
+class RateWindowSet:
+    """
+    한 범위(앱 전체 또는 메서드)에 걸리는 여러 레이트 윈도우
+    요청 시각은 저장소의 정렬 집합(key)에 기록되며, 같은 저장소를 쓰는
+    모든 스레드/프로세스가 하나의 예산을 공유합니다.
+    """
+    
+    def __init__(self, limits: List[Tuple[int, int]], window_padding: float = 0.0,
+                 store=None, key: str = "riot-rate:app"):
+        self.window_padding = window_padding
+        self.store = store if store is not None else InMemoryRateLimitStore()
+        self.key = key
+        self.blocked_key = f"{key}:blocked"
+        self.set_limits(limits)
+        
+    def set_limits(self, limits: List[Tuple[int, int]]):
+        """윈도우 한도 교체 (응답 헤더 값이 바뀐 경우)"""
+        self.limits = sorted(limits, key=lambda limit: limit[1])
+        self._max_seconds = max((seconds for _, seconds in self.limits), default=0)
+        
+    def wait_time(self, now: float) -> float:
+        """지금 요청하려면 기다려야 하는 시간 (저장소 락을 잡은 상태에서 호출)"""
+        blocked_until = self.store.get(self.blocked_key)
+        wait = max(float(blocked_until) - now, 0.0) if blocked_until else 0.0
+        
+        for count, seconds in self.limits:
+            # count번째 이전 요청이 윈도우를 벗어날 때까지 대기 (행이 있으면 기록이 count개 이상)
+            nth_latest = self.store.zrange(self.key, -count, -count, withscores=True)
+            if nth_latest:
+                oldest_in_window = nth_latest[0][1]
+                wait = max(wait, oldest_in_window + seconds + self.window_padding - now)
+        
+        return wait
+        
+    def add(self, now: float, times: int = 1):
+        """요청 시각 기록 (저장소 락을 잡은 상태에서 호출)"""
+        self.store.zadd(self.key, {f"{now:.6f}:{uuid.uuid4().hex[:12]}": now for _ in range(times)})
+        # 가장 긴 윈도우보다 오래된 기록 정리
+        self.store.zremrangebyscore(self.key, float('-inf'), now - self._max_seconds - self.window_padding - 1)
+            
+    def count_in_window(self, seconds: int, now: float) -> int:
+        """최근 seconds초 동안의 요청 수"""
+        return self.store.zcount(self.key, now - seconds, float('inf'))
+        
+    def sync_counts(self, limits: List[Tuple[int, int]], counts: List[Tuple[int, int]], now: float):
+        """
+        응답 헤더의 한도/사용량과 저장소 상태 동기화
+        저장소를 공유하지 않는 다른 클라이언트가 같은 키를 쓰면 서버 사용량이 더 클 수 있습니다.
+        """
+        if limits and sorted(limits, key=lambda limit: limit[1]) != self.limits:
+            logger.info(f"Rate limits updated from headers: {limits}")
+            self.set_limits(limits)
+            
+        if not counts:
+            return
+            
+        with self.store.lock(LOCK_NAME, timeout=LOCK_TIMEOUT):
+            for used, seconds in counts:
+                missing = used - self.count_in_window(seconds, now)
+                if missing > 0:
+                    self.add(now, missing)
+                    
+    def block(self, seconds: float, now: float):
+        """Retry-After 동안 이 범위의 요청 중단"""
+        with self.store.lock(LOCK_NAME, timeout=LOCK_TIMEOUT):
+            blocked_until = self.store.get(self.blocked_key)
+            current = float(blocked_until) if blocked_until else 0.0
+            self.store.set(self.blocked_key, max(current, now + seconds))
+            
+    def usage(self, now: float) -> Dict[str, int]:
+        """윈도우별 현재 사용량"""
+        return {f"{count}:{seconds}": self.count_in_window(seconds, now) for count, seconds in self.limits}
+
+def try_acquire(window_sets: List[RateWindowSet]) -> float:
+    """
+    여러 윈도우 집합에서 동시에 요청 슬롯 획득 시도
+    모두 여유가 있으면 요청을 기록하고 0을, 아니면 기다려야 할 시간을 반환합니다.
+    윈도우 집합들은 같은 저장소를 사용해야 합니다.
+    """
+    store = window_sets[0].store
+    with store.lock(LOCK_NAME, timeout=LOCK_TIMEOUT):
+        # 락 대기 시간이 기록 시각에 섞이지 않도록 락을 잡은 뒤 현재 시각 측정
+        now = time.time()
+        wait = max((window_set.wait_time(now) for window_set in window_sets), default=0.0)
+        if wait <= 0:
+            for window_set in window_sets:
+                window_set.add(now)
+        return max(wait, 0.0)
+
+class RiotRateLimit:
+    """
+    Riot 응답 헤더 기반 레이트 리미터
+    X-App-Rate-Limit / X-Method-Rate-Limit 헤더의 모든 윈도우를 정확히 추적해
+    허용 한도까지 요청하되 한도를 넘기기 전에 대기합니다.
+    get_stats()는 AdaptiveRateLimit과 같은 키를 반환합니다.
+    app_windows를 넘기면 여러 리미터가 앱 전체 한도를 공유하고,
+    method를 지정하면 method 인자 없이 호출해도 해당 메서드 한도를 적용합니다.
+    """
+    
+    def __init__(self, app_limits: str = "20:1,100:120", window_padding: float = 0.05,
+                 default_retry_after: float = 1.0, app_windows: Optional[RateWindowSet] = None,
+                 method: Optional[str] = None):
+        self.method = method
+        self.window_padding = window_padding
+        self.default_retry_after = default_retry_after
+        self.app_windows = app_windows or RateWindowSet(parse_rate_limit_header(app_limits), window_padding)
+        self.method_windows: Dict[str, RateWindowSet] = {}
+        self._lock = threading.Lock()
+        
+        # 통계 추적
         self.total_requests = 0
         self.rate_limited_requests = 0
         self.total_wait_time = 0
+        self.total_response_time = 0
+        self.last_wait_time = 0
+        
+    def _windows_for(self, method: Optional[str]) -> List[RateWindowSet]:
+        """요청에 적용할 윈도우 집합 목록 (앱 + 메서드)"""
+        method = method or self.method
+        if method is None:
+            return [self.app_windows]
+        with self._lock:
+            if method not in self.method_windows:
+                # 메서드 한도는 첫 응답 헤더로 채워짐
+                self.method_windows[method] = RateWindowSet(
+                    [], self.window_padding,
+                    store=self.app_windows.store,
+                    key=f"{self.app_windows.key}:method:{method}"
+                )
+            return [self.app_windows, self.method_windows[method]]
+        
+    def reserve(self, method: Optional[str] = None) -> float:
+        """슬롯 획득을 시도하고 0(획득) 또는 기다려야 할 시간을 반환"""
+        return try_acquire(self._windows_for(method))
+        
+    def _record_wait(self, wait_time: float):
+        with self._lock:
+            self.total_wait_time += wait_time
+            self.last_wait_time = wait_time
+        
+    def wait_if_needed(self, method: Optional[str] = None) -> float:
+        """슬롯이 생길 때까지 대기하고 실제 대기 시간을 반환"""
+        total_wait = 0.0
+        while True:
+            wait_time = self.reserve(method)
+            if wait_time <= 0:
+                break
+            logger.debug(f"Rate limit wait: {wait_time:.2f}s ({method or 'app'})")
+            time.sleep(wait_time)
+            total_wait += wait_time
+        
+        self._record_wait(total_wait)
+        return total_wait
+        
+    def _uses_shared_store(self) -> bool:
+        """상태 저장소가 sqlite/redis라 호출마다 프로세스 간 락과 I/O를 거치는지 여부"""
+        return not isinstance(self.app_windows.store, InMemoryRateLimitStore)
+        
+    async def async_wait_if_needed(self, method: Optional[str] = None) -> float:
+        """asyncio 환경용 대기 (이벤트 루프를 막지 않음, sqlite/redis 저장소 호출은 스레드에서 실행)"""
+        shared_store = self._uses_shared_store()
+        total_wait = 0.0
+        while True:
+            wait_time = await asyncio.to_thread(self.reserve, method) if shared_store else self.reserve(method)
+            if wait_time <= 0:
+                break
+            logger.debug(f"Rate limit wait: {wait_time:.2f}s ({method or 'app'})")
+            await asyncio.sleep(wait_time)
+            total_wait += wait_time
+        
+        self._record_wait(total_wait)
+        return total_wait
+        
+    def record_response(self, status_code: int, response_time: Optional[float] = None,
+                        headers: Optional[Dict] = None, method: Optional[str] = None):
+        """API 응답 헤더로 윈도우 상태를 동기화"""
+        method = method or self.method
+        now = time.time()
+        headers = headers or {}
+        
+        with self._lock:
+            self.total_requests += 1
+            if response_time:
+                self.total_response_time += response_time
+            if status_code == 429:
+                self.rate_limited_requests += 1
+        
+        self.app_windows.sync_counts(
+            parse_rate_limit_header(headers.get('X-App-Rate-Limit')),
+            parse_rate_limit_header(headers.get('X-App-Rate-Limit-Count')),
+            now
+        )
+        if method is not None:
+            self._windows_for(method)[-1].sync_counts(
+                parse_rate_limit_header(headers.get('X-Method-Rate-Limit')),
+                parse_rate_limit_header(headers.get('X-Method-Rate-Limit-Count')),
+                now
+            )
+            
+        if status_code == 429:
+            self._handle_rate_limit(headers, method, now)
+            
+    async def async_record_response(self, status_code: int, response_time: Optional[float] = None,
+                                    headers: Optional[Dict] = None, method: Optional[str] = None):
+        """asyncio 환경용 응답 기록 (sqlite/redis 저장소 동기화는 스레드에서 실행)"""
+        if self._uses_shared_store():
+            await asyncio.to_thread(self.record_response, status_code, response_time, headers, method)
+        else:
+            self.record_response(status_code, response_time, headers, method)
+            
+    def _handle_rate_limit(self, headers: Dict, method: Optional[str], now: float):
+        """429 응답 시 Retry-After 동안 해당 범위 차단"""
+        try:
+            retry_after = float(headers.get('Retry-After', self.default_retry_after))
+        except (TypeError, ValueError):
+            retry_after = self.default_retry_after
+            
+        limit_type = headers.get('X-Rate-Limit-Type', 'application')
+        if limit_type == 'application' or method is None:
+            self.app_windows.block(retry_after, now)
+        else:
+            # method, service 한도는 해당 메서드만 차단
+            self._windows_for(method)[-1].block(retry_after, now)
+            
+        logger.warning(f"Rate limited ({limit_type})! Blocking {method or 'app'} for {retry_after:.1f}s")
+        
+    def get_stats(self) -> Dict:
+        """레이트 리밋 통계 반환"""
+        now = time.time()
+        with self._lock:
+            rate_limit_percentage = (self.rate_limited_requests / self.total_requests * 100) if self.total_requests > 0 else 0
+            avg_wait_time = self.total_wait_time / self.total_requests if self.total_requests > 0 else 0
+            avg_response_time = self.total_response_time / self.total_requests if self.total_requests > 0 else 0
+            method_windows = dict(self.method_windows)
+            
+            stats = {
+                'total_requests': self.total_requests,
+                'rate_limited_requests': self.rate_limited_requests,
+                'rate_limit_percentage': rate_limit_percentage,
+                'current_delay': self.last_wait_time,
+                'total_wait_time': self.total_wait_time,
+                'avg_wait_time_per_request': avg_wait_time,
+                'avg_response_time': avg_response_time
+            }
+        
+        stats['app_window_usage'] = self.app_windows.usage(now)
+        stats['method_window_usage'] = {method: windows.usage(now) for method, windows in method_windows.items()}
+        return stats
+        
+    def reset_stats(self):
+        """통계 초기화"""
+        with self._lock:
+            self.total_requests = 0
+            self.rate_limited_requests = 0
+            self.total_wait_time = 0
+            self.total_response_time = 0
         logger.info("Rate limiter statistics reset")
 
 class RateLimitManager:
     """
     여러 엔드포인트에 대한 레이트 리밋 관리
+    엔드포인트(메서드)마다 별도 리미터를 두고, 앱 전체 한도 윈도우는 모든 리미터가 공유합니다.
+    한 엔드포인트가 메서드 한도에 걸려도 다른 엔드포인트 요청은 막히지 않습니다.
     """
     
-    def __init__(self):
-        self.limiters: Dict[str, AdaptiveRateLimit] = {}
+    def __init__(self, app_limits: str = "20:1,100:120", window_padding: float = 0.05,
+                 default_retry_after: float = 1.0, store=None, namespace: str = "riot-rate"):
+        self.window_padding = window_padding
+        self.default_retry_after = default_retry_after
+        self.namespace = namespace
+        # store를 공유하면 여러 프로세스/인스턴스가 하나의 앱 한도를 나눠 씀
+        self.app_windows = RateWindowSet(
+            parse_rate_limit_header(app_limits), window_padding,
+            store=store, key=f"{namespace}:app"
+        )
+        self.limiters: Dict[str, RiotRateLimit] = {}
+        self._lock = threading.Lock()
         
-    def get_limiter(self, endpoint: str, **kwargs) -> AdaptiveRateLimit:
-        """엔드포인트별 레이트 리미터 반환"""
-        if endpoint not in self.limiters:
-            self.limiters[endpoint] = AdaptiveRateLimit(**kwargs)
-            
-        return self.limiters[endpoint]
+    def get_limiter(self, endpoint: str) -> RiotRateLimit:
+        """엔드포인트별 레이트 리미터 반환 (앱 한도 공유)"""
+        with self._lock:
+            if endpoint not in self.limiters:
+                self.limiters[endpoint] = RiotRateLimit(
+                    window_padding=self.window_padding,
+                    default_retry_after=self.default_retry_after,
+                    app_windows=self.app_windows,
+                    method=endpoint
+                )
+                
+            return self.limiters[endpoint]
+        
+    def create_budget(self, name: str, limits: str) -> RiotRateLimit:
+        """
+        앱 한도와 별개인 추가 요청 예산 (예: 타임라인 전용)
+        같은 저장소와 네임스페이스를 쓰므로 같은 지역의 다른 클라이언트/프로세스와 예산을 나눠 씀
+        """
+        return RiotRateLimit(
+            window_padding=self.window_padding,
+            default_retry_after=self.default_retry_after,
+            app_windows=RateWindowSet(
+                parse_rate_limit_header(limits), self.window_padding,
+                store=self.app_windows.store, key=f"{self.namespace}:{name}"
+            )
+        )
         
     def get_global_stats(self) -> Dict:
         """모든 엔드포인트의 통계 반환"""
+        with self._lock:
+            limiters = dict(self.limiters)
+        
         stats = {}
-        for endpoint, limiter in self.limiters.items():
-            stats[endpoint] = limiter.get_stats()
+        for endpoint, limiter in limiters.items():
+            endpoint_stats = limiter.get_stats()
+            # 앱 윈도우는 공유되므로 엔드포인트별로는 메서드 윈도우만 표시
+            endpoint_stats.pop('app_window_usage', None)
+            endpoint_stats['method_window_usage'] = endpoint_stats['method_window_usage'].get(endpoint, {})
+            stats[endpoint] = endpoint_stats
             
-        return stats
\ No newline at end of file
+        return stats
+        
+    def get_stats(self) -> Dict:
+        """
+        전체 엔드포인트 합산 통계 반환
+        AdaptiveRateLimit.get_stats()와 같은 키를 유지합니다.
+        """
+        endpoint_stats = self.get_global_stats()
+        
+        total_requests = sum(stats['total_requests'] for stats in endpoint_stats.values())
+        rate_limited_requests = sum(stats['rate_limited_requests'] for stats in endpoint_stats.values())
+        total_wait_time = sum(stats['total_wait_time'] for stats in endpoint_stats.values())
+        total_response_time = sum(stats['avg_response_time'] * stats['total_requests'] for stats in endpoint_stats.values())
+        
+        return {
+            'total_requests': total_requests,
+            'rate_limited_requests': rate_limited_requests,
+            'rate_limit_percentage': (rate_limited_requests / total_requests * 100) if total_requests > 0 else 0,
+            'current_delay': max((stats['current_delay'] for stats in endpoint_stats.values()), default=0),
+            'total_wait_time': total_wait_time,
+            'avg_wait_time_per_request': total_wait_time / total_requests if total_requests > 0 else 0,
+            'avg_response_time': total_response_time / total_requests if total_requests > 0 else 0,
+            'app_window_usage': self.app_windows.usage(time.time())
+        }
@@ -116,27 +116,895 @@ def test_data_collection_modules():
 def test_rate_limiter():
     """레이트 리미터 기능 테스트"""
     print("\n=== Rate Limiter 기능 테스트 ===")
-    
+    from rate_limiter import AdaptiveRateLimit, RiotRateLimit
+
+    limiter = AdaptiveRateLimit(initial_delay=0.1)
+
+    # 성공 응답은 딜레이를 바로 바꾸지 않고, 레이트 리밋 응답은 1.5배로 늘림
+    limiter.record_response(200, 0.5)
+    assert limiter.delay == 0.1
+    limiter.record_response(429, 1.0)
+    stats = limiter.get_stats()
+    assert stats['total_requests'] == 2
+    assert stats['rate_limited_requests'] == 1
+    assert abs(stats['current_delay'] - 0.15) < 1e-9
+    print(f"[OK] 적응형 리미터 통계: {stats}")
+
+    # 헤더 기반 레이트 리미터: 응답 헤더의 앱/메서드 한도 반영
+    riot_limiter = RiotRateLimit(app_limits="20:1,100:120")
+    riot_limiter.wait_if_needed("match-v5.detail")
+    riot_limiter.record_response(200, 0.2, headers={
+        'X-App-Rate-Limit': '20:1,100:120',
+        'X-App-Rate-Limit-Count': '1:1,1:120',
+        'X-Method-Rate-Limit': '2000:10',
+        'X-Method-Rate-Limit-Count': '1:10'
+    }, method="match-v5.detail")
+    assert riot_limiter.get_stats()['total_requests'] == 1
+    assert riot_limiter.app_windows.limits == [(20, 1), (100, 120)]
+    assert riot_limiter.method_windows["match-v5.detail"].limits == [(2000, 10)]
+
+    # 윈도우 한도까지는 바로 통과, 넘으면 대기 시간 반환
+    small_limiter = RiotRateLimit(app_limits="2:1", window_padding=0.0)
+    assert small_limiter.reserve() == 0 and small_limiter.reserve() == 0
+    assert 0 < small_limiter.reserve() <= 1.0
+    print("[OK] 헤더 기반 리미터 한도 적용")
+
+def test_circuit_breaker_transitions():
+    """서킷 브레이커 상태 전환과 재시도 횟수 소진 확인"""
+    print("\n=== 서킷 브레이커/재시도 테스트 ===")
+    import time
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from retry_policy import CircuitBreaker, RetryEngine
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05, probe_interval=0.01)
+    breaker.record_failure()
+    assert breaker.state == breaker.CLOSED and breaker.acquire() == (0.0, False)
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN and breaker.open_count == 1
+    wait, probe = breaker.acquire()
+    assert wait > 0 and not probe, "열린 서킷은 요청을 막아야 함"
+
+    # reset_timeout 뒤에는 시험 요청 하나만 통과
+    time.sleep(0.06)
+    assert breaker.acquire() == (0.0, True)
+    assert breaker.state == breaker.HALF_OPEN
+    assert breaker.acquire() == (0.01, False), "시험 요청 중에는 다른 요청 대기"
+
+    # 시험 요청 실패 -> 다시 열림, 성공 -> 닫힘
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN and breaker.open_count == 2
+    time.sleep(0.06)
+    assert breaker.acquire() == (0.0, True)
+    breaker.record_success()
+    assert breaker.state == breaker.CLOSED and breaker.consecutive_failures == 0
+    assert breaker.acquire() == (0.0, False)
+    print("[OK] closed -> open -> half_open -> open -> half_open -> closed")
+
+    engine = RetryEngine(max_retries=2, base_delay=0.01, max_delay=1.0, failure_threshold=10)
+    method = "match-v5.detail"
+    assert engine.on_response(method, 0, 500) is not None
+    assert engine.on_response(method, 1, 503) is not None
+    assert engine.on_response(method, 2, 500) is None, "max_retries 이후에는 재시도하지 않아야 함"
+    assert engine.on_response(method, 0, 429, {'Retry-After': '3'}) == 1.0, "Retry-After는 max_delay로 제한"
+    assert engine.on_response(method, 0, 404) is None
+    assert engine.on_error(method, 2) is None
+    stats = engine.get_stats()
+    assert stats['retries'] == 3
+    assert stats['retries_exhausted'] == 2
+    assert stats['retry_by_family']['match-v5']['circuit_state'] == CircuitBreaker.CLOSED
+    print(f"[OK] 재시도 소진 통계: 재시도 {stats['retries']}회, 포기 {stats['retries_exhausted']}회")
+
+def test_known_match_index():
+    """블룸 필터 포함 여부와 매치 인덱스 저장/로드 확인"""
+    print("\n=== 매치 인덱스(블룸 필터) 테스트 ===")
+    import tempfile
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from match_index import BloomFilter, KnownMatchIndex
+
+    bloom = BloomFilter(capacity=1000, false_positive_rate=0.01)
+    stored = [f"KR_{i}" for i in range(1000)]
+    for match_id in stored:
+        bloom.add(match_id)
+    assert all(match_id in bloom for match_id in stored), "넣은 ID는 항상 포함"
+    false_positives = sum(f"NA1_{i}" in bloom for i in range(10000))
+    assert false_positives < 300, f"오탐률이 너무 높음: {false_positives / 10000:.3f}"
+    print(f"[OK] 블룸 필터 오탐률 {false_positives / 10000:.4f}")
+
+    class StubBigQuery:
+        def __init__(self, match_ids, fail=False):
+            self.match_ids, self.fail = match_ids, fail
+
+        def iter_known_match_ids(self, since=None):
+            yield from self.match_ids
+            if self.fail:
+                raise RuntimeError("조회 실패")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "known.bloom")
+        index = KnownMatchIndex.load_or_build(StubBigQuery(stored[:500]), 1000, 0.01, path)
+        assert os.path.exists(path) and index.built_at is not None
+
+        loaded = KnownMatchIndex(1000, 0.01, path)
+        assert loaded.load()
+        assert len(loaded) == 500 and loaded.built_at == index.built_at
+        assert all(match_id in loaded for match_id in stored[:500])
+
+        # 갱신 실패 시 기준 시각을 옮기지 않음
+        assert loaded.refresh_from_bigquery(StubBigQuery(stored[500:], fail=True)) is None
+        assert loaded.built_at == index.built_at
+
+        # 설정이 다르면 로드하지 않음
+        assert not KnownMatchIndex(2000, 0.01, path).load()
+    print("[OK] 매치 인덱스 저장/로드 왕복")
+
+def _sample_match_payload() -> bytes:
+    """match-v5 응답 구조의 테스트용 매치 JSON (참가자 10명, 중첩 필드와 작은따옴표가 든 원본 필드 포함)"""
+    import json
+
+    participants = []
+    for i in range(10):
+        participant = {
+            'participantId': i + 1, 'puuid': f"puuid-{i:02d}" + "x" * 66,
+            'summonerName': f"player{i}", 'riotIdGameName': f"플레이어{i}", 'riotIdTagline': "KR1",
+            'summonerLevel': 300 + i, 'championId': 100 + i, 'championName': f"Champion{i}",
+            'champLevel': 18, 'win': i < 5, 'teamId': 100 if i < 5 else 200, 'playerSubteamName': "Kai'Sa",
+            'teamPosition': "TOP", 'individualPosition': "TOP",
+            'kills': i, 'deaths': 3, 'assists': 7, 'totalMinionsKilled': 210, 'neutralMinionsKilled': 12,
+            'goldEarned': 14000, 'totalDamageDealtToChampions': 25000, 'visionScore': 30,
+            'summoner1Id': 4, 'summoner2Id': 12, 'placement': 0, 'subteamPlacement': 0,
+            'perks': {'statPerks': {'defense': 5002, 'flex': 5008, 'offense': 5005},
+                      'styles': [{'style': 8000, 'selections': [{'perk': 8010 + k, 'var1': k} for k in range(4)]}]},
+            'challenges': {f"challengeStat{k}": k * 1.5 for k in range(5)}
+        }
+        participant.update({f"item{k}": 3000 + k for k in range(7)})
+        participants.append(participant)
+    del participants[9]['item6']  # 없는 필드는 기본값
+
+    match = {
+        'metadata': {'matchId': "KR_7000000000", 'dataVersion': "2"},
+        'info': {
+            'gameCreation': 1700000000000, 'gameDuration': 1800, 'gameMode': "CLASSIC", 'gameType': "MATCHED_GAME",
+            'gameVersion': "14.18.618.5051", 'queueId': 420, 'mapId': 11, 'platformId': "KR",
+            'gameEndTimestamp': 1700001800000, 'participants': participants,
+            'teams': [{'teamId': team_id, 'win': team_id == 100} for team_id in (100, 200)]
+        }
+    }
+    return json.dumps(match, ensure_ascii=False).encode('utf-8')
+
+def _previous_participant_rows(match_data):
+    """필드 선언 도입 전 extract_participants_data의 참가자 행 (비교 기준)"""
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+    from match_decoder import RAW_PARTICIPANT_KEY
+
+    info = match_data.get("info", {})
+    match_id = match_data.get("metadata", {}).get("matchId")
+    game_creation_kst = datetime.fromtimestamp(info.get('gameCreation', 0) / 1000, tz=ZoneInfo("Asia/Seoul"))
+    rows = []
+    for participant in info.get("participants", []):
+        rows.append({
+            'match_id': match_id, 'participant_id': participant.get('participantId', 0), 'puuid': participant.get('puuid'),
+            'summoner_name': participant.get('summonerName'), 'riot_id_game_name': participant.get('riotIdGameName'),
+            'riot_id_tagline': participant.get('riotIdTagline'), 'summoner_level': participant.get('summonerLevel'),
+            'champion_id': participant.get('championId', 0), 'champion_name': participant.get('championName', 'Unknown'),
+            'champion_level': participant.get('champLevel', 1), 'win': participant.get('win', False),
+            'team_id': participant.get('teamId', 100), 'team_position': participant.get('teamPosition'),
+            'individual_position': participant.get('individualPosition'),
+            'kills': participant.get('kills', 0), 'deaths': participant.get('deaths', 0), 'assists': participant.get('assists', 0),
+            'total_minions_killed': participant.get('totalMinionsKilled', 0),
+            'neutral_minions_killed': participant.get('neutralMinionsKilled', 0),
+            'gold_earned': participant.get('goldEarned', 0),
+            'total_damage_dealt_to_champions': participant.get('totalDamageDealtToChampions', 0),
+            'vision_score': participant.get('visionScore', 0),
+            'item0': participant.get('item0', 0), 'item1': participant.get('item1', 0), 'item2': participant.get('item2', 0),
+            'item3': participant.get('item3', 0), 'item4': participant.get('item4', 0), 'item5': participant.get('item5', 0),
+            'item6': participant.get('item6', 0),
+            'summoner1_id': participant.get('summoner1Id'), 'summoner2_id': participant.get('summoner2Id'),
+            'placement': participant.get('placement'), 'subteam_placement': participant.get('subteamPlacement'),
+            'detailed_stats': participant.get(RAW_PARTICIPANT_KEY, participant),
+            'game_creation': game_creation_kst, 'collected_at': datetime.now(ZoneInfo("Asia/Seoul"))
+        })
+    return rows
+
+def _previous_participant_struct(p):
+    """필드 선언 도입 전 _participants_merge_query의 행 STRUCT (비교 기준, 공백만 한 줄로 정리)"""
+    from match_fields import json_text
+
+    def safe_str(value):
+        return f"'{value}'" if value is not None else "NULL"
+
+    def safe_int(value):
+        return str(value) if value is not None else "NULL"
+
+    detailed_stats_json = json_text(p["detailed_stats"]).replace("'", "\\'")
+    return (
+        f"STRUCT('{p['match_id']}' AS match_id, {p['participant_id']} AS participant_id, '{p['puuid']}' AS puuid, "
+        f"{safe_str(p['summoner_name'])} AS summoner_name, {safe_str(p['riot_id_game_name'])} AS riot_id_game_name, "
+        f"{safe_str(p['riot_id_tagline'])} AS riot_id_tagline, {safe_int(p['summoner_level'])} AS summoner_level, "
+        f"{p['champion_id']} AS champion_id, '{p['champion_name']}' AS champion_name, {p['champion_level']} AS champion_level, "
+        f"{p['win']} AS win, {p['team_id']} AS team_id, {safe_str(p['team_position'])} AS team_position, "
+        f"{safe_str(p['individual_position'])} AS individual_position, {p['kills']} AS kills, {p['deaths']} AS deaths, "
+        f"{p['assists']} AS assists, {p['total_minions_killed']} AS total_minions_killed, "
+        f"{p['neutral_minions_killed']} AS neutral_minions_killed, {p['gold_earned']} AS gold_earned, "
+        f"{p['total_damage_dealt_to_champions']} AS total_damage_dealt_to_champions, {p['vision_score']} AS vision_score, "
+        f"{safe_int(p['item0'])} AS item0, {safe_int(p['item1'])} AS item1, {safe_int(p['item2'])} AS item2, "
+        f"{safe_int(p['item3'])} AS item3, {safe_int(p['item4'])} AS item4, {safe_int(p['item5'])} AS item5, "
+        f"{safe_int(p['item6'])} AS item6, {safe_int(p['summoner1_id'])} AS summoner1_id, "
+        f"{safe_int(p['summoner2_id'])} AS summoner2_id, {safe_int(p['placement'])} AS placement, "
+        f"{safe_int(p['subteam_placement'])} AS subteam_placement, PARSE_JSON('{detailed_stats_json}') AS detailed_stats, "
+        f"TIMESTAMP('{p['game_creation'].strftime('%Y-%m-%d %H:%M:%S')}') AS game_creation, "
+        f"TIMESTAMP('{p['collected_at'].strftime('%Y-%m-%d %H:%M:%S')}') AS collected_at)"
+    )
+
+def test_participant_fields_match_previous_output():
+    """필드 선언으로 생성한 참가자 변환/STRUCT 인코더가 이전 손으로 쓴 코드와 같은 결과인지 확인"""
+    print("\n=== 참가자 필드 변환/인코딩 테스트 ===")
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from match_decoder import MatchDecoder
+    from match_fields import encode_participant_struct, extract_participant_rows
+
+    kst = ZoneInfo("Asia/Seoul")
+    payload = _sample_match_payload()
+    for fast in (True, False):
+        match_data = MatchDecoder(fast=fast).decode(payload)
+        info = match_data["info"]
+        rows = extract_participant_rows(
+            info["participants"],
+            match_id=match_data["metadata"]["matchId"],
+            game_creation=datetime.fromtimestamp(info["gameCreation"] / 1000, tz=kst),
+            collected_at=datetime.now(kst)
+        )
+        expected = _previous_participant_rows(match_data)
+
+        # 수집 시각은 호출 시점 값이라 제외, 불리언은 SQL에서 대소문자 구분 없음
+        strip = lambda row: {key: value for key, value in row.items() if key != 'collected_at'}
+        assert [strip(row._asdict()) for row in rows] == [strip(row) for row in expected], "변환 결과 불일치"
+        for row in rows:
+            assert encode_participant_struct(row).upper() == _previous_participant_struct(row._asdict()).upper(), \
+                f"STRUCT 인코딩 불일치: {row.puuid}"
+        print(f"[OK] 참가자 {len(rows)}행 일치 (빠른 디코딩: {fast})")
+
+def test_column_batch_ndjson():
+    """pyarrow가 없을 때 컬럼 배치를 줄 단위 JSON 로드 파일로 직렬화하는지 확인"""
+    print("\n=== 컬럼 배치 줄 단위 JSON 테스트 ===")
+    import json
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    import columnar_transform
+    from match_decoder import MatchDecoder
+
+    match_data = MatchDecoder(fast=True).decode(_sample_match_payload())
+    transformer = columnar_transform.ColumnarMatchTransformer()
+    transformer.append(match_data)
+    matches, participants = transformer.flush()
+
+    pyarrow_available = columnar_transform.PYARROW_AVAILABLE
+    columnar_transform.PYARROW_AVAILABLE = False
     try:
-        from rate_limiter import AdaptiveRateLimit
-        
-        limiter = AdaptiveRateLimit(initial_delay=0.1)
-        
-        # 성공 응답 시뮬레이션
-        limiter.record_response(200, 0.5)
-        print("[OK] 성공 응답 기록")
-        
-        # 레이트 리밋 응답 시뮬레이션
-        limiter.record_response(429, 1.0)
-        print("[OK] 레이트 리밋 응답 기록")
-        
-        # 통계 확인
-        stats = limiter.get_stats()
-        print(f"[OK] 통계 조회: {stats}")
-        
-    except Exception as e:
-        print(f"[ERROR] Rate Limiter 테스트 실패: {e}")
-        traceback.print_exc()
+        match_file, match_format = matches.to_load_file()
+        participant_file, participant_format = participants.to_load_file()
+    finally:
+        columnar_transform.PYARROW_AVAILABLE = pyarrow_available
+
+    assert match_format == participant_format == "NEWLINE_DELIMITED_JSON"
+    match_rows = [json.loads(line) for line in match_file.read().decode("utf-8").splitlines()]
+    participant_rows = [json.loads(line) for line in participant_file.read().decode("utf-8").splitlines()]
+    assert len(match_rows) == 1 and len(participant_rows) == len(match_data["info"]["participants"])
+
+    # 컬럼 순서 = 스키마 순서, 벽시계 시각은 시간대 없이, JSON 컬럼은 다시 이스케이프하지 않은 객체
+    assert list(match_rows[0]) == [name for name, _ in columnar_transform.MATCH_COLUMNS]
+    assert list(participant_rows[0]) == [name for name, _ in columnar_transform.PARTICIPANT_COLUMNS]
+    game_creation = matches.column("game_creation")[0]
+    assert match_rows[0]["game_creation"] == game_creation.replace(tzinfo=None).isoformat(sep=" ")
+    assert isinstance(participant_rows[0]["detailed_stats"], dict)
+    for row, puuid in zip(participant_rows, participants.column("puuid")):
+        assert row["puuid"] == puuid and row["match_id"] == match_rows[0]["match_id"]
+    print(f"[OK] 매치 {len(match_rows)}행, 참가자 {len(participant_rows)}행")
+
+def _test_config():
+    """API 호출 없이 클라이언트를 만들기 위한 설정 (워밍업/캐시/필터 샘플 끔)"""
+    from config import Config
+
+    cfg = Config()
+    cfg.riot_api_key = cfg.riot_api_key or "test"
+    cfg.HTTP_WARMUP = False
+    cfg.MATCH_CACHE_ENABLED = False
+    cfg.QUEUE_FILTER_SAMPLE_PLAYERS = 0
+    cfg.PLAYER_BATCH_DELAY = 0
+    return cfg
+
+def _stub_match_api(client, games, failing=()):
+    """
+    클라이언트의 매치 ID/상세 조회를 메모리 데이터로 대체
+    games: match_id -> (game_creation epoch 초, 참가자 puuid 목록), failing: 상세 조회가 실패하는 match_id
+    """
+    listings = []
+
+    def get_match_ids_by_puuid(puuid, count=None, since=None, start=0, queue=None, match_type=None):
+        match_ids = sorted((match_id for match_id, (created, puuids) in games.items()
+                            if puuid in puuids and (since is None or created >= since)),
+                           key=lambda match_id: games[match_id][0], reverse=True)
+        listings.append((puuid, since))
+        return match_ids[start:start + count]
+
+    def fetch_match_details(match_id):
+        if match_id in failing:
+            return None
+        created, puuids = games[match_id]
+        return {"metadata": {"matchId": match_id},
+                "info": {"gameCreation": created * 1000, "participants": [{"puuid": puuid} for puuid in puuids]}}
+
+    client.get_match_ids_by_puuid = get_match_ids_by_puuid
+    client._fetch_match_details = fetch_match_details
+    return listings
+
+def test_watermark_failed_detail_relisted():
+    """상세 조회에 실패한 매치보다 기준점을 옮기지 않아 다음 실행에서 다시 조회되는지 확인"""
+    print("\n=== 기준점/상세 조회 실패 재조회 테스트 ===")
+    from datetime import datetime
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from riot_client import RiotClient
+    from records import ChallengerRecord
+    from watermark_store import PlayerWatermarkStore
+
+    games = {f"KR_{n}": (1000 * n, ["p1"]) for n in range(1, 6)}
+    player = ChallengerRecord("p1", 0, 0, 0, False, False, datetime.now())
+
+    watermarks = PlayerWatermarkStore()
+    watermarks.update("p1", 1000)  # KR_1까지 저장한 상태
+    client = RiotClient(_test_config())
+    client.player_watermarks = watermarks
+    _stub_match_api(client, games, failing={"KR_3"})
+
+    matches, _ = client.collect_matches_for_challengers([player], matches_per_player=10)
+    assert sorted(match.match_id for match in matches) == ["KR_2", "KR_4", "KR_5"]
+    watermarks.record_stored([(match.match_id, match.game_creation) for match in matches])
+    assert watermarks.apply_stored_games() == 1
+    assert watermarks.get("p1") == 2000, "실패한 KR_3보다 앞으로 옮기면 안 됨"
+
+    # 다음 실행: 실패한 매치가 다시 조회되고, 이번에는 저장되면 최신 매치까지 이동
+    client = RiotClient(_test_config())
+    client.player_watermarks = watermarks
+    _stub_match_api(client, games)
+    assert "KR_3" in client.get_new_match_ids("p1", 10)
+    watermarks.record_stored([("KR_3", datetime.fromtimestamp(3000))])
+    watermarks.apply_stored_games(known_match_ids={"KR_4", "KR_5"})
+    assert watermarks.get("p1") == 3000
+    print("[OK] 실패한 매치 재조회, 기준점 KR_2 -> KR_3")
+
+def _fake_match_v5(games, corrupt_once=()):
+    """
+    match-v5 HTTP 응답 대역 (URL/파라미터 -> (상태코드, 응답 바이트))
+    games: match_id -> (game_creation epoch 초, 참가자 puuid 목록), corrupt_once: 첫 상세 응답이 잘려서 오는 match_id
+    상세 응답은 _sample_match_payload의 앞쪽 참가자 puuid를 games 값으로 바꿔 만듭니다.
+    """
+    import json
+    from collections import Counter
+
+    template = json.loads(_sample_match_payload())
+    detail_calls = Counter()
+
+    def respond(url, params=None):
+        params = params or {}
+        path = url.split("/lol/match/v5/matches/", 1)[1]
+        if path.startswith("by-puuid/"):
+            puuid = path.split("/")[1]
+            since = params.get("startTime")
+            match_ids = sorted((match_id for match_id, (created, puuids) in games.items()
+                                if puuid in puuids and (since is None or created >= since)),
+                               key=lambda match_id: games[match_id][0], reverse=True)
+            start = params.get("start", 0)
+            return 200, json.dumps(match_ids[start:start + params["count"]]).encode()
+
+        detail_calls[path] += 1
+        if path not in games:
+            return 404, None
+        created, puuids = games[path]
+        match = json.loads(json.dumps(template))
+        match["metadata"]["matchId"] = path
+        match["info"]["gameCreation"] = created * 1000
+        for participant, puuid in zip(match["info"]["participants"], puuids):
+            participant["puuid"] = puuid
+        body = json.dumps(match, ensure_ascii=False).encode("utf-8")
+        if path in corrupt_once and detail_calls[path] == 1:
+            return 200, body[:len(body) // 2]
+        return 200, body
+
+    return respond, detail_calls
+
+def test_watermark_paging_and_since():
+    """기준점 이후 조회의 페이지 나눔, startTime 경계, 실행 중 기준점 고정 확인"""
+    print("\n=== 기준점 페이지/경계 테스트 ===")
+    from datetime import datetime
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from riot_client import RiotClient
+    from watermark_store import PlayerWatermarkStore
+
+    games = {f"KR_{n}": (1000 * n, ["p1", "p2"] if n % 2 else ["p1"]) for n in range(1, 13)}
+    cfg = _test_config()
+    cfg.MATCH_IDS_PAGE_SIZE = 5
+    cfg.WATERMARK_MAX_NEW_MATCHES = 8
+
+    watermarks = PlayerWatermarkStore()
+    watermarks.update("p1", 1000)  # KR_1까지 저장한 상태
+    watermarks.update("p2", 1000)
+    client = RiotClient(cfg)
+    client.player_watermarks = watermarks
+    _stub_match_api(client, games)
+    list_match_ids, pages = client.get_match_ids_by_puuid, []
+
+    def recording_list_match_ids(puuid, count=None, since=None, start=0, queue=None, match_type=None):
+        pages.append((puuid, since, start, count))
+        return list_match_ids(puuid, count, since, start, queue, match_type)
+
+    client.get_match_ids_by_puuid = recording_list_match_ids
+
+    # 기준점 매치 자체는 제외(since = 기준점 + 1), WATERMARK_MAX_NEW_MATCHES개까지 MATCH_IDS_PAGE_SIZE씩
+    assert client.get_new_match_ids("p1", 20) == [f"KR_{n}" for n in range(12, 4, -1)]
+    assert pages == [("p1", 1001, 0, 5), ("p1", 1001, 5, 3)]
+
+    # 마지막 페이지가 덜 차면 더 조회하지 않음 (p2의 기준점 이후 매치는 5개)
+    pages.clear()
+    assert client.get_new_match_ids("p2", 20) == ["KR_11", "KR_9", "KR_7", "KR_5", "KR_3"]
+    assert pages == [("p2", 1001, 0, 5), ("p2", 1001, 5, 3)]
+
+    # 기준점이 없는 플레이어는 최근 count개를 한 번에
+    pages.clear()
+    assert client.get_new_match_ids("p3", 20) == []
+    assert pages == [("p3", None, 0, 20)]
+
+    # 실행 중 저장한 매치는 수집이 끝난 뒤에 반영 (같은 실행의 다른 플레이어 조회 범위는 그대로)
+    watermarks.record_stored([(match_id, datetime.fromtimestamp(games[match_id][0])) for match_id in games])
+    pages.clear()
+    client.get_new_match_ids("p2", 20)
+    assert pages[0][1] == 1001, "실행 중에 기준점이 앞당겨짐"
+    assert watermarks.apply_stored_games() == 2
+    assert watermarks.get("p1") == 12000 and watermarks.get("p2") == 11000
+    print("[OK] 페이지 5+3개, startTime=기준점+1, 수집 후 기준점 반영")
+
+def test_activity_planner():
+    """수집 계획의 변화량/새 게임 없음 제외/시즌 초기화 처리 확인"""
+    print("\n=== 수집 계획 테스트 ===")
+    from datetime import datetime
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from activity_planner import ActivityPlanner
+    from records import ChallengerRecord
+
+    def player(puuid, wins, losses):
+        return ChallengerRecord(puuid, 0, wins, losses, False, False, datetime.now())
+
+    players = [player("delta", 60, 43), player("idle", 50, 50), player("capped", 400, 300),
+               player("reset", 3, 2), player("new", 10, 10)]
+    previous_games = {"delta": 100, "idle": 100, "capped": 100, "reset": 200}
+
+    planner = ActivityPlanner(default_count=20, max_count=50)
+    planned = planner.plan(players, previous_games)
+
+    # 변화량만큼(최대 max_count), 새 게임 없으면 제외, 전적이 줄었거나 처음 보면 기본 개수
+    assert {p.puuid: p.match_count for p in planned} == {"delta": 3, "capped": 50, "reset": 20, "new": 20}
+    assert [p.puuid for p in planned] == ["delta", "capped", "reset", "new"], "래더 순서 유지"
+    assert planner.get_stats() == {'planned_players': 4, 'new_players': 2,
+                                   'skipped_inactive_players': 1, 'planned_match_ids': 93}
+    assert planned[0].matches_to_collect(5) == 3 and players[0].matches_to_collect(5) == 5
+    print(f"[OK] 수집 계획: {planner.get_stats()}")
+
+def test_ladder_reader_paging():
+    """래더 페이지 조회 종료 조건(빈 페이지/실패/max_pages)과 배치 안 puuid 중복 제거 확인"""
+    print("\n=== 래더 페이지 조회 테스트 ===")
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from riot_client import RiotClient
+    from ladder_reader import LadderReader
+
+    def entry(puuid, league_points, rank="I"):
+        # league-exp 엔트리는 항목마다 티어 포함 (최상위 티어 리그 응답 엔트리에는 없음)
+        return {'puuid': puuid, 'leaguePoints': league_points, 'wins': 10, 'losses': 10,
+                'veteran': False, 'hotStreak': False, 'tier': "DIAMOND", 'rank': rank}
+
+    def apex_entry(puuid, league_points):
+        return {key: value for key, value in entry(puuid, league_points).items() if key not in ('tier', 'rank')}
+
+    # 디비전별 페이지 (None은 요청 실패, 목록에 없는 페이지는 빈 목록)
+    league_pages = {
+        ("I", 1): [entry("d1", 90), entry("d2", 80)],
+        ("I", 2): [entry("d2", 85), entry("d3", 70)],  # 페이지 사이 순위 변동으로 d2가 다시 나옴
+        ("II", 1): None,
+        ("IV", 1): [entry("d4", 10, rank="IV")],
+    }
+    client = RiotClient(_test_config())
+    requested = []
+
+    def get_league_entries_page(tier, division, page=1):
+        requested.append((tier, division, page))
+        return league_pages.get((division, page), [])
+
+    client.get_apex_league = lambda tier: {'tier': tier, 'entries': [apex_entry("c1", 1500), apex_entry("c2", 1400)]}
+    client.get_league_entries_page = get_league_entries_page
+
+    reader = LadderReader(client, ["CHALLENGER", "DIAMOND"], batch_size=3)
+    batches = [[(player.puuid, player.league_points, player.tier) for player in batch]
+               for batch in reader.iter_batches()]
+    assert batches == [[("c1", 1500, "CHALLENGER"), ("c2", 1400, "CHALLENGER"), ("d1", 90, "DIAMOND")],
+                       [("d2", 85, "DIAMOND"), ("d3", 70, "DIAMOND"), ("d4", 10, "DIAMOND")]]
+    # 빈 페이지나 실패한 페이지에서 해당 디비전 조회를 멈추고 다음 디비전으로
+    assert requested == [("DIAMOND", "I", 1), ("DIAMOND", "I", 2), ("DIAMOND", "I", 3), ("DIAMOND", "II", 1),
+                         ("DIAMOND", "III", 1), ("DIAMOND", "IV", 1), ("DIAMOND", "IV", 2)]
+    assert reader.get_stats() == {'ladder_entries': 7, 'ladder_pages': 8,
+                                  'ladder_batches': 2, 'ladder_failed_requests': 1}
+
+    # max_pages가 있으면 디비전마다 그 페이지까지만
+    requested.clear()
+    reader = LadderReader(client, ["DIAMOND"], batch_size=100, max_pages=1)
+    assert [player.puuid for batch in reader.iter_batches() for player in batch] == ["d1", "d2", "d4"]
+    assert [page for _, _, page in requested] == [1, 1, 1, 1]
+    print(f"[OK] 래더 배치 {[len(batch) for batch in batches]}명, 페이지 {len(requested)}개(max_pages=1)")
+
+def test_timeline_frames():
+    """타임라인 프레임 변환(분/참가자 행, 빠진 필드)과 배치 저장/실패 집계 확인"""
+    print("\n=== 타임라인 프레임 변환 테스트 ===")
+    from datetime import datetime
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from timeline_stage import TimelineStage
+
+    def participant_frame(participant_id, minute):
+        return {'participantId': participant_id, 'totalGold': 500 + 400 * minute, 'currentGold': 500,
+                'xp': 280 * minute, 'level': 1 + minute, 'minionsKilled': 8 * minute, 'jungleMinionsKilled': 0,
+                'position': {'x': 100 * participant_id, 'y': 200 * minute}}
+
+    def timeline(minutes):
+        return {'info': {'frameInterval': 60000, 'frames': [
+            {'timestamp': 60000 * minute, 'participantFrames': {
+                str(participant_id): participant_frame(participant_id, minute) for participant_id in (1, 2)
+            }} for minute in range(minutes)
+        ]}}
+
+    class StubRiotClient:
+        platform, kst_now = "KR", datetime(2024, 1, 1)
+
+        def get_match_timeline(self, match_id):
+            return None if match_id == "KR_404" else timeline(3)
+
+    class StubBigQuery:
+        def __init__(self):
+            self.batches = []
+
+        def insert_timeline_frames(self, rows):
+            self.batches.append(rows)
+            return len(self.batches) != 2  # 두 번째 배치 저장 실패
+
+    stage = TimelineStage(StubRiotClient(), StubBigQuery(), batch_matches=2, workers=2)
+    rows = stage.extract_frames("KR_1", timeline(3))
+    assert [(row['minute'], row['participant_id']) for row in rows] == [(m, p) for m in range(3) for p in (1, 2)]
+    assert rows[5] == {'match_id': "KR_1", 'minute': 2, 'participant_id': 2, 'total_gold': 1300, 'current_gold': 500,
+                       'xp': 560, 'level': 3, 'minions_killed': 16, 'jungle_minions_killed': 0,
+                       'position_x': 200, 'position_y': 400, 'collected_at': datetime(2024, 1, 1)}
+
+    # 위치가 없는 프레임(게임 종료 프레임 등)과 프레임이 없는 타임라인
+    sparse = {'info': {'frames': [{'participantFrames': {'1': {'participantId': 1, 'totalGold': 500}}}]}}
+    assert stage.extract_frames("KR_2", sparse)[0]['position_x'] is None
+    assert stage.extract_frames("KR_3", {'info': {}}) == []
+
+    stats = stage.run(["KR_1", "KR_2", "KR_404", "KR_4", "KR_5"])
+    assert [len(batch) for batch in stage.bq_client.batches] == [12, 6, 6], "배치마다 매치 2개 분량"
+    assert stats == {'timeline_matches': 4, 'timeline_frames': 18,
+                     'timeline_failed_matches': 1, 'timeline_failed_batches': 1}
+    print(f"[OK] 프레임 {len(rows)}행/매치, 통계 {stats}")
+
+def test_queue_filter_stats():
+    """매치 ID 조회 큐 필터 파라미터와 필터로 줄인 상세 호출 수 추정 확인"""
+    print("\n=== 큐 필터 테스트 ===")
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from riot_client import RiotClient
+
+    params = RiotClient._match_ids_params
+    assert params(20, queue=420, match_type="ranked") == {"count": 20, "queue": 420}, "큐를 지정하면 유형 필터는 쓰지 않음"
+    assert params(20, match_type="ranked") == {"count": 20, "type": "ranked"}
+    assert params(5, since=1001, start=10) == {"count": 5, "startTime": 1001, "start": 10}
+
+    # 플레이어마다 솔로 랭크 6판, 자유 랭크 2판, 칼바람 2판 (match_id 숫자가 클수록 최근)
+    queues = [420, 440, 450, 420, 420, 450, 440, 420, 420, 420]
+    games = {f"KR_{base + n}": (puuid, queue) for base, puuid in ((100, "p1"), (200, "p2"))
+             for n, queue in enumerate(queues)}
+
+    cfg = _test_config()
+    cfg.MATCH_QUEUE_IDS = "420,440"
+    cfg.QUEUE_FILTER_SAMPLE_PLAYERS = 1
+    client = RiotClient(cfg)
+    requested_queues = []
+
+    def get_match_ids_by_puuid(puuid, count=None, since=None, start=0, queue=None, match_type=None):
+        requested_queues.append(queue)
+        match_ids = [match_id for match_id, (owner, game_queue) in games.items()
+                     if owner == puuid and queue in (None, game_queue)]
+        return sorted(match_ids, key=lambda match_id: int(match_id.split("_")[1]), reverse=True)[start:start + count]
+
+    client.get_match_ids_by_puuid = get_match_ids_by_puuid
+
+    # 큐마다 조회한 뒤 최신순으로 합침, 첫 플레이어만 필터 없이 한 번 더 조회 (샘플)
+    assert client.get_new_match_ids("p1", 20) == ["KR_109", "KR_108", "KR_107", "KR_106", "KR_104",
+                                                  "KR_103", "KR_101", "KR_100"]
+    assert client.get_new_match_ids("p2", 5) == ["KR_209", "KR_208", "KR_207", "KR_206", "KR_204"]
+    assert requested_queues == [420, 440, None, 420, 440]
+
+    stats = client.get_queue_filter_stats()
+    assert stats == {'queue_filter': "420,440", 'filtered_match_ids': 13, 'queue_filter_sampled_players': 1,
+                     'queue_filter_sampled_kept': 8, 'queue_filter_sampled_skipped': 2,
+                     'estimated_avoided_detail_calls': 3}, stats
+    print(f"[OK] 큐 필터 통계: {stats}")
+
+def test_region_timeline_budget():
+    """같은 지역 플랫폼끼리 타임라인 예산을 나눠 쓰고, 예산이 앱 한도와 별개로 동작하는지 확인"""
+    print("\n=== 지역별 타임라인 예산 테스트 ===")
+    import tempfile
+    import time
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from multi_region import MultiRegionCollector
+    from rate_limit_backend import SQLiteRateLimitStore
+    from rate_limiter import RateLimitManager
+
+    cfg = _test_config()
+    cfg.RATE_LIMIT_BACKEND = "memory"
+    cfg.TIMELINE_RATE_LIMITS = "2:10"
+    collector = MultiRegionCollector(cfg, ["KR", "JP1", "NA1"])
+    kr, jp, na = (collector.clients[platform] for platform in ("KR", "JP1", "NA1"))
+
+    assert kr.timeline_budget is jp.timeline_budget and kr.rate_limits is jp.rate_limits
+    assert kr.timeline_budget is not na.timeline_budget
+
+    # asia 예산 2회를 KR/JP1이 나눠 쓰고, americas 예산과 앱 한도는 그대로
+    assert kr.timeline_budget.reserve() == 0 and jp.timeline_budget.reserve() == 0
+    assert kr.timeline_budget.reserve() > 0 and jp.timeline_budget.reserve() > 0
+    assert na.timeline_budget.reserve() == 0
+    assert kr.rate_limits.app_windows.count_in_window(10, time.time()) == 0
+
+    # 저장소를 공유하면 다른 프로세스의 같은 지역 예산과도 나눠 씀
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "rate.sqlite3")
+        budgets = [RateLimitManager(store=SQLiteRateLimitStore(path), namespace="riot-rate:asia")
+                   .create_budget("timeline", "2:10") for _ in range(2)]
+        assert budgets[0].reserve() == 0 and budgets[1].reserve() == 0
+        assert budgets[0].reserve() > 0 and budgets[1].reserve() > 0
+    print("[OK] asia 타임라인 예산 공유, americas 분리, sqlite 저장소 공유")
+
+def test_budget_planner():
+    """예산 계획의 레이트 리밋 최소 시간 계산, 규모별 추정, 예산 맞춤 탐색 확인"""
+    print("\n=== 수집 예산 계획 테스트 ===")
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from budget_planner import CollectionBudgetPlanner
+
+    # 빈 윈도우에서 시작하므로 윈도우 한도만큼은 바로, 넘는 만큼 윈도우 길이씩 대기
+    limits = [(20, 1), (100, 120)]
+    seconds = CollectionBudgetPlanner.rate_limited_seconds
+    assert seconds(0, limits) == 0.0 and seconds(20, limits) == 0.0
+    assert seconds(21, limits) == 1.0
+    assert seconds(101, limits) == 120.0
+    assert seconds(250, limits) == 240.0
+
+    cfg = _test_config()
+    cfg.RIOT_PLATFORMS, cfg.LADDER_TIERS, cfg.LADDER_MAX_PAGES = "KR", "CHALLENGER", 0
+    cfg.RIOT_APP_RATE_LIMITS, cfg.TIMELINE_RATE_LIMITS = "20:1,100:120", "5:1,40:120"
+    cfg.MATCH_QUEUE_IDS, cfg.COLLECTION_ENGINE, cfg.ASYNC_MAX_CONCURRENCY = "420", "async", 20
+    cfg.TIMELINE_ENABLED, cfg.TIMELINE_WORKERS = False, 4
+    planner = CollectionBudgetPlanner(cfg, profile={}, response_time=0.2)
+
+    # 10명 x 5매치: 매치 ID 10회 + 상세 40회(중복 20%) + 리그 1회 = 51회 -> 20:1 윈도우 2번 대기
+    estimate = planner.estimate(10, 5)
+    assert estimate['requests'] == {'league': 1, 'ladder': 0, 'match_ids': 10, 'match_details': 40,
+                                    'timelines': 0, 'total': 51}
+    assert estimate['api_seconds'] == 2.0 and estimate['estimated_seconds'] == 62.0
+    assert estimate['bottleneck_by_region'] == {'asia': 'rate_limit'}
+
+    # 타임라인은 앱 한도와 타임라인 전용 예산(5:1) 중 느린 쪽: 40회 -> 7초
+    cfg.TIMELINE_ENABLED = True
+    assert CollectionBudgetPlanner(cfg, profile={}, response_time=0.2).estimate(10, 5)['api_seconds'] == 9.0
+    cfg.TIMELINE_ENABLED = False
+
+    # 예산 안에서 매치 ID 수(챌린저 수 x 매치 수)가 가장 많은 규모 (전수 탐색과 비교)
+    budget = 180
+    fitted = planner.fit(budget, max_challengers=40, max_matches=20)
+    best = max(((challengers * matches, challengers) for challengers in range(1, 41) for matches in range(1, 21)
+                if planner.estimate(challengers, matches)['estimated_seconds'] <= budget))
+    assert fitted['estimated_seconds'] <= budget
+    assert (fitted['challenger_count'] * fitted['matches_per_player'], fitted['challenger_count']) == best
+    assert planner.fit(planner.overhead_seconds - 1) is None, "가장 작은 규모도 넘으면 None"
+    print(f"[OK] 예산 {budget}초: 챌린저 {fitted['challenger_count']}명 x {fitted['matches_per_player']}매치 "
+          f"(예상 {fitted['estimated_seconds']}초)")
+
+def test_streaming_batch_flush():
+    """스트리밍 수집의 batch_matches 단위 분할과 메모리 상한 조기 저장 확인"""
+    print("\n=== 스트리밍 배치 분할 테스트 ===")
+    from datetime import datetime
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from riot_client import RiotClient
+    from records import ChallengerRecord
+
+    # 플레이어 4명이 각자 매치 2개 (매치마다 참가자 2명)
+    puuids = [f"p{i}" for i in range(4)]
+    games = {f"KR_{10 * i + n}": (10 * i + n, [puuid, f"{puuid}-teammate"]) for i, puuid in enumerate(puuids)
+             for n in (1, 2)}
+    players = [ChallengerRecord(puuid, 0, 0, 0, False, False, datetime.now()) for puuid in puuids]
+    expected_order = [match_id for i in range(4) for match_id in (f"KR_{10 * i + 2}", f"KR_{10 * i + 1}")]
+
+    for memory_limit_mb, expected_sizes in ((0, [3, 3, 2]), (1e-6, [2, 2, 2, 2])):
+        client = RiotClient(_test_config())
+        _stub_match_api(client, games)
+        batches = list(client.iter_match_batches(players, matches_per_player=5, batch_matches=3,
+                                                 memory_limit_mb=memory_limit_mb))
+
+        assert [len(matches) for matches, _ in batches] == expected_sizes
+        assert [match.match_id for matches, _ in batches for match in matches] == expected_order, "순서가 바뀜"
+        for matches, participants in batches:
+            # 참가자는 같은 배치의 매치 것만
+            assert [participant.match_id for participant in participants] == \
+                [match.match_id for match in matches for _ in range(2)]
+        print(f"[OK] memory_limit_mb={memory_limit_mb}: 배치 {expected_sizes}")
+
+def test_async_matches_sync_output():
+    """같은 HTTP 응답에서 비동기 수집이 동기 수집과 같은 매치/참가자 결과와 상세 호출 횟수를 내는지 확인"""
+    print("\n=== 비동기/동기 수집 결과 비교 테스트 ===")
+    import asyncio
+    from datetime import datetime
+    import requests
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from riot_client import RiotClient
+    from async_riot_client import AsyncRiotClient
+    from records import ChallengerRecord
+
+    games = {
+        "KR_1": (1000, ["p1", "p2"]), "KR_2": (2000, ["p1"]), "KR_3": (3000, ["p2", "p3"]),
+        "KR_4": (4000, ["p1", "p3"]), "KR_5": (5000, ["p3"])
+    }
+    players = [ChallengerRecord(puuid, 0, 0, 0, False, False, datetime.now()) for puuid in ("p1", "p2", "p3")]
+    # KR_4는 첫 응답이 깨져 실패하고, 같은 매치를 조회한 다음 플레이어(p3) 차례에 다시 조회됨
+
+    def sync_get(url, params=None, timeout=None):
+        status, body = respond(url, params)
+        response = requests.Response()
+        response.status_code, response._content, response.url = status, body or b"", url
+        return response
+
+    class FakeAsyncResponse:
+        def __init__(self, status, body):
+            self.status, self.body, self.headers = status, body, {}
+
+        async def read(self):
+            return self.body
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+    class FakeAsyncSession:
+        def get(self, url, params=None):
+            return FakeAsyncResponse(*respond(url, params))
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+    results = {}
+    for name in ("sync", "async"):
+        respond, detail_calls = _fake_match_v5(games, corrupt_once={"KR_4"})
+        if name == "sync":
+            client = RiotClient(_test_config())
+            client.http.get = sync_get
+            matches, participants = client.collect_matches_for_challengers(players, matches_per_player=5)
+        else:
+            client = AsyncRiotClient(_test_config())
+            client._create_session = FakeAsyncSession
+            matches, participants = asyncio.run(client.collect_matches_async(players, matches_per_player=5))
+
+        strip = lambda row: {key: value for key, value in row._asdict().items() if key != 'collected_at'}
+        results[name] = ([strip(match) for match in matches], [strip(participant) for participant in participants],
+                         dict(detail_calls), client.get_rate_limit_stats()['coalesced_requests'])
+
+    sync_matches, sync_participants, sync_calls, sync_coalesced = results["sync"]
+    assert [match["match_id"] for match in sync_matches] == ["KR_2", "KR_1", "KR_3", "KR_5", "KR_4"]
+    assert sync_calls == {"KR_1": 1, "KR_2": 1, "KR_3": 1, "KR_4": 2, "KR_5": 1}
+    assert results["async"] == results["sync"], "비동기 수집 결과가 동기 수집과 다름"
+    print(f"[OK] 매치 {len(sync_matches)}개, 참가자 {len(sync_participants)}행, "
+          f"상세 호출 {sum(sync_calls.values())}회, 중복 상세 요청 생략 {sync_coalesced}회 일치")
+
+def test_threaded_collection_dedup():
+    """스레드 수집에서 여러 플레이어가 같은 매치를 동시에 조회해도 상세 요청은 매치당 한 번인지 확인"""
+    print("\n=== 스레드 수집 중복 제거 테스트 ===")
+    import threading
+    import time
+    from collections import Counter
+    from datetime import datetime
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from riot_client import RiotClient
+    from records import ChallengerRecord
+
+    # 플레이어 8명이 매치 12개를 6개씩 겹쳐서 조회
+    puuids = [f"p{i}" for i in range(8)]
+    games = {f"KR_{n}": (1000 * n, [puuid for i, puuid in enumerate(puuids) if 0 <= n - i < 6])
+             for n in range(1, 13)}
+    players = [ChallengerRecord(puuid, 0, 0, 0, False, False, datetime.now()) for puuid in puuids]
+
+    client = RiotClient(_test_config())
+    _stub_match_api(client, games)
+    fetch_match_details, detail_calls, calls_lock = client._fetch_match_details, Counter(), threading.Lock()
+
+    def slow_fetch_match_details(match_id):
+        with calls_lock:
+            detail_calls[match_id] += 1
+        time.sleep(0.01)  # 다른 스레드가 같은 매치를 처리 중일 때 선점하도록 응답을 늦춤
+        return fetch_match_details(match_id)
+
+    client._fetch_match_details = slow_fetch_match_details
+    matches, participants = client.collect_matches_for_challengers(players, matches_per_player=10, max_workers=4)
+
+    listed = sum(len(puuids_in_game) for _, puuids_in_game in games.values())
+    assert sorted(match.match_id for match in matches) == sorted(games), "매치가 빠지거나 중복됨"
+    assert len(participants) == listed
+    assert set(detail_calls.values()) == {1}, f"같은 매치를 여러 번 조회함: {detail_calls}"
+    assert client.get_rate_limit_stats()['coalesced_requests'] == listed - len(games)
+    print(f"[OK] 목록 {listed}건 중 상세 요청 {len(detail_calls)}회, 중복 {listed - len(games)}회 생략")
+
+def test_transform_pool_broken_fallback():
+    """변환 프로세스 풀이 중간에 깨지면 남은 묶음을 실패로 집계하고 파이프라인이 멈추지 않는지 확인"""
+    print("\n=== 변환 프로세스 풀 중단 테스트 ===")
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+    from datetime import datetime
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    import transform_pool
+    from riot_client import RiotClient
+    from records import ChallengerRecord
+    from staged_pipeline import StagedMatchPipeline
+
+    class BreakingTransformPool:
+        """첫 묶음만 변환하고 그다음부터는 워커 프로세스가 죽은 풀처럼 동작 (같은 프로세스에서 변환)"""
+        processes = 1
+
+        def __init__(self):
+            self.submitted = 0
+            transform_pool._init_worker(True)
+
+        def submit(self, payloads):
+            self.submitted += 1
+            future = Future()
+            if self.submitted == 1:
+                future.set_result(transform_pool.encode_match_payloads(payloads))
+            else:
+                future.set_exception(BrokenProcessPool("워커 프로세스 종료"))
+            return future
+
+    class StubBigQuery:
+        def __init__(self):
+            self.loaded_match_ids = []
+
+        def load_match_columns(self, batch):
+            self.loaded_match_ids.extend(batch.column('match_id'))
+            return True
+
+        def load_participant_columns(self, batch):
+            return True
+
+    games = {f"KR_{n}": (1000 * n, ["p1"]) for n in range(1, 8)}
+    respond, _ = _fake_match_v5(games)
+    client = RiotClient(_test_config())
+    _stub_match_api(client, games)
+    client.get_match_payload = lambda match_id: respond(f"{client.match_url}/lol/match/v5/matches/{match_id}")[1]
+
+    written = []
+    pipeline = StagedMatchPipeline(client, StubBigQuery(), batch_size=2, detail_workers=1,
+                                   transform_pool=BreakingTransformPool())
+    stats = pipeline.run([ChallengerRecord("p1", 0, 0, 0, False, False, datetime.now())], 10,
+                         on_batch_written=lambda match_ids, match_games: written.extend(match_ids))
+
+    # 첫 묶음(2개)만 저장, 풀이 깨진 묶음과 이후 묶음 3개(2+2+1개)는 변환 실패 배치
+    assert written == pipeline.bq_client.loaded_match_ids == ["KR_7", "KR_6"]
+    assert stats['matches'] == 2
+    assert stats['failed_transform_batches'] == 3 and stats['failed_batches'] == 3
+    assert stats['stages']['transform']['failures'] == 5
+    assert pipeline.transform_pool.submitted == 2, "깨진 풀에는 더 제출하지 않음"
+    print(f"[OK] 저장 {stats['matches']}개, 변환 실패 배치 {stats['failed_transform_batches']}개")
 
 def test_monitoring():
     """모니터링 모듈 테스트"""
@@ -162,6 +1030,46 @@ def test_monitoring():
         print(f"[ERROR] Monitoring 테스트 실패: {e}")
         traceback.print_exc()
 
+def test_circuit_probe_release():
+    """half-open 시험 요청이 예상하지 못한 예외로 끝나도 서킷이 시험 요청 대기에서 멈추지 않는지 확인"""
+    print("\n=== 서킷 브레이커 시험 요청 해제 테스트 ===")
+    import asyncio
+    import requests
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'data-collection'))
+    from config import Config
+    from riot_client import RiotClient, MATCH_V5_DETAIL
+    from async_riot_client import AsyncRiotClient
+
+    class FailingSession:
+        def get(self, *args, **kwargs):
+            raise requests.exceptions.ChunkedEncodingError("응답 본문 끊김")
+
+    cfg = Config()
+    cfg.riot_api_key = cfg.riot_api_key or "test"
+    cfg.HTTP_WARMUP = False
+    cfg.MATCH_CACHE_ENABLED = False
+
+    for client_class in (RiotClient, AsyncRiotClient):
+        client = client_class(cfg)
+        breaker = client.retry_engine.breaker(MATCH_V5_DETAIL)
+        breaker.state, breaker.opened_until = breaker.OPEN, 0.0  # reset_timeout이 지난 열린 서킷
+
+        try:
+            if client_class is RiotClient:
+                client.http = FailingSession()
+                client._request(MATCH_V5_DETAIL, "https://kr.api.riotgames.com/test")
+            else:
+                asyncio.run(client._get(FailingSession(), asyncio.Semaphore(1), MATCH_V5_DETAIL,
+                                        "https://kr.api.riotgames.com/test"))
+            assert False, "예외가 전파되어야 합니다"
+        except requests.exceptions.ChunkedEncodingError:
+            pass
+
+        assert breaker.state == breaker.HALF_OPEN
+        assert not breaker.probe_in_flight, "시험 요청 표시가 남아 있음"
+        assert breaker.acquire() == (0.0, True), "다음 요청이 시험 요청으로 통과해야 함"
+        print(f"[OK] {client_class.__name__}: 예외 후 다음 시험 요청 허용")
+
 def test_environment():
     """환경 변수 확인"""
     print("\n=== 환경 변수 확인 ===")
@@ -189,6 +1097,23 @@ def main():
     test_environment()
     test_basic_imports()
     test_rate_limiter()
+    test_circuit_breaker_transitions()
+    test_circuit_probe_release()
+    test_known_match_index()
+    test_participant_fields_match_previous_output()
+    test_column_batch_ndjson()
+    test_watermark_failed_detail_relisted()
+    test_watermark_paging_and_since()
+    test_activity_planner()
+    test_ladder_reader_paging()
+    test_timeline_frames()
+    test_queue_filter_stats()
+    test_region_timeline_budget()
+    test_budget_planner()
+    test_streaming_batch_flush()
+    test_transform_pool_broken_fallback()
+    test_async_matches_sync_output()
+    test_threaded_collection_dedup()
     test_monitoring()
     test_data_collection_modules()
     